@@ -9,10 +9,13 @@ https://docs.djangoproject.com/en/4.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
+import django
 import environ
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 import mimetypes
 
 mimetypes.add_type("text/css", ".css", True)
@@ -70,6 +73,30 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+if DEBUG:
+    MIDDLEWARE += [
+        'hrd.middleware.AdminQueryBudgetMiddleware',
+    ]
+
+# Maximum queries an admin page render (GET or HEAD) may issue while DEBUG is on
+ADMIN_QUERY_BUDGET = env.int('ADMIN_QUERY_BUDGET', default=20)
+
+# Duplicate applicant detection (hrd.dedup): pairs scoring at least DEDUP_THRESHOLD are listed for
+# review; blocks larger than DEDUP_MAX_BLOCK (shared placeholder phone numbers) are not compared.
+# DEDUP_COUNTRY_CODE is replaced by a leading 0 when normalizing phone numbers.
+DEDUP_THRESHOLD = env.float('DEDUP_THRESHOLD', default=0.85)
+DEDUP_MAX_BLOCK = env.int('DEDUP_MAX_BLOCK', default=200)
+DEDUP_COUNTRY_CODE = env('DEDUP_COUNTRY_CODE', default='62')
+
+# Request profiling (see "Request profiling" in the README): a sampled share of requests is
+# logged as JSON lines to PROFILING_LOG_FILE. Allocation tracing slows every request down.
+PROFILING = env.bool('PROFILING', default=False)
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=1.0 if DEBUG else 0.01)
+PROFILING_ALLOCATIONS = env.bool('PROFILING_ALLOCATIONS', default=False)
+PROFILING_LOG_FILE = env('PROFILING_LOG_FILE', default=str(BASE_DIR / 'logs' / 'profile.jsonl'))
+if PROFILING:
+    # After WhiteNoise, so static files are not sampled
+    MIDDLEWARE.insert(MIDDLEWARE.index('whitenoise.middleware.WhiteNoiseMiddleware') + 1, 'hrd.middleware.ProfilingMiddleware')
 
 ROOT_URLCONF = 'config.urls'
 
@@ -86,10 +113,13 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'hrd.context_processors.fragment_cache',
             ],
         },
     },
 ]
+if PROFILING:
+    TEMPLATES[0]['BACKEND'] = 'hrd.profiling.ProfiledTemplates'
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
@@ -100,6 +130,60 @@ DATABASES = {
     'default': env.db(),
 }
 
+# Persistent connections: seconds a worker thread keeps its connection between requests (0 closes
+# it after every request), checked before reuse so a connection the server dropped is replaced
+# rather than failing the request. ?conn_max_age= in DATABASE_URL wins over DB_CONN_MAX_AGE.
+DATABASES['default'].setdefault('CONN_MAX_AGE', env.int('DB_CONN_MAX_AGE', default=60))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+
+# Read replicas, comma-separated URLs in DATABASE_URL form, become the aliases replica1, replica2...
+# Only views marked hrd.middleware.reads_from_replica (admin changelists, reports) and exports read
+# from them; see "Read replicas" in the README
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASE_REPLICAS.append(f'replica{index}')
+    DATABASES[f'replica{index}'] = {
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        **env.db_url_config(url),
+        'CONN_HEALTH_CHECKS': DATABASES['default']['CONN_HEALTH_CHECKS'],
+        'TEST': {'MIRROR': 'default'},
+    }
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['hrd.routers.ReplicaRouter']
+    MIDDLEWARE += ['hrd.middleware.ReplicaRoutingMiddleware']
+# Seconds a client reads from the primary after writing, and before a replica that failed is retried
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
+REPLICA_RETRY_SECONDS = env.int('REPLICA_RETRY_SECONDS', default=30)
+
+# psycopg 3 connection pool (PostgreSQL only), available from Django 5.1; it takes the place of
+# persistent connections. On 4.2 use persistent connections or PgBouncer instead.
+if env.bool('DB_POOL', default=False):
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured("DB_POOL needs Django 5.1 or later; use DB_CONN_MAX_AGE or PgBouncer")
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+        'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+        'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+    }
+
+# Cache, from CACHE_URL in django-environ form: locmemcache:// (per process, the default),
+# filecache:///var/tmp/job-vacancy-cache (shared by the processes of one host) or
+# redis://host:6379/1 for any Redis-protocol server (Redis, Valkey, KeyDB; needs the redis package).
+# Invalidation only reaches processes sharing the backend: locmem suits runserver and single-process
+# servers, and gunicorn.conf.py refuses to start several workers with it
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+CACHES['default'].setdefault('KEY_PREFIX', env('CACHE_KEY_PREFIX', default='hrd'))
+
+# Sessions are read from the cache and written through to the database, so a cache flush or a
+# per-process cache only costs a query, never a logout
+SESSION_ENGINE = env('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+
+AUTHENTICATION_BACKENDS = ['hrd.permissions.CachedModelBackend']
+PERMISSION_CACHE_TIMEOUT = env.int('PERMISSION_CACHE_TIMEOUT', default=10 * 60)  # Seconds
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -184,3 +268,84 @@ MESSAGE_TAGS = {
     message_constants.WARNING: 'warning',
     message_constants.ERROR: 'danger',
 }
+
+# Public job board
+JOB_BOARD_PAGE_SIZE = env.int('JOB_BOARD_PAGE_SIZE', default=20)
+JOB_BOARD_CACHE_TIMEOUT = env.int('JOB_BOARD_CACHE_TIMEOUT', default=300)  # Seconds
+
+# Option counts of the admin list filters (hrd.facets): dropped as soon as the change feed records
+# a write to the model, so the timeout only bounds what the feed cannot show
+FACET_CACHE_TIMEOUT = env.int('FACET_CACHE_TIMEOUT', default=10 * 60)  # Seconds
+
+# {% cache %} fragments of the public pages (blank forms, static content): seconds kept, and a
+# version to change on deploy so fragments rendered by older templates are not served
+TEMPLATE_FRAGMENT_TIMEOUT = env.int('TEMPLATE_FRAGMENT_TIMEOUT', default=24 * 60 * 60)
+TEMPLATE_FRAGMENT_VERSION = env('TEMPLATE_FRAGMENT_VERSION', default='1')
+
+# Full-text search for the admin: 'auto' picks PostgreSQL tsvector or SQLite FTS5 from the
+# database engine, 'none' falls back to the admin's icontains search
+SEARCH_BACKEND = env('SEARCH_BACKEND', default='auto')
+
+# Salary normalization (hrd.salaries): salaries are also stored converted to SALARY_BASE_CURRENCY
+# with the rates in EXCHANGE_RATES_FILE (units of each currency per unit of the base currency).
+# Run `manage.py normalize_salaries` after editing the file. SALARY_FILTER_BOUNDS are the steps,
+# in the base currency, of the admin's salary range filters.
+SALARY_BASE_CURRENCY = env('SALARY_BASE_CURRENCY', default='USD')
+EXCHANGE_RATES_FILE = env('EXCHANGE_RATES_FILE', default=str(BASE_DIR / 'config' / 'exchange_rates.csv'))
+SALARY_FILTER_BOUNDS = env.list('SALARY_FILTER_BOUNDS', cast=int, default=[250, 500, 1000, 2000, 5000])
+
+# Change feed (hrd.changes): records older than CHANGE_FEED_RETENTION_DAYS are deleted by
+# `manage.py compact_changes` once every consumer has read them, or, while unread, compacted to
+# the last record of each object. Readers wait up to CHANGE_FEED_GAP_WAIT seconds at a gap in the
+# record ids, which may belong to a transaction that has not committed yet.
+CHANGE_FEED_RETENTION_DAYS = env.int('CHANGE_FEED_RETENTION_DAYS', default=7)
+CHANGE_FEED_GAP_WAIT = env.int('CHANGE_FEED_GAP_WAIT', default=60)
+
+# Public application submissions: owner recorded as created_by (a username), and whether the
+# job's contact email is notified of each new application
+PUBLIC_APPLICATIONS_OWNER = env('PUBLIC_APPLICATIONS_OWNER', default='')
+APPLICATION_NOTIFICATIONS = env.bool('APPLICATION_NOTIFICATIONS', default=False)
+
+# Multi-step application wizard: cache alias holding drafts and seconds an untouched draft is kept
+APPLICATION_DRAFT_CACHE = env('APPLICATION_DRAFT_CACHE', default='default')
+APPLICATION_DRAFT_TTL = env.int('APPLICATION_DRAFT_TTL', default=3 * 24 * 60 * 60)
+
+# Background tasks (hrd.queue): worker threads started inside the web process (0 to rely on
+# `manage.py run_task_worker` instead), idle poll interval, and seconds before a task held by
+# a crashed worker is handed to another one
+TASK_WORKERS = env.int('TASK_WORKERS', default=0)
+TASK_POLL_INTERVAL = env.float('TASK_POLL_INTERVAL', default=1.0)
+TASK_LOCK_TIMEOUT = env.int('TASK_LOCK_TIMEOUT', default=300)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'hrd': {
+            'handlers': ['console'],
+            'level': env('HRD_LOG_LEVEL', default='INFO'),
+        },
+    },
+}
+if PROFILING:
+    # WatchedFileHandler reopens the file after logrotate moves it
+    LOGGING['handlers']['profiling'] = {
+        'class': 'logging.handlers.WatchedFileHandler',
+        'filename': PROFILING_LOG_FILE,
+        'formatter': 'message',
+    }
+    LOGGING['loggers']['hrd.profiling'] = {
+        'handlers': ['profiling'],
+        'level': 'INFO',
+        'propagate': False,
+    }
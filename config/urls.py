@@ -7,7 +7,10 @@ from django.conf.urls.static import static
 
 from django.contrib.auth import views as auth_views
 
-from hrd.views import register, applicant_create_view
+from hrd.views import (
+    register, applicant_create_view, applicant_status_view, applicant_status_json, application_wizard_start,
+    application_wizard_view, job_board_view, job_board_json,
+)
 
 
 # Redirect to admin
@@ -22,6 +25,12 @@ urlpatterns = [
     path('redirect/', redirect_to_admin, name='redirect'),
     path('dashboard/', admin.site.urls),
     path('applicant/new/', applicant_create_view, name='applicant_create'),
+    path('applicant/apply/', application_wizard_start, name='application_wizard_start'),
+    path('applicant/apply/<slug:slug>/', application_wizard_view, name='application_wizard'),
+    path('applicant/status/<uuid:key>/', applicant_status_view, name='applicant_status'),
+    path('api/applicant/status/<uuid:key>/', applicant_status_json, name='applicant_status_json'),
+    path('jobs/', job_board_view, name='job_board'),
+    path('api/jobs/', job_board_json, name='job_board_json'),
 
 
 ]
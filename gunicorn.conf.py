@@ -0,0 +1,44 @@
+"""
+Gunicorn settings, read automatically when gunicorn starts from this directory:
+
+    gunicorn config.wsgi
+    gunicorn config.asgi:application -k uvicorn_worker.UvicornWorker
+
+Each worker thread holds at most one database connection (kept for
+DB_CONN_MAX_AGE seconds), and so does each in-process task worker
+(TASK_WORKERS). Keep WEB_CONCURRENCY * (GUNICORN_THREADS + TASK_WORKERS), summed over
+all hosts, below the database's max_connections. See "Database connections"
+in the README.
+
+Cache invalidation only reaches the processes sharing the cache backend, so
+more than one worker needs CACHE_URL to name a shared cache (see "Cache");
+with the per-process default, a single worker is started.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+from hrd.checks import per_process_caches, require_shared_caches  # noqa: E402
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+# Several workers only with a shared cache; with the per-process default, one unless WEB_CONCURRENCY says
+# otherwise (which on_starting() then refuses)
+single_process_cache = per_process_caches()
+default_workers = 1 if single_process_cache else multiprocessing.cpu_count() * 2 + 1
+workers = int(os.environ.get('WEB_CONCURRENCY', default_workers))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Recycle workers now and then so a slow leak cannot grow without bound; the jitter keeps them
+# from restarting (and reconnecting to the database) all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server):
+    require_shared_caches(workers)
+    if single_process_cache and 'WEB_CONCURRENCY' not in os.environ:
+        server.log.warning(
+            "Starting 1 worker: the %s cache is per process (locmemcache://). Set CACHE_URL to a shared "
+            "cache to run %d workers.", ', '.join(single_process_cache), multiprocessing.cpu_count() * 2 + 1,
+        )
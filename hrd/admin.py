@@ -1,20 +1,208 @@
+import json
+from urllib.parse import parse_qsl
+
 from django import forms
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.utils import flatten_fieldsets, get_fields_from_path, unquote
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, F, Q
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html
 from fieldsets_with_inlines import FieldsetsInlineMixin
 
-from hrd.models import Job, EmploymentHistory, Education, Family, Organization, Applicant, ApplicantReference, Submission
+from hrd import autosave, dedup, exporter, facets, importer, jobboard, matching, rollups, routers, search
+from hrd.forms import ApplicantImportForm
+from hrd.middleware import query_budget_exempt, reads_from_replica
+from hrd.models import (
+    Job, EmploymentHistory, Education, Family, Organization, Applicant, ApplicantReference, Submission, JobRollup, DuplicateCandidate,
+    BackgroundTask,
+)
+
+
+class SearchRankChangeList(ChangeList):
+    # Show full-text search results by relevance unless a column header was clicked
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        if search.RANK in queryset.query.extra and ORDER_VAR not in self.params:
+            ordering = [f'-{search.RANK}', *ordering]
+        return ordering
+
+
+class FullTextSearchMixin:
+    # Search through the full-text index instead of icontains scans when the database has one
+    def get_changelist(self, request, **kwargs):
+        return SearchRankChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        backend = search.get_backend(queryset.db)
+        if backend is None or not search.parse_terms(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return backend.search(queryset, search_term), False
+
+
+class ReplicaChangelistMixin:
+    # Listing, searching and filtering never write, so their GETs may be served from a replica
+    @reads_from_replica
+    def changelist_view(self, request, extra_context=None):
+        return super().changelist_view(request, extra_context)
+
+
+class FacetFilterMixin:
+    # Shows the number of records behind each option; the counts of all the facets of a
+    # changelist come from FacetCountsMixin.facet_counts(), one cached query for the page.
+    # Filters using it define facet_values(field), the field values counted.
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.counts = model_admin.facet_counts(request)
+
+    def choices(self, changelist):
+        values = self.counts['facets'].get(self.field_path, {})
+        for choice in super().choices(changelist):
+            # Each option is told apart by the lookup its link sets: __exact=<value>, __isnull=True, or none for All
+            params = dict(parse_qsl(choice['query_string'].lstrip('?'), keep_blank_values=True))
+            if params.get(f'{self.field_path}__isnull') == 'True':
+                count = values.get(None)
+            elif self.lookup_kwarg in params:
+                count = values.get(self.field.to_python(params[self.lookup_kwarg]))
+            else:
+                count = self.counts['total']
+            if count is not None:
+                choice = {**choice, 'display': f"{choice['display']} ({count:,})"}
+            yield choice
+
+
+class BooleanFacetFilter(FacetFilterMixin, admin.BooleanFieldListFilter):
+    @staticmethod
+    def facet_values(field):
+        return [True, False, None] if field.null else [True, False]
+
+
+class ChoicesFacetFilter(FacetFilterMixin, admin.ChoicesFieldListFilter):
+    @staticmethod
+    def facet_values(field):
+        return [value for value, _title in field.flatchoices if value is not None]
+
+
+class FacetCountsMixin:
+    def facet_scope(self, request):
+        # Key of the records get_queryset() shows this request's user
+        return 'all'
+
+    def facet_counts(self, request):
+        """facets.counts() for every facet filter in list_filter, computed once per request."""
+        memo = request.__dict__.setdefault('_facet_counts', {})
+        if self.model not in memo:
+            facet_values = {
+                spec[0]: spec[1].facet_values(get_fields_from_path(self.model, spec[0])[-1])
+                for spec in self.get_list_filter(request)
+                if isinstance(spec, (list, tuple)) and issubclass(spec[1], FacetFilterMixin)
+            }
+            memo[self.model] = facets.counts(self.get_queryset(request), facet_values, self.facet_scope(request))
+        return memo[self.model]
+
+
+class SalaryRangeFilter(admin.SimpleListFilter):
+    # Steps of SALARY_FILTER_BOUNDS over a normalized salary column, compared in SQL
+    base_field = None
+
+    def lookups(self, request, model_admin):
+        currency = settings.SALARY_BASE_CURRENCY
+        edges = [None, *settings.SALARY_FILTER_BOUNDS, None]
+        choices = []
+        for low, high in zip(edges, edges[1:]):
+            if low is None:
+                label = f"Under {high:,} {currency}"
+            elif high is None:
+                label = f"{low:,} {currency} and over"
+            else:
+                label = f"{low:,} – {high:,} {currency}"
+            choices.append((f"{low or ''}-{high or ''}", label))
+        return choices
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            low, high = (int(bound) if bound else None for bound in self.value().split('-'))
+        except ValueError as error:
+            raise IncorrectLookupParameters(error)
+        return queryset.filter(self.range_filter(low, high))
+
+    def range_filter(self, low, high):
+        condition = Q(**{f'{self.base_field}__isnull': False})
+        if low is not None:
+            condition &= Q(**{f'{self.base_field}__gte': low})
+        if high is not None:
+            condition &= Q(**{f'{self.base_field}__lt': high})
+        return condition
+
+
+class JobSalaryFilter(SalaryRangeFilter):
+    title = f'salary offered ({settings.SALARY_BASE_CURRENCY})'
+    parameter_name = 'salary'
+
+    def range_filter(self, low, high):
+        # Salary ranges overlapping the step; an open end counts as unbounded
+        condition = Q(min_salary_base__isnull=False) | Q(max_salary_base__isnull=False)
+        if low is not None:
+            condition &= Q(max_salary_base__gte=low) | Q(max_salary_base__isnull=True)
+        if high is not None:
+            condition &= Q(min_salary_base__lt=high) | Q(min_salary_base__isnull=True)
+        return condition
+
+
+class ExpectedSalaryFilter(SalaryRangeFilter):
+    title = f'expected salary ({settings.SALARY_BASE_CURRENCY})'
+    parameter_name = 'expected_salary'
+    base_field = 'salary_expected_base'
+
+
+class SalaryBandFilter(admin.SimpleListFilter):
+    # Expected salary against the salary range of the job applied for, as in the analytics rollups
+    title = "expected salary vs job's range"
+    parameter_name = 'salary_band'
+
+    def lookups(self, request, model_admin):
+        return [('below', 'Below the range'), ('within', 'Within the range'), ('above', 'Above the range'), ('none', 'Not given')]
+
+    def queryset(self, request, queryset):
+        minimum = F('position_applied_for__min_salary_base')
+        maximum = F('position_applied_for__max_salary_base')
+        if self.value() == 'below':
+            return queryset.filter(salary_expected_base__lt=minimum)
+        if self.value() == 'above':
+            return queryset.filter(salary_expected_base__gt=maximum)
+        if self.value() == 'within':
+            return queryset.filter(
+                Q(salary_expected_base__gte=minimum) | Q(position_applied_for__min_salary_base__isnull=True),
+                Q(salary_expected_base__lte=maximum) | Q(position_applied_for__max_salary_base__isnull=True),
+                salary_expected_base__isnull=False,
+            )
+        if self.value() == 'none':
+            return queryset.filter(salary_expected_base__isnull=True)
+        return queryset
 
 
 # Register your models here.
 @admin.register(Job)
-class JobAdmin(admin.ModelAdmin):
+class JobAdmin(ReplicaChangelistMixin, FacetCountsMixin, FullTextSearchMixin, admin.ModelAdmin):
     # Fields to display in the list view
-    list_display = ('title', 'employment_type', 'min_salary', 'max_salary', 'currency', 'is_active', 'date_posted', 'application_deadline')
+    list_display = ('title', 'employment_type', 'min_salary', 'max_salary', 'currency', 'salary_base', 'is_active', 'date_posted', 'application_deadline', 'best_matches_link')
 
     # Fields to filter the list by
-    list_filter = ('employment_type', 'is_active', 'date_posted', 'application_deadline')
+    list_filter = (
+        ('employment_type', ChoicesFacetFilter), ('is_active', BooleanFacetFilter), JobSalaryFilter, 'date_posted', 'application_deadline',
+    )
 
-    # Fields to search for in the search bar
+    # Fields to search for in the search bar (see search.SEARCH_FIELDS for the full-text index)
     search_fields = ('title', 'qualifications', 'skills_required', 'description', 'contact_email')
 
     # Fields to be grouped in the form view
@@ -42,29 +230,73 @@ class JobAdmin(admin.ModelAdmin):
     # Add ordering
     ordering = ('-date_posted',)  # Most recent jobs appear first
 
+    # Number of candidates listed on the "Best matches" page
+    best_matches_count = 25
+
+    def get_urls(self):
+        urls = [
+            path('<path:object_id>/matches/', self.admin_site.admin_view(self.best_matches_view), name='hrd_job_best_matches'),
+        ]
+        return urls + super().get_urls()
+
+    @admin.display(description=f'Salary ({settings.SALARY_BASE_CURRENCY})', ordering='max_salary_base')
+    def salary_base(self, obj):
+        if obj.min_salary_base is None and obj.max_salary_base is None:
+            return None
+        return f"{obj.min_salary_base or ''} – {obj.max_salary_base or ''}"
+
+    @admin.display(description='Best matches')
+    def best_matches_link(self, obj):
+        return format_html('<a href="{}">Best matches</a>', reverse('admin:hrd_job_best_matches', args=[obj.pk]))
+
+    # Rank the applicants this user can see against the job
+    @reads_from_replica
+    def best_matches_view(self, request, object_id):
+        job = get_object_or_404(self.get_queryset(request), pk=object_id)
+        if not self.has_view_permission(request, job):
+            raise PermissionDenied
+        applicant_admin = self.admin_site._registry[Applicant]
+        matches = matching.top_matches(job, self.best_matches_count, applicant_admin.get_queryset(request))
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Best matches for {job}',
+            'opts': self.model._meta,
+            'original': job,
+            'matches': matches,
+            'criteria': list(matching.WEIGHTS),
+        }
+        return TemplateResponse(request, 'admin/hrd/job/best_matches.html', context)
+
 
 # Applicant Admin
-class EmploymentHistoryInline(admin.StackedInline):
+class DeferredInlineMixin:
+    # `extra` sizes the application wizard's formsets; in the admin, blank rows are added
+    # client-side from the formset's empty form instead of being rendered up front
+    def get_extra(self, request, obj=None, **kwargs):
+        return 0
+
+
+class EmploymentHistoryInline(DeferredInlineMixin, admin.StackedInline):
     model = EmploymentHistory
     extra = 2
     # classes = ['collapse']
 
-class EducationInline(admin.StackedInline):
+class EducationInline(DeferredInlineMixin, admin.StackedInline):
     model = Education
     extra = 4
     # classes = ['collapse']
 
-class FamilyInline(admin.StackedInline):
+class FamilyInline(DeferredInlineMixin, admin.StackedInline):
     model = Family
     extra = 3
     # classes = ['collapse']
 
-class OrganizationInline(admin.TabularInline):
+class OrganizationInline(DeferredInlineMixin, admin.TabularInline):
     model = Organization
     extra = 3
     # classes = ['collapse']
 
-class ApplicantReferenceInline(admin.StackedInline):
+class ApplicantReferenceInline(DeferredInlineMixin, admin.StackedInline):
     model = ApplicantReference
     extra = 2  # Number of extra empty forms displayed
 
@@ -77,7 +309,7 @@ class ApplicantReferenceInline(admin.StackedInline):
                 """
         return super().formfield_for_dbfield(db_field, request, **kwargs)
 
-class SubmissionInline(admin.StackedInline):
+class SubmissionInline(DeferredInlineMixin, admin.StackedInline):
     model = Submission
     extra = 2  # Number of extra empty forms displayed
 
@@ -88,10 +320,17 @@ class SubmissionInline(admin.StackedInline):
         return super().formfield_for_dbfield(db_field, request, **kwargs)
 
 
-class ApplicantAdmin(FieldsetsInlineMixin, admin.ModelAdmin):
-    list_display = ('name', 'home_address', 'good_health', 'in_debt', 'engaged_in_business', 'agreement')
-    search_fields = ('name', 'home_address', 'in_debt')
-    list_filter = ('good_health', 'in_debt', 'engaged_in_business')
+class ApplicantAdmin(ReplicaChangelistMixin, FacetCountsMixin, FullTextSearchMixin, FieldsetsInlineMixin, admin.ModelAdmin):
+    list_display = ('name', 'home_address', 'experience_years', 'highest_education', 'good_health', 'in_debt', 'engaged_in_business', 'agreement')
+    search_fields = ('name', 'home_address')
+    list_filter = (
+        ('good_health', BooleanFacetFilter), ('in_debt', BooleanFacetFilter), ('engaged_in_business', BooleanFacetFilter),
+        ('religion', ChoicesFacetFilter), ('marital_status', ChoicesFacetFilter), ('living_situation', ChoicesFacetFilter),
+        ('summary__highest_education_level', ChoicesFacetFilter), ExpectedSalaryFilter, SalaryBandFilter,
+    )
+
+    # Aggregates come from the ApplicantSummary projection, not from the child tables
+    list_select_related = ('summary',)
 
 
     # Include inlines for related models
@@ -173,10 +412,190 @@ class ApplicantAdmin(FieldsetsInlineMixin, admin.ModelAdmin):
             return qs  # Superusers can see all records
         return qs.filter(created_by=request.user)  # Regular users can see only their own records
 
+    def facet_scope(self, request):
+        return 'all' if request.user.is_superuser else f'user:{request.user.pk}'
+
+    @admin.display(description='Experience (years)', ordering='summary__experience_years')
+    def experience_years(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return summary.experience_years if summary else None
+
+    @admin.display(description='Highest education', ordering='summary__education_rank')
+    def highest_education(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return summary.get_highest_education_level_display() if summary else None
+
+    change_list_template = 'admin/hrd/applicant/change_list.html'
+
+    actions = ['export_csv', 'export_jsonl', 'export_xlsx']
+
+    # Applicants fetched (and child relations prefetched) per round trip while exporting
+    export_chunk_size = 2_000
+
+    # Rows with errors listed on the import result page
+    import_error_limit = 200
+
+    change_form_template = 'admin/hrd/applicant/change_form.html'
+
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='hrd_applicant_import'),
+            path('<path:object_id>/autosave/', self.admin_site.admin_view(self.autosave_view), name='hrd_applicant_autosave'),
+            path(
+                '<path:object_id>/inline/<str:prefix>/', self.admin_site.admin_view(self.inline_view),
+                name='hrd_applicant_inline',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        # Open duplicate candidates are listed above the form for those allowed to review them
+        if request.method == 'GET' and self.admin_site._registry[DuplicateCandidate].has_view_permission(request):
+            pk = unquote(object_id)
+            candidates = self.admin_site._registry[DuplicateCandidate].get_queryset(request).filter(
+                Q(applicant=pk) | Q(duplicate=pk), status=DuplicateCandidate.OPEN,
+            ).select_related('applicant', 'duplicate').order_by('-score')
+            extra_context = {
+                **(extra_context or {}),
+                'duplicate_candidates': [
+                    (candidate, candidate.duplicate if str(candidate.applicant_id) == pk else candidate.applicant)
+                    for candidate in candidates
+                ],
+            }
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    # The change form renders each inline without its rows (see templates/admin/hrd/applicant/change_form.html)
+    # and fetches them from inline_view when the section is expanded. An inline that is never
+    # expanded posts zero forms, which leaves its rows untouched.
+    def get_formset_kwargs(self, request, obj, inline, prefix):
+        kwargs = super().get_formset_kwargs(request, obj, inline, prefix)
+        if request.method == 'GET' and obj is not None:
+            kwargs['queryset'] = kwargs['queryset'].none()
+        return kwargs
+
+    def inline_view(self, request, object_id, prefix):
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        for FormSet, inline in self.get_formsets_with_inlines(request, obj):
+            if FormSet.get_default_prefix() == prefix:
+                break
+        else:
+            raise Http404
+        formset = FormSet(instance=obj, prefix=prefix, queryset=inline.get_queryset(request))
+        inline_admin_formset, = self.get_inline_formsets(request, [formset], [inline], obj)
+        context = {'opts': self.opts, 'original': obj, 'inline_admin_formset': inline_admin_formset}
+        return TemplateResponse(request, inline.template, context)
+
+    # Partial save from the change form: only the edited fields and child rows, checked against the version token
+    def autosave_view(self, request, object_id):
+        if request.method != 'PATCH':
+            return HttpResponseNotAllowed(['PATCH'])
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_change_permission(request, obj):
+            raise PermissionDenied
+        try:
+            payload = json.loads(request.body)
+            version = int(payload['version'])
+            fields = dict(payload.get('fields') or {})
+            children = dict(payload.get('children') or {})
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': 'Expected a JSON object with a version.'}, status=400)
+
+        editable = set(flatten_fieldsets(self.get_fieldsets(request, obj))) - set(self.get_readonly_fields(request, obj))
+        if set(fields) - editable:
+            return JsonResponse({'error': f"Not editable: {', '.join(sorted(set(fields) - editable))}."}, status=400)
+        for relation, changes in children.items():
+            model = importer.CHILD_RELATIONS.get(relation)
+            for action in (changes if model and isinstance(changes, dict) else ()):
+                if action not in autosave.CHILD_ACTIONS:
+                    return JsonResponse({'error': f"Unknown action '{action}' for {relation}."}, status=400)
+                codename = get_permission_codename(autosave.CHILD_ACTIONS[action], model._meta)
+                if not request.user.has_perm(f'{model._meta.app_label}.{codename}'):
+                    raise PermissionDenied
+
+        form_class = self.get_form(request, obj, change=True, fields=sorted(fields)) if fields else None
+        try:
+            version, created = autosave.apply_patch(obj, version, fields, children, form_class)
+        except autosave.PatchError as error:
+            return JsonResponse({'errors': error.errors}, status=400)
+        except autosave.VersionConflict as conflict:
+            return JsonResponse(
+                {'error': 'This applicant was changed by someone else.', 'version': conflict.version}, status=409,
+            )
+        return JsonResponse({'version': version, 'created': created})
+
+    # Bulk import applicants (and their child records) from an uploaded spreadsheet or JSON file
+    @query_budget_exempt
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        result = None
+        if request.method == 'POST':
+            form = ApplicantImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                run = importer.ApplicantImporter(
+                    request.user, batch_size=form.cleaned_data['batch_size'], dry_run=form.cleaned_data['dry_run'],
+                )
+                try:
+                    result = run.run(importer.read_upload(form.cleaned_data['file']))
+                except importer.ImportFormatError as error:
+                    form.add_error('file', str(error))
+        else:
+            form = ApplicantImportForm()
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Import applicants',
+            'opts': self.model._meta,
+            'form': form,
+            'result': result,
+            'errors': result.errors[:self.import_error_limit] if result else [],
+            'dry_run': form.is_bound and form.cleaned_data.get('dry_run'),
+        }
+        return TemplateResponse(request, 'admin/hrd/applicant/import.html', context)
+
+    # Exports stream rows as they are read; the queryset is already scoped by get_queryset
+    def export_filename(self, file_format):
+        return f"applicants-{timezone.localtime():%Y%m%d-%H%M}.{file_format}"
+
+    def export_queryset(self, request, queryset):
+        # Actions arrive as POSTs, which the replica middleware leaves alone; exports only read
+        return queryset.using(routers.request_read_alias(request))
+
+    def stream_export(self, rows, file_format):
+        response = StreamingHttpResponse(rows, content_type=exporter.CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{self.export_filename(file_format)}"'
+        return response
+
+    @admin.action(description='Export selected applicants as CSV')
+    def export_csv(self, request, queryset):
+        queryset = self.export_queryset(request, queryset)
+        return self.stream_export(exporter.iter_csv(queryset, self.export_chunk_size), 'csv')
+
+    @admin.action(description='Export selected applicants as JSON Lines')
+    def export_jsonl(self, request, queryset):
+        queryset = self.export_queryset(request, queryset)
+        return self.stream_export(exporter.iter_jsonl(queryset, self.export_chunk_size), 'jsonl')
+
+    @admin.action(description='Export selected applicants as Excel')
+    def export_xlsx(self, request, queryset):
+        try:
+            rows = exporter.iter_xlsx(self.export_queryset(request, queryset), self.export_chunk_size)
+        except RuntimeError as error:
+            self.message_user(request, str(error), messages.ERROR)
+            return None
+        return self.stream_export(rows, 'xlsx')
+
     # Automatically set the `created_by` field to the current user
     def save_model(self, request, obj, form, change):
         if not obj.pk:  # If the object is being created, not edited
             obj.created_by = request.user
+        else:
+            obj.version += 1  # Invalidate autosaves from pages opened before this save
         super().save_model(request, obj, form, change)
 
 
@@ -233,15 +652,20 @@ class ApplicantAdmin(FieldsetsInlineMixin, admin.ModelAdmin):
     # )
 
     # This method customizes the form field for foreign keys in the admin
-    def get_form(self, request, obj=None, **kwargs):
-        form = super().get_form(request, obj, **kwargs)
-        # Filter positionAppliedFor to show only active jobs
-        form.base_fields['position_applied_for'].queryset = Job.objects.filter(is_active=True)
-        return form
-
-
-class EmploymentHistoryAdmin(admin.ModelAdmin):
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'position_applied_for':
+            # Filter positionAppliedFor to show only active jobs
+            kwargs['queryset'] = Job.objects.filter(is_active=True)
+            formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+            # Render the options from the cached choice list instead of querying Job on every form
+            formfield.choices = [('', formfield.empty_label)] + jobboard.active_job_choices()
+            return formfield
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+class EmploymentHistoryAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     # list_display = ('applicant',)  # Display the associated applicant
+    list_select_related = ('applicant',)  # Avoid one applicant query per row
 
     # Filter employment histories based on the logged-in user’s applicants
     def get_queryset(self, request):
@@ -251,8 +675,9 @@ class EmploymentHistoryAdmin(admin.ModelAdmin):
         return qs.filter(applicant__created_by=request.user)  # Show only records linked to the user's applicants
 
 
-class EducationAdmin(admin.ModelAdmin):
+class EducationAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     # list_display = ('applicant',)  # Display the associated applicant
+    list_select_related = ('applicant',)  # Avoid one applicant query per row
 
     # Filter education records based on the logged-in user’s applicants
     def get_queryset(self, request):
@@ -261,8 +686,9 @@ class EducationAdmin(admin.ModelAdmin):
             return qs  # Superusers can see all education records
         return qs.filter(applicant__created_by=request.user)  # Show only records linked to the user's applicants
 
-class FamilyAdmin(admin.ModelAdmin):
+class FamilyAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     # list_display = ('applicant',)  # Display the associated applicant
+    list_select_related = ('applicant',)  # Avoid one applicant query per row
 
     # Filter education records based on the logged-in user’s applicants
     def get_queryset(self, request):
@@ -272,8 +698,9 @@ class FamilyAdmin(admin.ModelAdmin):
         return qs.filter(applicant__created_by=request.user)  # Show only records linked to the user's applicants
 
 
-class OrganizationAdmin(admin.ModelAdmin):
+class OrganizationAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     list_display = ('applicant',)  # Display the associated applicant
+    list_select_related = ('applicant',)  # Avoid one applicant query per row
 
     # Filter education records based on the logged-in user’s applicants
     def get_queryset(self, request):
@@ -283,6 +710,144 @@ class OrganizationAdmin(admin.ModelAdmin):
         return qs.filter(applicant__created_by=request.user)  # Show only records linked to the user's applicants
 
 
+@admin.register(JobRollup)
+class JobRollupAdmin(admin.ModelAdmin):
+    # The changelist is the analytics dashboard; rows are only written by hrd.rollups
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @reads_from_replica
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Recruitment analytics',
+            'opts': self.model._meta,
+            **rollups.dashboard(),
+        }
+        return TemplateResponse(request, 'admin/hrd/jobrollup/dashboard.html', context)
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    # Pairs are found by hrd.dedup; reviewers dismiss them or merge them from merge_view
+    list_display = ('applicant', 'duplicate', 'score', 'status', 'found_at', 'review_link')
+    list_filter = ('status',)
+    list_select_related = ('applicant', 'duplicate')
+    readonly_fields = ('applicant', 'duplicate', 'score', 'details', 'found_at')
+    ordering = ('status', '-score')
+    actions = ['dismiss_candidates']
+
+    # Applicant fields shown side by side on the merge page
+    merge_fields = (
+        'name', 'mobile_phone', 'date_of_birth', 'place_of_birth', 'home_address', 'residence_phone',
+        'position_applied_for', 'salary_expected', 'created_by',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    # Only pairs of applicants the user can see in the applicant admin
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        visible = self.admin_site._registry[Applicant].get_queryset(request).values('pk')
+        return qs.filter(applicant__in=visible, duplicate__in=visible)
+
+    def get_urls(self):
+        urls = [
+            path('<path:object_id>/merge/', self.admin_site.admin_view(self.merge_view), name='hrd_duplicatecandidate_merge'),
+        ]
+        return urls + super().get_urls()
+
+    @admin.display(description='Review')
+    def review_link(self, obj):
+        return format_html('<a href="{}">Compare and merge</a>', reverse('admin:hrd_duplicatecandidate_merge', args=[obj.pk]))
+
+    @admin.action(description='Mark selected as not duplicates')
+    def dismiss_candidates(self, request, queryset):
+        updated = queryset.update(status=DuplicateCandidate.DISMISSED)
+        self.message_user(request, f"{updated} pair(s) dismissed.", messages.SUCCESS)
+
+    # A merge touches every applicant table once (about 40 queries with the follow-up refreshes),
+    # however many child records move
+    @query_budget_exempt
+    def merge_view(self, request, object_id):
+        related = [f'{side}__{name}' for side in ('applicant', 'duplicate') for name in ('position_applied_for', 'created_by')]
+        candidate = get_object_or_404(self.get_queryset(request).select_related(*related), pk=object_id)
+        if not self.has_change_permission(request, candidate):
+            raise PermissionDenied
+        pair = {applicant.pk: applicant for applicant in (candidate.applicant, candidate.duplicate)}
+
+        if request.method == 'POST':
+            if 'dismiss' in request.POST:
+                candidate.status = DuplicateCandidate.DISMISSED
+                candidate.save(update_fields=['status'])
+                self.message_user(request, "Marked as not a duplicate.", messages.SUCCESS)
+                return redirect('admin:hrd_duplicatecandidate_changelist')
+            try:
+                keep = pair.pop(int(request.POST.get('keep', '')))
+            except (KeyError, ValueError):
+                raise Http404
+            drop, = pair.values()
+            applicant_admin = self.admin_site._registry[Applicant]
+            if not (applicant_admin.has_change_permission(request, keep) and applicant_admin.has_delete_permission(request, drop)):
+                raise PermissionDenied
+            # get_queryset() already hides other recruiters' pairs; checked again right before the write
+            if applicant_admin.get_queryset(request).filter(pk__in=[keep.pk, drop.pk]).count() != 2:
+                raise PermissionDenied
+            moved = dedup.merge(keep, drop)
+            self.message_user(request, f"Merged {drop} into {keep}, moving {moved} child record(s).", messages.SUCCESS)
+            return redirect('admin:hrd_applicant_change', keep.pk)
+
+        counts = {pk: {} for pk in pair}
+        for model in dedup.CHILD_MODELS:
+            rows = model.objects.filter(applicant__in=list(pair)).values('applicant').annotate(total=Count('pk')).order_by()
+            for row in rows:
+                counts[row['applicant']][model._meta.verbose_name_plural] = row['total']
+        rows = [
+            (Applicant._meta.get_field(name).verbose_name, [getattr(applicant, name) for applicant in pair.values()])
+            for name in self.merge_fields
+        ]
+        rows += [
+            (model._meta.verbose_name_plural, [counts[pk].get(model._meta.verbose_name_plural, 0) for pk in pair])
+            for model in dedup.CHILD_MODELS
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Compare and merge applicants',
+            'opts': self.model._meta,
+            'candidate': candidate,
+            'applicants': list(pair.values()),
+            'rows': rows,
+        }
+        return TemplateResponse(request, 'admin/hrd/duplicatecandidate/merge.html', context)
+
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'reference', 'status', 'attempts', 'max_attempts', 'available_at', 'updated_at')
+    list_filter = ('status', 'name')
+    search_fields = ('reference',)
+    readonly_fields = ('name', 'payload', 'reference', 'attempts', 'locked_at', 'last_error', 'created_at', 'updated_at')
+    ordering = ('-pk',)
+    actions = ['retry_tasks']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_tasks(self, request, queryset):
+        updated = queryset.exclude(status=BackgroundTask.RUNNING).update(
+            status=BackgroundTask.PENDING, attempts=0, available_at=timezone.now(), locked_at=None,
+        )
+        self.message_user(request, f"{updated} task(s) queued again.", messages.SUCCESS)
+
 
 # Register all models
 admin.site.register(Applicant, ApplicantAdmin)
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+
+from hrd import changes, tasks
+from hrd.models import Applicant, ChangeRecord
+
+
+def application_owner(user):
+    # Staff submitting on someone's behalf own the record; public submissions go to the configured owner
+    if user.is_authenticated and user.is_staff:
+        return user
+    if not settings.PUBLIC_APPLICATIONS_OWNER:
+        raise ImproperlyConfigured("Set PUBLIC_APPLICATIONS_OWNER to the username that owns public applications")
+    return User.objects.get(username=settings.PUBLIC_APPLICATIONS_OWNER)
+
+
+def submitted_application(key):
+    return Applicant.objects.filter(submission_key=key).first()
+
+
+def store_application(applicant, key, owner, children=None):
+    """
+    Insert an unsaved applicant and its unsaved child records ({model: [instances]})
+    in one transaction and queue the follow-up tasks. bulk_create skips the
+    post_save handlers, whose work the queued tasks do instead. Returns the
+    applicant stored under key, which is the existing one if key was already used.
+    """
+    existing = submitted_application(key)
+    if existing is not None:
+        return existing
+
+    applicant.created_by = owner
+    applicant.submission_key = key
+    try:
+        with transaction.atomic():
+            Applicant.objects.bulk_create([applicant])
+            for model, instances in (children or {}).items():
+                for instance in instances:
+                    instance.applicant = applicant
+                model.objects.bulk_create(instances)
+            changes.record([applicant, *(instance for instances in (children or {}).values() for instance in instances)], ChangeRecord.CREATED)
+            tasks.enqueue_application_tasks(applicant)
+    except IntegrityError:
+        # The same key submitted concurrently: the other request stored it
+        existing = submitted_application(key)
+        if existing is None:
+            raise
+        return existing
+    return applicant
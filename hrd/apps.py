@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class HrdConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hrd'
+
+    def ready(self):
+        from hrd import checks, signals, tasks  # noqa: F401
+        from hrd.permissions import clear_recruiter_permission_cache
+
+        post_migrate.connect(clear_recruiter_permission_cache, dispatch_uid='hrd_clear_recruiter_permission_cache')
@@ -0,0 +1,164 @@
+from functools import lru_cache
+
+from django.db import router, transaction
+from django.db.models import F
+from django.forms import modelform_factory
+from django.utils.datastructures import MultiValueDict
+
+from hrd import changes as change_feed, dedup, rollups, salaries, search, tasks
+from hrd.importer import CHILD_RELATIONS
+from hrd.models import Applicant, ChangeRecord, Education, EmploymentHistory
+
+CHILD_ACTIONS = {'update': 'change', 'create': 'add', 'delete': 'delete'}
+
+
+class PatchError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class VersionConflict(Exception):
+    def __init__(self, version):
+        super().__init__(version)
+        self.version = version
+
+
+def form_data(values):
+    # JSON values as a form would receive them: lists for multiple choices, '' for null
+    return MultiValueDict({
+        name: value if isinstance(value, list) else ['' if value is None else value]
+        for name, value in values.items()
+    })
+
+
+@lru_cache(maxsize=256)
+def _child_form_class(model, fields=None):
+    # Only called with names checked against _editable_fields(), so the cache stays bounded
+    if fields is None:
+        return modelform_factory(model, exclude=['applicant'])
+    return modelform_factory(model, fields=fields)
+
+
+def _editable_fields(model):
+    # The fields of the admin inline: every editable field but the link to the applicant
+    return set(_child_form_class(model).base_fields)
+
+
+def _unknown_fields(model, row):
+    unknown = set(row) - {'id'} - _editable_fields(model)
+    return f"Not editable: {', '.join(sorted(unknown))}." if unknown else None
+
+
+def _validate_children(applicant, children, errors):
+    updates, creates, deletes = {}, {}, {}
+    for relation, changes in children.items():
+        model = CHILD_RELATIONS.get(relation)
+        if model is None or not isinstance(changes, dict):
+            errors[relation] = 'Unknown child relation.'
+            continue
+        rows = changes.get('update', [])
+        if not all(isinstance(row, dict) for row in [*rows, *changes.get('create', [])]):
+            errors[relation] = 'Expected objects of field values.'
+            continue
+        wanted = {str(row.get('id')) for row in rows} | {str(pk) for pk in changes.get('delete', [])}
+        owned = {str(pk): child for pk, child in model.objects.filter(applicant=applicant, pk__in=[
+            pk for pk in wanted if pk.isdigit()
+        ]).in_bulk().items()}
+        if wanted - set(owned):
+            errors[relation] = f"Unknown {model._meta.verbose_name} id(s): {', '.join(sorted(wanted - set(owned)))}."
+            continue
+
+        fields = set()
+        instances = []
+        for row in rows:
+            if error := _unknown_fields(model, row):
+                errors.setdefault(relation, {})[str(row['id'])] = error
+                continue
+            names = tuple(sorted(name for name in row if name != 'id'))
+            form = _child_form_class(model, names)(form_data(row), instance=owned[str(row['id'])])
+            if form.is_valid():
+                instances.append(form.save(commit=False))
+                fields.update(names)
+            else:
+                errors.setdefault(relation, {})[str(row['id'])] = form.errors.get_json_data()
+        if instances and fields:
+            updates[model] = (instances, sorted(fields))
+
+        for index, row in enumerate(changes.get('create', [])):
+            if error := _unknown_fields(model, row):
+                errors.setdefault(relation, {})[f'new-{index}'] = error
+                continue
+            form = _child_form_class(model)(form_data(row))
+            if form.is_valid():
+                creates.setdefault(relation, []).append(form.save(commit=False))
+            else:
+                errors.setdefault(relation, {})[f'new-{index}'] = form.errors.get_json_data()
+
+        if changes.get('delete'):
+            deletes[model] = [owned[str(pk)].pk for pk in changes['delete']]
+    return updates, creates, deletes
+
+
+def apply_patch(applicant, version, fields, children, form_class, using=None):
+    """
+    Apply a partial edit: only the given applicant fields (validated with
+    form_class) and the given child rows ({relation: {'update': [...],
+    'create': [...], 'delete': [ids]}}). The applicant row is written with a
+    single UPDATE that also checks and bumps version, so a stale editor gets
+    VersionConflict instead of overwriting newer data. Returns the new version
+    and the ids of created child rows by relation.
+    """
+    using = using or router.db_for_write(Applicant)
+    errors = {}
+    changes = {}
+    job_id = applicant.position_applied_for_id  # Before the form writes the new values onto applicant
+    if fields:
+        form = form_class(form_data(fields), instance=applicant)
+        if form.is_valid():
+            changes = {name: form.cleaned_data[name] for name in fields}
+        else:
+            errors['fields'] = form.errors.get_json_data()
+    updates, creates, deletes = _validate_children(applicant, children or {}, errors)
+    if errors:
+        raise PatchError(errors)
+
+    with transaction.atomic(using=using):
+        updated = Applicant.objects.using(using).filter(pk=applicant.pk, version=version).update(
+            version=F('version') + 1, **changes,
+        )
+        if not updated:
+            raise VersionConflict(Applicant.objects.using(using).values_list('version', flat=True).get(pk=applicant.pk))
+        change_feed.record([applicant], ChangeRecord.UPDATED, ['version', *changes], using)
+        for model, (instances, names) in updates.items():
+            model.objects.using(using).bulk_update(instances, names)
+            change_feed.record(instances, ChangeRecord.UPDATED, names, using)
+        created = {}
+        for relation, instances in creates.items():
+            for instance in instances:
+                instance.applicant_id = applicant.pk
+            CHILD_RELATIONS[relation].objects.using(using).bulk_create(instances)
+            change_feed.record(instances, ChangeRecord.CREATED, using=using)
+            created[relation] = [instance.pk for instance in instances]
+        # QuerySet.delete() sends post_delete, which records the deletions
+        for model, pks in deletes.items():
+            model.objects.using(using).filter(pk__in=pks).delete()
+        if set(changes) & salaries.APPLICANT_SOURCES or EmploymentHistory in updates or 'employment_histories' in creates:
+            salaries.refresh(applicant_ids=[applicant.pk], using=using)
+        # The rollups count the applicant's job, expected salary and education; no refresh_applicant
+        # task is queued for salary or job changes alone. A job left behind is marked too.
+        education_changed = Education in updates or Education in deletes or 'education_records' in creates
+        if set(changes) & salaries.APPLICANT_SOURCES or education_changed:
+            moved = 'position_applied_for' in changes and changes['position_applied_for'].pk != job_id
+            rollups.mark_stale(job_ids=[job_id] if moved else [], applicant_ids=[applicant.pk], using=using)
+
+        # QuerySet.update() and the bulk methods skip the post_save handlers; leave their
+        # work to the task queue rather than repeating it on every autosave
+        search_index = bool(set(changes) & set(search.SEARCH_FIELDS['hrd.applicant']))
+        summary = bool(updates or creates or deletes)
+        duplicates = bool(set(changes) & set(dedup.WEIGHTS))
+        if search_index or summary or duplicates:
+            tasks.enqueue_refresh(
+                applicant.pk, search_index=search_index, summary=summary, duplicates=duplicates, using=using,
+            )
+    return version + 1, created
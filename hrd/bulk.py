@@ -0,0 +1,19 @@
+from django.db import router
+
+from hrd import dedup, rollups, salaries, search, summaries
+from hrd.models import Applicant
+
+
+def applicants_bulk_created(applicants, using=None):
+    """
+    bulk_create() skips model signals; call this with the inserted applicants
+    (children included) to update what the signals would have maintained.
+    """
+    using = using or router.db_for_write(Applicant)
+    search_backend = search.get_backend(using)
+    if search_backend:
+        search_backend.index_objects(applicants, using=using)
+    summaries.refresh([applicant.pk for applicant in applicants], using)
+    salaries.refresh(applicant_ids=[applicant.pk for applicant in applicants], using=using)
+    dedup.check([applicant.pk for applicant in applicants], using)
+    rollups.mark_stale(job_ids={applicant.position_applied_for_id for applicant in applicants}, using=using)
@@ -0,0 +1,121 @@
+import threading
+from collections import Counter
+from typing import Callable, Hashable, Optional, TypeVar
+
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+T = TypeVar('T')
+
+# Hits, misses, sets and invalidations per namespace in this process, see metrics()
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+# Namespaces by name, so one can be looked up (and invalidated) from a signal handler or command
+_namespaces = {}
+
+
+def _count(namespace: str, event: str) -> None:
+    with _metrics_lock:
+        _metrics[namespace, event] += 1
+
+
+class Namespace:
+    """
+    A group of cache entries that expire together. Keys embed a version
+    counter kept in the cache itself; invalidate() bumps it, which orphans
+    every entry of the namespace at once in every process sharing the cache
+    backend (only the calling process with locmem), and the backend evicts
+    the orphans as their TTL runs out.
+    """
+
+    def __init__(self, name: str, timeout: Optional[int] = None, alias: str = 'default'):
+        self.name = name
+        self.timeout = timeout
+        self.alias = alias
+        _namespaces[name] = self
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self) -> str:
+        return f'{self.name}:version'
+
+    def version(self) -> int:
+        return self.cache.get_or_set(self.version_key, 1, timeout=None)
+
+    def key(self, *parts: Hashable) -> str:
+        return ':'.join([self.name, str(self.version())] + ['' if part is None else str(part) for part in parts])
+
+    def get(self, *parts: Hashable):
+        value = self.cache.get(self.key(*parts))
+        _count(self.name, 'miss' if value is None else 'hit')
+        return value
+
+    def set(self, parts: tuple, value, timeout: Optional[int] = None) -> None:
+        self.cache.set(self.key(*parts), value, self.timeout if timeout is None else timeout)
+        _count(self.name, 'set')
+
+    def get_or_set(self, parts: tuple, default: Callable[[], T], timeout: Optional[int] = None) -> T:
+        """The cached value under parts, computing and storing default() on a miss. None is never cached."""
+        value = self.get(*parts)
+        if value is None:
+            value = default()
+            if value is not None:
+                self.set(parts, value, timeout)
+        return value
+
+    def delete(self, *parts: Hashable) -> None:
+        self.cache.delete(self.key(*parts))
+
+    def invalidate(self) -> None:
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.set(self.version_key, 1, timeout=None)
+        _count(self.name, 'invalidation')
+
+
+def namespaces() -> dict:
+    return dict(_namespaces)
+
+
+def metrics() -> dict:
+    """{namespace: {event: count}} for this process, with the hit rate of each namespace."""
+    with _metrics_lock:
+        counts = dict(_metrics)
+    result = {}
+    for (name, event), count in sorted(counts.items()):
+        result.setdefault(name, {})[event] = count
+    for events in result.values():
+        lookups = events.get('hit', 0) + events.get('miss', 0)
+        events['hit_rate'] = round(events.get('hit', 0) / lookups, 3) if lookups else None
+    return result
+
+
+def backend_stats(alias: str = 'default') -> dict:
+    """Size and eviction figures the cache backend itself reports (empty when it reports none)."""
+    cache = caches[alias]
+    if isinstance(cache, RedisCache):
+        client = cache._cache.get_client()
+        stats, memory = client.info('stats'), client.info('memory')
+        return {
+            'keys': client.dbsize(),
+            'evicted_keys': stats.get('evicted_keys'),
+            'expired_keys': stats.get('expired_keys'),
+            'keyspace_hits': stats.get('keyspace_hits'),
+            'keyspace_misses': stats.get('keyspace_misses'),
+            'used_memory': memory.get('used_memory'),
+            'maxmemory': memory.get('maxmemory'),
+        }
+    if isinstance(cache, LocMemCache):
+        # LocMemCache culls 1/CULL_FREQUENCY of its entries, least recently used first, at MAX_ENTRIES
+        return {'keys': len(cache._cache), 'max_entries': cache._max_entries}
+    if isinstance(cache, FileBasedCache):
+        # FileBasedCache culls 1/CULL_FREQUENCY of its files once MAX_ENTRIES is reached
+        return {'keys': len(cache._list_cache_files()), 'max_entries': cache._max_entries}
+    return {}
@@ -0,0 +1,153 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Exists, Max, Min, OuterRef
+from django.utils import timezone
+
+from hrd.models import (
+    Applicant, ApplicantReference, ChangeCursor, ChangeRecord, Education, EmploymentHistory, Family, Job, Organization,
+    Submission,
+)
+
+# Models whose writes are recorded; save() and delete() through the signals in hrd.signals,
+# bulk methods and QuerySet.update() by their callers
+TRACKED_MODELS = (Job, Applicant, EmploymentHistory, Education, Family, Organization, ApplicantReference, Submission)
+
+
+def _change(instance, action, fields):
+    return ChangeRecord(
+        model=instance._meta.label_lower,
+        object_id=instance.pk,
+        applicant_id=instance.pk if isinstance(instance, Applicant) else getattr(instance, 'applicant_id', None),
+        action=action,
+        fields=sorted(fields),
+    )
+
+
+def record(instances, action, fields=(), using=None):
+    """
+    Add a change record for each instance with one INSERT. Call it inside the
+    transaction that wrote the instances, so the records commit or roll back
+    with them. Returns the number recorded.
+    """
+    changes = [_change(instance, action, fields) for instance in instances]
+    if changes:
+        ChangeRecord.objects.using(using or router.db_for_write(ChangeRecord)).bulk_create(changes)
+    return len(changes)
+
+
+def read(after=0, limit=500, using=None):
+    """
+    Up to `limit` change records with an id above `after`, oldest first.
+    Ids are taken when a row is inserted but become visible when its
+    transaction commits, so a missing id may still appear: the batch stops
+    at a gap until the record after it is CHANGE_FEED_GAP_WAIT seconds old.
+    """
+    using = using or router.db_for_write(ChangeRecord)
+    changes = list(ChangeRecord.objects.using(using).filter(pk__gt=after).order_by('pk')[:limit])
+    settled = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_GAP_WAIT)
+    expected = after + 1
+    for index, change in enumerate(changes):
+        if change.pk != expected and change.created_at > settled:
+            return changes[:index]
+        expected = change.pk + 1
+    return changes
+
+
+def consume(name, handler, batch_size=500, models=None, using=None):
+    """
+    Pass the records after consumer `name`'s cursor to handler(records),
+    batch by batch, optionally only those of the given model labels. The
+    cursor moves past a batch in the same transaction as the handler, so
+    derived data the handler writes to this database is updated exactly once
+    per change, and a handler that raises leaves the cursor where it was.
+    Returns the number of records read.
+    """
+    using = using or router.db_for_write(ChangeCursor)
+    ChangeCursor.objects.using(using).get_or_create(name=name)
+    total = 0
+    while True:
+        with transaction.atomic(using=using):
+            # Locked, so two processes running the same consumer take turns
+            cursor = ChangeCursor.objects.using(using).select_for_update().get(name=name)
+            changes = read(cursor.position, batch_size, using)
+            if not changes:
+                return total
+            batch = [change for change in changes if models is None or change.model in models]
+            if batch:
+                handler(batch)
+            cursor.position = changes[-1].pk
+            cursor.save(update_fields=['position', 'updated_at'])
+        total += len(changes)
+
+
+def latest(changes, model):
+    """
+    (ids saved, ids deleted) of one model label in a batch, each object
+    judged by its last record, for consumers that re-read current rows.
+    """
+    actions = {change.object_id: change.action for change in changes if change.model == model}
+    saved = {pk for pk, action in actions.items() if action != ChangeRecord.DELETED}
+    return saved, set(actions) - saved
+
+
+def applicant_ids(changes):
+    """Applicants created, changed or deleted, or whose child records were, in a batch."""
+    return {change.applicant_id for change in changes if change.applicant_id is not None}
+
+
+def _fold(superseded, newest, using):
+    """
+    Carry what the superseded records said into the last record of each
+    object: the union of the fields written (empty, "any", if one of them is)
+    and a creation, so a consumer reading only the survivor misses nothing.
+    """
+    merged = {}
+    for model, object_id, action, fields in superseded.values_list('model', 'object_id', 'action', 'fields'):
+        created, names = merged.get((model, object_id), (False, set()))
+        if names is not None:
+            names = names | set(fields) if fields else None
+        merged[(model, object_id)] = (created or action == ChangeRecord.CREATED, names)
+    by_model = {}
+    for model, object_id in merged:
+        by_model.setdefault(model, []).append(object_id)
+    for model, object_ids in by_model.items():
+        for start in range(0, len(object_ids), 500):
+            chunk = object_ids[start:start + 500]
+            last = (
+                ChangeRecord.objects.using(using).filter(model=model, object_id__in=chunk, pk__lte=newest)
+                .values('object_id').annotate(last=Max('pk')).values('last')
+            )
+            survivors = list(ChangeRecord.objects.using(using).filter(pk__in=last))
+            for survivor in survivors:
+                created, names = merged[(model, survivor.object_id)]
+                survivor.fields = [] if names is None or not survivor.fields else sorted(names | set(survivor.fields))
+                if created and survivor.action == ChangeRecord.UPDATED:
+                    survivor.action = ChangeRecord.CREATED
+            ChangeRecord.objects.using(using).bulk_update(survivors, ['action', 'fields'])
+
+
+def compact(retention_days=None, using=None):
+    """
+    Delete the records older than the retention period that every consumer
+    has read, and of the older ones still unread, all but the last record of
+    each object, which takes over their fields and creation (see _fold()).
+    Returns the number deleted.
+    """
+    using = using or router.db_for_write(ChangeRecord)
+    days = settings.CHANGE_FEED_RETENTION_DAYS if retention_days is None else retention_days
+    old = ChangeRecord.objects.using(using).filter(created_at__lt=timezone.now() - timedelta(days=days))
+    slowest = ChangeCursor.objects.using(using).aggregate(position=Min('position'))['position']
+    read_by_all = old if slowest is None else old.filter(pk__lte=slowest)
+    with transaction.atomic(using=using):
+        deleted, _ = read_by_all.delete()
+        # Records written meanwhile are left for the next run, so the survivors stay the last records
+        newest = ChangeRecord.objects.using(using).aggregate(newest=Max('pk'))['newest'] or 0
+        later = ChangeRecord.objects.using(using).filter(
+            model=OuterRef('model'), object_id=OuterRef('object_id'), pk__gt=OuterRef('pk'), pk__lte=newest,
+        )
+        superseded = old.filter(Exists(later))
+        _fold(superseded, newest, using)
+        superseded, _ = superseded.delete()
+    return deleted + superseded
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.core.exceptions import ImproperlyConfigured
+
+
+def shared_cache_aliases():
+    # Caches whose entries other processes must see: namespaces invalidated on writes
+    # (job board, permissions, filter counts), and application drafts, whose next step
+    # may be served by another worker
+    return {'default', settings.APPLICATION_DRAFT_CACHE}
+
+
+def per_process_caches():
+    """Aliases of shared_cache_aliases() configured with the per-process locmem backend."""
+    return sorted(
+        alias for alias in shared_cache_aliases()
+        if settings.CACHES.get(alias, {}).get('BACKEND') == 'django.core.cache.backends.locmem.LocMemCache'
+    )
+
+
+def require_shared_caches(workers):
+    """Refuse to serve from several processes with caches each of them would keep to itself."""
+    aliases = per_process_caches()
+    if workers > 1 and aliases:
+        raise ImproperlyConfigured(
+            f"{workers} workers cannot share the per-process cache(s) {', '.join(aliases)}: permission, job board "
+            "and filter count changes would only reach the worker that made them, and application drafts "
+            "would be lost between steps. Set CACHE_URL to filecache:// or redis://, or WEB_CONCURRENCY=1."
+        )
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    return [
+        Warning(
+            f"The {alias!r} cache is per process (locmemcache://).",
+            hint="Set CACHE_URL to a shared backend unless the site runs as a single process; "
+                 "gunicorn.conf.py refuses to start several workers with it.",
+            id='hrd.W001',
+        )
+        for alias in per_process_caches()
+    ]
@@ -0,0 +1,9 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    # Timeout and version for {% cache %} blocks; templates add the language and any data version
+    return {
+        'fragment_cache_timeout': settings.TEMPLATE_FRAGMENT_TIMEOUT,
+        'fragment_cache_version': settings.TEMPLATE_FRAGMENT_VERSION,
+    }
@@ -0,0 +1,292 @@
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+
+from hrd import changes, salaries, summaries
+from hrd.models import (
+    Applicant, ApplicantReference, ChangeRecord, DedupKey, DuplicateCandidate, Education, EmploymentHistory, Family,
+    Organization, Submission,
+)
+
+# Applicant fields that identify a person, and their weight in the similarity score
+WEIGHTS = {
+    'name': 0.4,
+    'mobile_phone': 0.3,
+    'date_of_birth': 0.2,
+    'place_of_birth': 0.1,
+}
+PERSON_FIELDS = ['pk', *WEIGHTS]
+
+# Child relations moved to the kept applicant by merge()
+CHILD_MODELS = (EmploymentHistory, Education, Family, Organization, ApplicantReference, Submission)
+
+# Trailing digits of a phone number used as a blocking key
+PHONE_SUFFIX = 8
+
+SOUNDEX_CODES = {
+    letter: digit
+    for digit, letters in (('1', 'bfpv'), ('2', 'cgjkqsxz'), ('3', 'dt'), ('4', 'l'), ('5', 'mn'), ('6', 'r'))
+    for letter in letters
+}
+
+# Applicant ids saved in the current transaction, per thread and database alias
+_pending = threading.local()
+
+
+def normalize_name(value):
+    # Lower case ASCII letters only, accents dropped, one space between words
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode().lower()
+    return ' '.join(''.join(char if char.isalpha() else ' ' for char in value).split())
+
+
+def normalize_phone(value):
+    digits = ''.join(char for char in value or '' if char.isdigit())
+    if settings.DEDUP_COUNTRY_CODE and digits.startswith(settings.DEDUP_COUNTRY_CODE):
+        digits = '0' + digits[len(settings.DEDUP_COUNTRY_CODE):]
+    return digits
+
+
+def soundex(word):
+    """American Soundex code of a word ('' for a word without letters)."""
+    word = normalize_name(word).replace(' ', '')
+    if not word:
+        return ''
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0])
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def person(pk, name, mobile_phone, date_of_birth, place_of_birth):
+    """Normalized identifying fields of an applicant, as compared and blocked on."""
+    words = normalize_name(name).split()
+    return {
+        'pk': pk,
+        'name': ' '.join(sorted(words)),  # Word order varies between forms
+        'words': words,
+        'mobile_phone': normalize_phone(mobile_phone),
+        'date_of_birth': date_of_birth,
+        'place_of_birth': normalize_name(place_of_birth),
+    }
+
+
+def blocking_keys(person):
+    """
+    Keys under which a person is filed: the phone suffix, the birth date with
+    the first name's sound, and the sound of first and last name with the
+    birth year. A typo in any one field still leaves the other keys shared.
+    """
+    keys = set()
+    if len(person['mobile_phone']) >= PHONE_SUFFIX:
+        keys.add(f"phone:{person['mobile_phone'][-PHONE_SUFFIX:]}")
+    words = person['words']
+    if words and person['date_of_birth']:
+        keys.add(f"dob:{person['date_of_birth'].isoformat()}:{soundex(words[0])}")
+        keys.add(f"name:{soundex(words[0])}{soundex(words[-1]) if len(words) > 1 else ''}:{person['date_of_birth'].year}")
+    return keys
+
+
+def _ratio(a, b):
+    if not a or not b:
+        return 0.0
+    return 1.0 if a == b else SequenceMatcher(None, a, b).ratio()
+
+
+def _edit_similarity(a, b):
+    # 1 - Levenshtein distance / length; unlike _ratio, unrelated digit strings score low
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+
+def _date_similarity(a, b):
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    # Day and month swapped, or a single part mistyped
+    if (a.day, a.month, a.year) == (b.month, b.day, b.year) or sum(x != y for x, y in zip((a.year, a.month, a.day), (b.year, b.month, b.day))) == 1:
+        return 0.5
+    return 0.0
+
+
+def compare(a, b):
+    """Weighted similarity of two people from person(), with the similarity of each field."""
+    details = {
+        # Sorted words match reordered names, the words as typed survive a typo that reorders them
+        'name': max(_ratio(a['name'], b['name']), _ratio(' '.join(a['words']), ' '.join(b['words']))),
+        'mobile_phone': _edit_similarity(a['mobile_phone'], b['mobile_phone']),
+        'date_of_birth': _date_similarity(a['date_of_birth'], b['date_of_birth']),
+        'place_of_birth': _ratio(a['place_of_birth'], b['place_of_birth']),
+    }
+    score = sum(WEIGHTS[field] * similarity for field, similarity in details.items())
+    return round(score, 3), {field: round(similarity, 3) for field, similarity in details.items()}
+
+
+def _best_possible(a, b):
+    # Score if every string field matched: pairs below the threshold skip the string comparisons
+    return 1 - WEIGHTS['date_of_birth'] * (1 - _date_similarity(a['date_of_birth'], b['date_of_birth']))
+
+
+def _people(queryset):
+    return {row[0]: person(*row) for row in queryset.values_list(*PERSON_FIELDS)}
+
+
+def _pairs(blocks, among=None):
+    # Unordered pairs of applicants sharing a block; with `among`, only pairs involving one of those applicants
+    pairs = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > settings.DEDUP_MAX_BLOCK:
+            continue
+        for a, b in combinations(sorted(members), 2):
+            if among is None or a in among or b in among:
+                pairs.add((a, b))
+    return pairs
+
+
+def _record(pairs, people, using, scope=None):
+    """
+    Score the pairs and store those over the threshold; candidates already
+    dismissed keep their status. Open candidates in `scope` (a Q over
+    DuplicateCandidate) that no longer match are removed. Returns the count stored.
+    """
+    found = []
+    for a, b in pairs:
+        if _best_possible(people[a], people[b]) < settings.DEDUP_THRESHOLD:
+            continue
+        score, details = compare(people[a], people[b])
+        if score >= settings.DEDUP_THRESHOLD:
+            found.append(DuplicateCandidate(applicant_id=a, duplicate_id=b, score=score, details=details))
+    DuplicateCandidate.objects.using(using).bulk_create(
+        found, update_conflicts=True, unique_fields=['applicant', 'duplicate'], update_fields=['score', 'details'],
+    )
+    if scope is not None:
+        matched = {(candidate.applicant_id, candidate.duplicate_id) for candidate in found}
+        outdated = [
+            pk for pk, a, b in
+            DuplicateCandidate.objects.using(using).filter(scope, status=DuplicateCandidate.OPEN).values_list('pk', 'applicant_id', 'duplicate_id')
+            if (a, b) not in matched
+        ]
+        if outdated:
+            DuplicateCandidate.objects.using(using).filter(pk__in=outdated).delete()
+    return len(found)
+
+
+def check(applicant_ids, using=None):
+    """
+    Re-file the given applicants under their blocking keys and compare each of
+    them with the other members of its blocks. Returns the candidates found.
+    """
+    using = using or router.db_for_write(DedupKey)
+    people = _people(Applicant.objects.using(using).filter(pk__in=list(applicant_ids)))
+    if not people:
+        return 0
+    keys = {pk: blocking_keys(entry) for pk, entry in people.items()}
+    with transaction.atomic(using=using):
+        DedupKey.objects.using(using).filter(applicant__in=list(people)).delete()
+        DedupKey.objects.using(using).bulk_create(
+            [DedupKey(applicant_id=pk, key=key) for pk, applicant_keys in keys.items() for key in applicant_keys]
+        )
+        blocks = {}
+        for key, applicant_id in DedupKey.objects.using(using).filter(key__in=set().union(*keys.values())).values_list('key', 'applicant_id'):
+            blocks.setdefault(key, set()).add(applicant_id)
+        pairs = _pairs(blocks, among=people)
+        others = {pk for pair in pairs for pk in pair} - set(people)
+        if others:
+            people.update(_people(Applicant.objects.using(using).filter(pk__in=others)))
+        return _record(pairs, people, using, scope=Q(applicant__in=list(keys)) | Q(duplicate__in=list(keys)))
+
+
+def rebuild(batch_size=2_000, using=None, progress=None):
+    """
+    Batch mode: re-file every applicant and compare the members of every block.
+    Work grows with the number of applicants plus the pairs inside blocks,
+    not with the square of the pool. Returns (applicants, pairs compared, candidates).
+    """
+    using = using or router.db_for_write(DedupKey)
+    people = {}
+    blocks = {}
+    with transaction.atomic(using=using):
+        DedupKey.objects.using(using).all().delete()
+        batch = []
+        rows = Applicant.objects.using(using).order_by('pk').values_list(*PERSON_FIELDS)
+        for row in rows.iterator(chunk_size=batch_size):
+            entry = people[row[0]] = person(*row)
+            for key in blocking_keys(entry):
+                blocks.setdefault(key, []).append(row[0])
+                batch.append(DedupKey(applicant_id=row[0], key=key))
+            if len(batch) >= batch_size:
+                DedupKey.objects.using(using).bulk_create(batch)
+                batch = []
+                if progress:
+                    progress(len(people))
+        DedupKey.objects.using(using).bulk_create(batch)
+        pairs = _pairs(blocks)
+        found = _record(pairs, people, using, scope=Q())
+    if progress:
+        progress(len(people))
+    return len(people), len(pairs), found
+
+
+def mark_changed(applicant_id, using):
+    """Check an applicant for duplicates once the current transaction commits."""
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = {}
+    _pending.ids.setdefault(using, set()).add(applicant_id)
+    transaction.on_commit(lambda: _flush(using), using=using)
+
+
+def _flush(using):
+    applicant_ids = _pending.ids.pop(using, None)
+    if applicant_ids:
+        check(applicant_ids, using)
+
+
+def merge(keep, drop, using=None):
+    """
+    Merge `drop` into `keep`: move the child records of all six relations with
+    one UPDATE per table, fill keep's empty fields from drop, then delete drop.
+    Returns the number of child records moved.
+    """
+    if keep.pk == drop.pk:
+        raise ValueError("An applicant cannot be merged into itself")
+    using = using or router.db_for_write(Applicant)
+    with transaction.atomic(using=using):
+        moved = []
+        for model in CHILD_MODELS:
+            pks = list(model.objects.using(using).filter(applicant=drop).values_list('pk', flat=True))
+            if pks:
+                model.objects.using(using).filter(pk__in=pks).update(applicant=keep)
+                moved += [model(pk=pk, applicant_id=keep.pk) for pk in pks]
+        for field in Applicant._meta.concrete_fields:
+            if field.editable and not field.primary_key and getattr(keep, field.attname) in (None, '') and getattr(drop, field.attname) not in (None, ''):
+                setattr(keep, field.attname, getattr(drop, field.attname))
+        keep.version += 1  # Editors with the old version token must reload
+        drop.delete(using=using)
+        keep.save(using=using)
+        # update() sends no signals for the moved children
+        summaries.mark_dirty(keep.pk, using)
+        changes.record(moved, ChangeRecord.UPDATED, ['applicant'], using)
+        # The moved employment history is now in the currency of keep's job
+        salaries.refresh(applicant_ids=[keep.pk], using=using)
+    return len(moved)
@@ -0,0 +1,155 @@
+import csv
+import datetime
+import io
+import json
+import tempfile
+from decimal import Decimal
+
+from django.db.models import Count, Max
+
+from hrd.importer import CHILD_RELATIONS, applicant_field_names, child_field_names
+from hrd.models import Applicant
+
+# Columns match what import_applicants reads back: applicant fields as in
+# ApplicantForm (plus id), children nested under their related_name in JSON
+# and as <related_name>__<n>__<field> columns in flat formats.
+APPLICANT_FIELDS = ['id'] + applicant_field_names()
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+FORMATS = tuple(CONTENT_TYPES)
+
+
+def _attnames(model, names):
+    return [(name, model._meta.get_field(name).attname) for name in names]
+
+
+APPLICANT_ATTNAMES = _attnames(Applicant, APPLICANT_FIELDS)
+CHILD_ATTNAMES = {relation: _attnames(model, child_field_names(model)) for relation, model in CHILD_RELATIONS.items()}
+
+
+def to_value(value, flat):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, list):
+        return ','.join(value) if flat else list(value)
+    return value
+
+
+def iter_applicants(queryset, chunk_size=2_000):
+    """
+    Iterate applicants with their six child relations, fetching chunk_size
+    applicants at a time (a server-side cursor where the database supports it)
+    and prefetching the children once per chunk.
+    """
+    return queryset.prefetch_related(*CHILD_RELATIONS).iterator(chunk_size=chunk_size)
+
+
+def applicant_record(applicant, flat=False):
+    record = {name: to_value(getattr(applicant, attname), flat) for name, attname in APPLICANT_ATTNAMES}
+    for relation, attnames in CHILD_ATTNAMES.items():
+        record[relation] = [
+            {name: to_value(getattr(child, attname), flat) for name, attname in attnames}
+            for child in getattr(applicant, relation).all()
+        ]
+    return record
+
+
+def max_children(queryset):
+    """Largest number of rows any applicant in queryset has per relation, which sizes the flat columns."""
+    applicants = queryset.order_by().values('pk')
+    counts = {}
+    for relation, model in CHILD_RELATIONS.items():
+        counts[relation] = (
+            model.objects.using(queryset.db).filter(applicant__in=applicants)
+            .values('applicant').annotate(total=Count('pk')).order_by()
+            .aggregate(most=Max('total'))['most'] or 0
+        )
+    return counts
+
+
+def flat_header(counts):
+    header = list(APPLICANT_FIELDS)
+    for relation, attnames in CHILD_ATTNAMES.items():
+        for index in range(1, counts[relation] + 1):
+            header.extend(f'{relation}__{index}__{name}' for name, _ in attnames)
+    return header
+
+
+def flat_row(record, counts):
+    row = [record[name] for name in APPLICANT_FIELDS]
+    for relation, attnames in CHILD_ATTNAMES.items():
+        children = record[relation]
+        for index in range(counts[relation]):
+            child = children[index] if index < len(children) else {}
+            row.extend(child.get(name) for name, _ in attnames)
+    return row
+
+
+def iter_csv(queryset, chunk_size=2_000):
+    # The BOM goes out before the column-sizing queries so the client gets a first byte
+    # right away; it also makes Excel read the file as UTF-8. Rows are then yielded once per chunk.
+    yield '\ufeff'
+    counts = max_children(queryset)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(flat_header(counts))
+    for position, applicant in enumerate(iter_applicants(queryset, chunk_size), start=1):
+        writer.writerow(flat_row(applicant_record(applicant, flat=True), counts))
+        if position % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(queryset, chunk_size=2_000):
+    lines = []
+    for applicant in iter_applicants(queryset, chunk_size):
+        lines.append(json.dumps(applicant_record(applicant)))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _workbook_class():
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Writing .xlsx files requires openpyxl (pip install openpyxl)")
+    return Workbook
+
+
+def write_xlsx(queryset, fp, chunk_size=2_000):
+    # openpyxl's write-only mode keeps memory flat regardless of the number of rows
+    workbook = _workbook_class()(write_only=True)
+    counts = max_children(queryset)
+    sheet = workbook.create_sheet('Applicants')
+    sheet.append(flat_header(counts))
+    for applicant in iter_applicants(queryset, chunk_size):
+        sheet.append(flat_row(applicant_record(applicant, flat=True), counts))
+    workbook.save(fp)
+
+
+def iter_xlsx(queryset, chunk_size=2_000, block_size=64 * 1024):
+    """
+    A workbook is a zip archive that can only be sent once complete, so it is
+    built in a temporary file and streamed from there. Raises RuntimeError up
+    front when openpyxl is missing.
+    """
+    _workbook_class()
+
+    def blocks():
+        with tempfile.TemporaryFile() as fp:
+            write_xlsx(queryset, fp, chunk_size)
+            fp.seek(0)
+            yield from iter(lambda: fp.read(block_size), b'')
+    return blocks()
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+from hrd import caching
+from hrd.models import ChangeRecord
+
+# Counts of the admin list filters, per model and user scope (see counts())
+facet_cache = caching.Namespace('admin_facets', settings.FACET_CACHE_TIMEOUT)
+
+# Change feed models whose writes can move the counts of each model's facets; education
+# level facets read ApplicantSummary, which follows the applicant's education records
+SOURCES = {
+    'hrd.applicant': ['hrd.applicant', 'hrd.education'],
+    'hrd.job': ['hrd.job'],
+}
+
+
+def compute(queryset, facets):
+    """
+    {'total': rows, 'facets': {field path: {value: rows}}} for facets given as
+    {field path: values}, with one conditional COUNT per value in a single query.
+    """
+    aggregates = {'total': Count('pk')}
+    names = {}
+    for path, values in facets.items():
+        for value in values:
+            name = f'facet_{len(names)}'
+            names[name] = (path, value)
+            aggregates[name] = Count('pk', filter=Q(**{path: value}))
+    row = queryset.order_by().aggregate(**aggregates)
+    result = {'total': row['total'], 'facets': {path: {} for path in facets}}
+    for name, (path, value) in names.items():
+        result['facets'][path][value] = row[name]
+    return result
+
+
+def counts(queryset, facets, scope):
+    """
+    compute() for a queryset that depends only on `scope` (e.g. the records a
+    user may see). Cached with the last change record id read before counting,
+    and reused until the change feed has a newer record of one of the model's
+    SOURCES; FACET_CACHE_TIMEOUT bounds what the feed can miss (writes
+    committing out of id order, summaries refreshed after the commit).
+    """
+    label = queryset.model._meta.label_lower
+    changes = ChangeRecord.objects.using(queryset.db)
+    cached = facet_cache.get(label, scope)
+    if cached is not None:
+        position, result = cached
+        if not changes.filter(pk__gt=position, model__in=SOURCES[label]).exists():
+            return result
+    position = changes.aggregate(position=Max('pk'))['position'] or 0
+    result = compute(queryset, facets)
+    facet_cache.set((label, scope), (position, result))
+    return result
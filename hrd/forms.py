@@ -53,4 +53,21 @@ class ApplicantForm(forms.ModelForm):
             'business_type': forms.RadioSelect,  # Render the field as radio buttons
             'living_situation': forms.RadioSelect,  # Render the field as radio buttons
             'sex': forms.RadioSelect,  # Render the field as radio buttons
-        }
\ No newline at end of file
+        }
+
+
+class ApplicantImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV, XLSX, JSON or JSON Lines. Child records go in nested lists (JSON) or "
+                                     "columns such as education_records__1__school_name (CSV/XLSX).")
+    batch_size = forms.IntegerField(min_value=1, max_value=10_000, initial=1_000, help_text="Applicants inserted per transaction")
+    dry_run = forms.BooleanField(required=False, help_text="Only validate the file")
+
+    def clean_file(self):
+        from hrd import importer  # hrd.importer imports ApplicantForm from this module
+
+        file = self.cleaned_data['file']
+        try:
+            importer.detect_format(file.name)
+        except importer.ImportFormatError as error:
+            raise forms.ValidationError(str(error))
+        return file
@@ -0,0 +1,326 @@
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import time
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction, router
+from django.forms import modelform_factory
+
+from hrd import changes
+from hrd.bulk import applicants_bulk_created
+from hrd.forms import ApplicantForm
+from hrd.models import Applicant, EmploymentHistory, Education, Family, Organization, ApplicantReference, Submission, Job, ChangeRecord
+
+# Child relations by Applicant related_name. Nested formats (JSON) use these keys
+# for lists of child objects; flat formats (CSV/XLSX) use columns named
+# <related_name>__<n>__<field>, e.g. education_records__1__school_name.
+CHILD_RELATIONS = {
+    'employment_histories': EmploymentHistory,
+    'education_records': Education,
+    'family_members': Family,
+    'organizations': Organization,
+    'references': ApplicantReference,
+    'submissions': Submission,
+}
+
+FLAT_CHILD_COLUMN = re.compile(r'^(?P<relation>[a-z_]+?)__(?P<index>\d+)__(?P<field>[a-z_]+)$')
+
+FALSE_VALUES = {'no', 'n', 'false', 'f', '0', 'tidak'}
+
+FORMATS = ('csv', 'xlsx', 'json', 'jsonl')
+
+
+def applicant_field_names():
+    return list(ApplicantForm.base_fields)
+
+
+def child_field_names(model):
+    return list(modelform_factory(model, exclude=['applicant']).base_fields)
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    extension = {'ndjson': 'jsonl', 'xlsm': 'xlsx'}.get(extension, extension)
+    if extension not in FORMATS:
+        raise ImportFormatError(f"Unsupported file type '.{extension}', expected one of: {', '.join(FORMATS)}")
+    return extension
+
+
+# Readers: each yields (row_number, dict) pairs without loading the whole file
+
+def read_csv(fp):
+    for row_number, row in enumerate(csv.DictReader(fp), start=2):
+        yield row_number, row
+
+
+def read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("Reading .xlsx files requires openpyxl (pip install openpyxl)")
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for row_number, values in enumerate(rows, start=2):
+            if any(value not in (None, '') for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_jsonl(fp):
+    for row_number, line in enumerate(fp, start=1):
+        if line.strip():
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                raise ImportFormatError(f"Line {row_number}: {error}")
+
+
+def read_json(fp, chunk_size=64 * 1024):
+    # Incrementally decode a top-level JSON array, one element at a time
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    row_number = 0
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started:
+            if buffer:
+                if buffer[0] != '[':
+                    raise ImportFormatError("Expected a JSON array of applicants")
+                buffer = buffer[1:]
+                started = True
+                continue
+        elif buffer.startswith(']'):
+            return
+        elif buffer.startswith(','):
+            buffer = buffer[1:]
+            continue
+        elif buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ImportFormatError(f"Malformed JSON after element {row_number}")
+            else:
+                row_number += 1
+                yield row_number, item
+                buffer = buffer[end:]
+                continue
+        if eof:
+            raise ImportFormatError("Unexpected end of JSON input")
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+def read_rows(path, file_format=None):
+    file_format = file_format or detect_format(path)
+    if file_format == 'xlsx':
+        yield from read_xlsx(path)
+        return
+    with open(path, encoding='utf-8-sig', newline='') as fp:
+        yield from {'csv': read_csv, 'json': read_json, 'jsonl': read_jsonl}[file_format](fp)
+
+
+def read_upload(uploaded_file, file_format=None):
+    file_format = file_format or detect_format(uploaded_file.name)
+    if file_format == 'xlsx':
+        # openpyxl wants a path or a seekable binary file
+        yield from read_xlsx(uploaded_file.file)
+        return
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    yield from {'csv': read_csv, 'json': read_json, 'jsonl': read_jsonl}[file_format](text)
+
+
+def nest_flat_row(row):
+    """Split flat <relation>__<n>__<field> columns into lists of child dicts."""
+    applicant = {}
+    children = {}
+    for column, value in row.items():
+        match = FLAT_CHILD_COLUMN.match(column or '')
+        if match and match['relation'] in CHILD_RELATIONS:
+            children.setdefault(match['relation'], {}).setdefault(int(match['index']), {})[match['field']] = value
+        else:
+            applicant[column] = value
+    for relation, by_index in children.items():
+        applicant[relation] = [by_index[index] for index in sorted(by_index)]
+    return applicant
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+class RowValidator:
+    """
+    Validates rows with the same field rules as ApplicantForm (and model forms
+    for the children), but builds the form fields once instead of a bound form
+    per row. Jobs are resolved from an in-memory map instead of a query per row.
+    """
+
+    def __init__(self, using=None):
+        self.applicant_fields = ApplicantForm().fields
+        self.child_fields = {
+            relation: modelform_factory(model, exclude=['applicant']).base_fields
+            for relation, model in CHILD_RELATIONS.items()
+        }
+        self.jobs_by_pk = Job.objects.using(using).in_bulk()
+        self.jobs_by_title = {job.title.strip().lower(): job for job in self.jobs_by_pk.values()}
+
+    def clean_field(self, field, value):
+        if _blank(value):
+            value = None
+        elif isinstance(field, forms.BooleanField) and isinstance(value, str):
+            value = value.strip().lower() not in FALSE_VALUES
+        elif isinstance(field, forms.MultipleChoiceField) and isinstance(value, str):
+            value = [item.strip() for item in re.split(r'[,;]', value) if item.strip()]
+        elif isinstance(field, forms.DateField) and isinstance(value, str):
+            # ISO dates are the norm in files; skip DateField's strptime loop over input formats
+            try:
+                value = datetime.date.fromisoformat(value.strip())
+            except ValueError:
+                value = value.strip()
+        elif isinstance(value, str):
+            value = value.strip()
+        if isinstance(field, forms.MultipleChoiceField) and value is None:
+            value = []
+        return field.clean(value)
+
+    def clean_job(self, value):
+        if _blank(value):
+            raise ValidationError('This field is required.')
+        value = str(value).strip()
+        job = self.jobs_by_pk.get(int(value)) if value.isdigit() else None
+        job = job or self.jobs_by_title.get(value.lower())
+        if job is None:
+            raise ValidationError(f"Unknown job '{value}'.")
+        return job
+
+    def clean_fields(self, fields, data, prefix=''):
+        cleaned = {}
+        errors = []
+        for name, field in fields.items():
+            try:
+                if name == 'position_applied_for':
+                    cleaned[name] = self.clean_job(data.get(name))
+                else:
+                    cleaned[name] = self.clean_field(field, data.get(name))
+            except ValidationError as error:
+                errors.extend(f'{prefix}{name}: {message}' for message in error.messages)
+        return cleaned, errors
+
+    def validate(self, row):
+        """Return (applicant kwargs, {relation: [child kwargs]}, errors) for one row."""
+        if not isinstance(row, dict):
+            return None, None, ['Row is not an object.']
+        if not any(isinstance(row.get(relation), list) for relation in CHILD_RELATIONS):
+            row = nest_flat_row(row)
+
+        applicant, errors = self.clean_fields(self.applicant_fields, row)
+        children = {}
+        for relation, fields in self.child_fields.items():
+            children[relation] = []
+            for index, child in enumerate(row.get(relation) or [], start=1):
+                if not isinstance(child, dict) or all(_blank(value) for value in child.values()):
+                    continue
+                cleaned, child_errors = self.clean_fields(fields, child, prefix=f'{relation}[{index}].')
+                errors.extend(child_errors)
+                children[relation].append(cleaned)
+        return applicant, children, errors
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.errors = []  # (row_number, message)
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def failed(self):
+        return len({row_number for row_number, _ in self.errors})
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class ApplicantImporter:
+    """
+    Validate rows and insert applicants and their children with bulk_create,
+    batch_size applicants per transaction. Invalid rows are skipped and
+    reported; valid rows in the same batch are still imported.
+    """
+
+    def __init__(self, user, batch_size=1_000, using=None, dry_run=False, progress=None):
+        self.user = user
+        self.batch_size = batch_size
+        self.using = using or router.db_for_write(Applicant)
+        self.dry_run = dry_run
+        self.progress = progress
+        self.validator = RowValidator(self.using)
+
+    def run(self, rows):
+        result = ImportResult()
+        batch = []
+        for row_number, row in rows:
+            result.rows += 1
+            applicant, children, errors = self.validator.validate(row)
+            if errors:
+                result.errors.extend((row_number, message) for message in errors)
+                continue
+            batch.append((applicant, children))
+            if len(batch) >= self.batch_size:
+                result.imported += self.insert(batch)
+                batch = []
+                self.report_progress(result)
+        if batch:
+            result.imported += self.insert(batch)
+        self.report_progress(result)
+        return result
+
+    def report_progress(self, result):
+        result.elapsed = time.perf_counter() - result.started
+        if self.progress:
+            self.progress(result)
+
+    def insert(self, batch):
+        if self.dry_run:
+            return len(batch)
+        with transaction.atomic(using=self.using):
+            applicants = Applicant.objects.using(self.using).bulk_create(
+                [Applicant(created_by=self.user, **data) for data, _ in batch]
+            )
+            created = list(applicants)
+            for relation, model in CHILD_RELATIONS.items():
+                created += model.objects.using(self.using).bulk_create(
+                    [
+                        model(applicant=applicant, **child)
+                        for applicant, (_, children) in zip(applicants, batch)
+                        for child in children[relation]
+                    ],
+                    batch_size=self.batch_size,
+                )
+            changes.record(created, ChangeRecord.CREATED, using=self.using)
+            applicants_bulk_created(applicants, self.using)
+        return len(applicants)
+
+
+def write_error_report(errors, fp):
+    writer = csv.writer(fp)
+    writer.writerow(['row', 'error'])
+    writer.writerows(errors)
@@ -0,0 +1,46 @@
+import time
+
+from django.db import connections, DEFAULT_DB_ALIAS
+
+
+class QueryCounter:
+    """
+    Count the SQL queries (and the time spent in them) issued on a connection
+    while the context manager is active. Works with DEBUG off, unlike
+    connection.queries.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements.append(sql)
+
+    def __enter__(self):
+        self._wrapper = connections[self.using].execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+
+
+class QueryProfiler(QueryCounter):
+    """QueryCounter that also keeps each statement's parameters, to tell repeated queries from similar ones."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        super().__init__(using)
+        self.params = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.params.append(params)
+        return super().__call__(execute, sql, params, many, context)
@@ -0,0 +1,80 @@
+import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from hrd import caching
+from hrd.models import Job
+
+# Columns the board renders; the long TextFields are left out on purpose
+JOB_BOARD_FIELDS = (
+    'id', 'title', 'employment_type', 'experience_required', 'min_salary', 'max_salary', 'currency',
+    'date_posted', 'application_deadline', 'contact_email',
+)
+
+# Rendered pages and the job choices, all dropped on every Job save/delete (see invalidate())
+board_cache = caching.Namespace('jobboard', settings.JOB_BOARD_CACHE_TIMEOUT)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(job):
+    return f"{job['date_posted'].isoformat()}.{job['id']}"
+
+
+def decode_cursor(cursor):
+    try:
+        date_posted, pk = cursor.split('.')
+        return datetime.date.fromisoformat(date_posted), int(pk)
+    except ValueError:
+        raise InvalidCursor(cursor)
+
+
+def get_page(cursor=None, page_size=None, today=None):
+    """
+    Return one page of open jobs, newest first, using keyset pagination on
+    (date_posted, id) so deep pages cost the same as the first one.
+    """
+    page_size = page_size or settings.JOB_BOARD_PAGE_SIZE
+    queryset = Job.objects.open(today).order_by('-date_posted', '-id')
+    if cursor:
+        date_posted, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(date_posted__lt=date_posted) | Q(date_posted=date_posted, id__lt=pk))
+
+    jobs = list(queryset.values(*JOB_BOARD_FIELDS)[:page_size + 1])
+    has_next = len(jobs) > page_size
+    jobs = jobs[:page_size]
+    labels = dict(Job.EMPLOYMENT_TYPE_CHOICES)
+    for job in jobs:
+        job['employment_type_display'] = labels.get(job['employment_type'], job['employment_type'])
+    return {
+        'jobs': jobs,
+        'next_cursor': encode_cursor(jobs[-1]) if has_next else None,
+    }
+
+
+def active_job_choices():
+    """
+    (pk, title) pairs of active jobs for the "position applied for" select,
+    cached until the next Job save or delete.
+    """
+    return board_cache.get_or_set(
+        cache_parts('active_choices', None),
+        lambda: list(Job.objects.filter(is_active=True).order_by('title', 'pk').values_list('pk', 'title')),
+    )
+
+
+def version():
+    return board_cache.version()
+
+
+def cache_parts(kind, cursor):
+    # The date is part of the key because deadlines are evaluated against today
+    return timezone.localdate().isoformat(), kind, cursor
+
+
+def invalidate():
+    board_cache.invalidate()
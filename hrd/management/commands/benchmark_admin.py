@@ -0,0 +1,172 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test import Client, RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from hrd import synthetic
+from hrd.instrumentation import QueryCounter
+from hrd.models import Applicant
+
+# Per-page budgets: maximum SQL queries and maximum median wall time in milliseconds
+DEFAULT_BUDGETS = {
+    'changelist': (10, 500),
+    'change_form': (15, 1500),
+    'search': (10, 1000),
+    'filter': (10, 500),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load synthetic applicants into a throwaway test database and measure the Applicant admin pages "
+        "(changelist, change form, search and every list filter). Fails when a page goes over its budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=1_000, help="Number of synthetic applicants to load.")
+        parser.add_argument('--jobs', type=int, default=50, help="Number of synthetic jobs to load.")
+        parser.add_argument('--recruiters', type=int, default=5, help="Number of recruiter users owning the applicants.")
+        parser.add_argument('--batch-size', type=int, default=2_000, help="Rows per bulk insert while seeding.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed requests per page; the median is reported.")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database alias whose engine is benchmarked.")
+        parser.add_argument('--keepdb', action='store_true', help="Keep the test database (and its data) between runs.")
+        parser.add_argument('--superuser', action='store_true', help="Browse as a superuser instead of a scoped recruiter.")
+        parser.add_argument(
+            '--budget', action='append', default=[], metavar='PAGE:QUERIES:MS',
+            help="Override a page budget, e.g. changelist:10:300. May be repeated.",
+        )
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this file as JSON.")
+
+    def handle(self, *args, **options):
+        budgets = self.parse_budgets(options['budget'])
+        connection = connections[options['database']]
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        setup_test_environment()
+        try:
+            user = self.prepare_data(options)
+            results = self.run_pages(user, options['repeat'], options['database'])
+        finally:
+            teardown_test_environment()
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        failures = self.report(results, budgets, connection.vendor)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fp:
+                json.dump(results, fp, indent=2)
+        if failures:
+            raise CommandError(f"{len(failures)} page(s) over budget: {', '.join(failures)}")
+
+    def parse_budgets(self, overrides):
+        budgets = dict(DEFAULT_BUDGETS)
+        for override in overrides:
+            try:
+                page, queries, ms = override.split(':')
+                budgets[page] = (int(queries), float(ms))
+            except ValueError:
+                raise CommandError(f"Invalid budget '{override}', expected PAGE:QUERIES:MS")
+        return budgets
+
+    def prepare_data(self, options):
+        existing = Applicant.objects.count()
+        if existing < options['applicants']:
+            started = time.perf_counter()
+
+            def progress(done, total):
+                self.stdout.write(f"\rSeeding applicants: {done}/{total}", ending='')
+                self.stdout.flush()
+
+            synthetic.seed(
+                options['applicants'] - existing,
+                jobs=options['jobs'],
+                recruiters=options['recruiters'],
+                batch_size=options['batch_size'],
+                seed_value=existing,
+                progress=progress,
+            )
+            self.stdout.write(f"\nSeeded in {time.perf_counter() - started:.1f}s")
+
+        if options['superuser']:
+            user, created = User.objects.get_or_create(username='bench-admin', defaults={'is_staff': True, 'is_superuser': True})
+            return user
+        return synthetic.create_recruiters(1)[0]
+
+    def page_urls(self, user):
+        changelist_url = reverse('admin:hrd_applicant_changelist')
+        applicant = Applicant.objects.filter(created_by=user).order_by('pk').first() or Applicant.objects.order_by('pk').first()
+        pages = [
+            ('changelist', 'changelist', changelist_url),
+            ('change_form', 'change_form', reverse('admin:hrd_applicant_change', args=[applicant.pk])),
+            ('search', 'search', f'{changelist_url}?q={applicant.name.split()[0]}'),
+        ]
+
+        # Build one URL per list filter from the filter specs the changelist itself renders
+        request = RequestFactory().get(changelist_url)
+        request.user = user
+        changelist = admin.site._registry[Applicant].get_changelist_instance(request)
+        for spec in changelist.filter_specs:
+            choices = [choice for choice in spec.choices(changelist) if not choice.get('selected')]
+            if choices:
+                pages.append((f'filter:{spec.title}', 'filter', f"{changelist_url}{choices[0]['query_string']}"))
+        return pages
+
+    def run_pages(self, user, repeat, using):
+        client = Client()
+        client.force_login(user)
+        results = []
+        for name, kind, url in self.page_urls(user):
+            response = client.get(url)  # Warm up caches, templates and connections
+            if response.status_code != 200:
+                raise CommandError(f"{name} ({url}) returned HTTP {response.status_code}")
+
+            timings = []
+            for _ in range(max(repeat, 1)):
+                with QueryCounter(using) as queries:
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+            tracemalloc.start()
+            client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results.append({
+                'page': name,
+                'kind': kind,
+                'url': url,
+                'queries': queries.count,
+                'sql_ms': round(queries.duration * 1000, 2),
+                'median_ms': round(statistics.median(timings), 2),
+                'max_ms': round(max(timings), 2),
+                'peak_kib': round(peak / 1024, 1),
+            })
+        return results
+
+    def report(self, results, budgets, vendor):
+        failures = []
+        self.stdout.write(f"\n{'page':<40} {'queries':>8} {'sql ms':>9} {'median ms':>10} {'max ms':>9} {'peak KiB':>10}  status")
+        for result in results:
+            max_queries, max_ms = budgets.get(result['page'], budgets[result['kind']])
+            over = []
+            if result['queries'] > max_queries:
+                over.append(f"queries>{max_queries}")
+            if result['median_ms'] > max_ms:
+                over.append(f"time>{max_ms:g}ms")
+            if over:
+                failures.append(result['page'])
+            status = self.style.ERROR('OVER ' + ', '.join(over)) if over else self.style.SUCCESS('ok')
+            self.stdout.write(
+                f"{result['page']:<40} {result['queries']:>8} {result['sql_ms']:>9} {result['median_ms']:>10} "
+                f"{result['max_ms']:>9} {result['peak_kib']:>10}  {status}"
+            )
+        self.stdout.write(f"Database vendor: {vendor}")
+        return failures
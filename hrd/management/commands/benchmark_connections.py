@@ -0,0 +1,117 @@
+import io
+import statistics
+import sys
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test an admin page through Django's WSGI handler from several threads, the way a threaded "
+        "gunicorn worker serves it, once per CONN_MAX_AGE value. Reports new database connections and latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username whose session the requests use.")
+        parser.add_argument('--path', help="Page to request (default: the applicant changelist).")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent request threads.")
+        parser.add_argument('--requests', type=int, default=100, help="Requests per thread.")
+        parser.add_argument(
+            '--conn-max-age', action='append', type=int, metavar='SECONDS',
+            help="CONN_MAX_AGE to compare. May be repeated (default: 0 and the configured value).",
+        )
+        parser.add_argument('--host', default='localhost', help="Host header; must be in ALLOWED_HOSTS.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named '{options['user']}'")
+        path = options['path'] or reverse('admin:hrd_applicant_changelist')
+        client = Client()
+        client.force_login(user)
+        cookie = '; '.join(f'{name}={morsel.value}' for name, morsel in client.cookies.items())
+
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        configured = settings_dict['CONN_MAX_AGE']
+        ages = options['conn_max_age'] or [0, configured]
+        self.stdout.write(
+            f"{options['threads']} threads x {options['requests']} requests of {path} "
+            f"({connections[DEFAULT_DB_ALIAS].vendor}, health checks {settings_dict['CONN_HEALTH_CHECKS']})"
+        )
+        self.stdout.write(f"{'conn_max_age':>12} {'connections':>12} {'per request':>12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        try:
+            for age in ages:
+                settings_dict['CONN_MAX_AGE'] = age
+                result = self.run_load(path, cookie, options)
+                self.stdout.write(
+                    f"{'None' if age is None else age:>12} {result['connections']:>12} {result['per_request']:>12.3f} "
+                    f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} {result['throughput']:>8.0f}"
+                )
+        finally:
+            settings_dict['CONN_MAX_AGE'] = configured
+
+    def run_load(self, path, cookie, options):
+        handler = WSGIHandler()
+        opened = []
+        lock = threading.Lock()
+        timings = []
+        errors = []
+
+        def count_connection(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def environ():
+            return {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+                'SERVER_NAME': options['host'], 'SERVER_PORT': '80', 'HTTP_HOST': options['host'],
+                'HTTP_COOKIE': cookie, 'SERVER_PROTOCOL': 'HTTP/1.1', 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            }
+
+        def worker():
+            local = []
+            statuses = []
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                response = handler(environ(), lambda status, headers: statuses.append(status))
+                b''.join(response)
+                response.close()  # Sends request_finished, where Django closes expired connections
+                local.append((time.perf_counter() - started) * 1000)
+            with lock:
+                timings.extend(local)
+                errors.extend(status for status in statuses if not status.startswith('200'))
+            connections.close_all()
+
+        connection_created.connect(count_connection)
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(max(options['threads'], 1))]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+
+        if errors:
+            raise CommandError(f"{len(errors)} request(s) failed, first: {errors[0]}")
+        timings.sort()
+        return {
+            'connections': len(opened),
+            'per_request': len(opened) / len(timings),
+            'p50': statistics.median(timings),
+            'p95': timings[int(len(timings) * 0.95) - 1],
+            'p99': timings[int(len(timings) * 0.99) - 1],
+            'throughput': len(timings) / elapsed,
+        }
@@ -0,0 +1,42 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+PAGES = ['login', 'register', 'applicant_create']
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the public pages (login, register, application form) through the test client with "
+        "their {% cache %} fragments disabled and enabled, and print the median render time of each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help="Timed requests per page and mode; the median is reported.")
+
+    def handle(self, *args, **options):
+        client = Client()
+        self.stdout.write(f"{'page':<20} {'uncached ms':>12} {'cached ms':>10} {'saved':>7} {'bytes':>8}")
+        for name in PAGES:
+            url = reverse(name)
+            # A zero timeout makes every {% cache %} block render (and expire) on each request
+            with override_settings(TEMPLATE_FRAGMENT_TIMEOUT=0):
+                uncached, size = self.measure(client, url, options['repeat'])
+            cached, _ = self.measure(client, url, options['repeat'])
+            saved = (uncached - cached) / uncached * 100 if uncached else 0
+            self.stdout.write(f"{name:<20} {uncached:>12.2f} {cached:>10.2f} {saved:>6.0f}% {size:>8}")
+
+    def measure(self, client, url, repeat):
+        response = client.get(url)  # Warm up the template loaders and fill the fragment cache
+        if response.status_code != 200:
+            raise CommandError(f"{url} returned HTTP {response.status_code}")
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), len(response.content)
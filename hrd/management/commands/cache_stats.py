@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hrd import caching, jobboard, permissions  # noqa: F401 (modules that define the namespaces)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show each configured cache's backend, size and eviction figures, and the current version of every "
+        "hrd cache namespace. --invalidate drops a namespace for all processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invalidate', action='append', default=[], metavar='NAMESPACE', help="Namespace to invalidate. May be repeated.")
+
+    def handle(self, *args, **options):
+        namespaces = caching.namespaces()
+        for name in options['invalidate']:
+            if name not in namespaces:
+                raise CommandError(f"Unknown namespace '{name}', expected one of: {', '.join(sorted(namespaces))}")
+            namespaces[name].invalidate()
+            self.stdout.write(f"Invalidated {name}")
+
+        for alias, config in settings.CACHES.items():
+            self.stdout.write(f"{alias}: {config['BACKEND']} {config.get('LOCATION', '')}".rstrip())
+            for stat, value in caching.backend_stats(alias).items():
+                self.stdout.write(f"  {stat:<16} {value}")
+
+        self.stdout.write("Namespaces:")
+        for name, namespace in sorted(namespaces.items()):
+            self.stdout.write(f"  {name:<16} version {namespace.version()} ({namespace.alias}, ttl {namespace.timeout}s)")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from hrd import changes
+from hrd.models import ChangeCursor, ChangeRecord
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the change feed: delete the records older than CHANGE_FEED_RETENTION_DAYS that every consumer "
+        "has read, and keep only the last record of each object among older ones still unread. Run it daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, help="Keep records younger than this (default: CHANGE_FEED_RETENTION_DAYS).")
+
+    def handle(self, *args, **options):
+        deleted = changes.compact(options['retention_days'])
+        newest = ChangeRecord.objects.aggregate(newest=Max('pk'))['newest'] or 0
+        self.stdout.write(f"Deleted {deleted} change records, {ChangeRecord.objects.count()} left")
+        for cursor in ChangeCursor.objects.order_by('name'):
+            behind = ChangeRecord.objects.filter(pk__gt=cursor.position).count()
+            self.stdout.write(f"  {cursor.name}: at {cursor.position} of {newest}, {behind} records behind")
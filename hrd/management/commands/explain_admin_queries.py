@@ -0,0 +1,129 @@
+import re
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.test import RequestFactory
+from django.urls import reverse
+
+# Plan lines that name an index, and plan lines that read a whole table, per vendor
+INDEX_PATTERNS = {
+    'sqlite': re.compile(r'USING (?:COVERING )?INDEX (\w+)|USING (INTEGER PRIMARY KEY)'),
+    'postgresql': re.compile(r'Index (?:Only )?Scan(?: Backward)? using (\w+)|Bitmap Index Scan on (\w+)'),
+}
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY'),
+    'postgresql': re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b', re.MULTILINE),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the changelist query of every hrd admin, as a recruiter and as a superuser, unfiltered and "
+        "with each list filter choice, and report which indexes the database uses and where it scans whole tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database alias to explain against.")
+        parser.add_argument(
+            '--user',
+            help="Recruiter whose scoping is explained; an unsaved placeholder recruiter is used by default.",
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the full plan of every query.")
+        parser.add_argument(
+            '--strict', action='store_true',
+            help="Fail when a query shape scans a whole table and then sorts it, i.e. cannot stop at the first page.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor not in INDEX_PATTERNS:
+            raise CommandError(f"Plans from '{connection.vendor}' are not supported, use SQLite or PostgreSQL")
+
+        if options['user']:
+            try:
+                recruiter = User.objects.using(options['database']).get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+        else:
+            recruiter = User(pk=0, username='explain-recruiter', is_staff=True)
+        users = [('recruiter', recruiter), ('superuser', User(pk=0, username='explain-admin', is_staff=True, is_superuser=True))]
+
+        seen = set()
+        offenders = []
+        self.stdout.write(f"{'admin':<22} {'user':<10} {'shape':<40} {'indexes':<48} full scans")
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != 'hrd':
+                continue
+            for role, user in users:
+                for shape, queryset in self.query_shapes(model_admin, user):
+                    sql, _ = queryset.query.sql_with_params()
+                    if (model, role, sql) in seen:
+                        continue
+                    seen.add((model, role, sql))
+                    plan = self.explain(connection, queryset, options['database'])
+                    indexes, scans, sorts = self.summarize(plan, connection.vendor)
+                    if scans and sorts:
+                        offenders.append(f"{model._meta.model_name}/{role}/{shape}")
+                        status = self.style.ERROR(', '.join(scans))
+                    elif scans:
+                        # Read in the requested order, so the scan stops once the page is full
+                        status = self.style.WARNING(f"{', '.join(scans)} (in order)")
+                    else:
+                        status = self.style.SUCCESS('none' + (' (sorts in memory)' if sorts else ''))
+                    self.stdout.write(
+                        f"{model.__name__ + 'Admin':<22} {role:<10} {shape[:40]:<40} {', '.join(indexes)[:48] or '-':<48} {status}"
+                    )
+                    if options['verbose_plans']:
+                        self.stdout.write(plan)
+
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+        if offenders and options['strict']:
+            raise CommandError(f"{len(offenders)} query shape(s) scan and sort a whole table: {', '.join(offenders)}")
+
+    def query_shapes(self, model_admin, user):
+        """Yield (description, page queryset) for the unfiltered changelist and every list filter choice."""
+        opts = model_admin.model._meta
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        changelist = self.changelist(model_admin, url, user)
+        yield 'changelist', self.page(changelist)
+        for spec in changelist.filter_specs:
+            for choice in spec.choices(changelist):
+                if choice.get('selected'):
+                    continue
+                filtered = self.changelist(model_admin, f"{url}{choice['query_string']}", user)
+                yield f"{spec.title}={choice['display']}", self.page(filtered)
+
+    def changelist(self, model_admin, url, user):
+        request = RequestFactory().get(url)
+        request.user = user
+        return model_admin.get_changelist_instance(request)
+
+    def page(self, changelist):
+        # The query the changelist actually runs: its ordering and first page
+        return changelist.queryset[:changelist.list_per_page]
+
+    def explain(self, connection, queryset, using):
+        if connection.vendor != 'postgresql':
+            return queryset.using(using).explain()
+        # Development tables are tiny, and PostgreSQL rightly seq-scans tiny tables. Disabling
+        # seq scans shows which index it would use once the tables are large.
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.using(using).explain()
+
+    def summarize(self, plan, vendor):
+        indexes = []
+        for match in INDEX_PATTERNS[vendor].finditer(plan):
+            name = next(group for group in match.groups() if group)
+            name = 'primary key' if name == 'INTEGER PRIMARY KEY' else name
+            if name not in indexes:
+                indexes.append(name)
+        scans = sorted(set(FULL_SCAN_PATTERNS[vendor].findall(plan)))
+        return indexes, scans, bool(SORT_PATTERNS[vendor].search(plan))
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hrd import dedup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the duplicate-applicant blocking index and compare the applicants within each block, "
+        "storing the pairs that score at least DEDUP_THRESHOLD for review in the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2_000, help="Applicants read and keys inserted per round trip.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(done):
+            self.stdout.write(f"\rIndexed {done} applicants", ending='')
+            self.stdout.flush()
+
+        applicants, pairs, found = dedup.rebuild(batch_size=options['batch_size'], progress=progress)
+        every_pair = applicants * (applicants - 1) // 2
+        self.stdout.write(
+            f"\nCompared {pairs} pairs within blocks (of {every_pair} possible) and found {found} possible "
+            f"duplicates at or above {settings.DEDUP_THRESHOLD} in {time.perf_counter() - started:.1f}s"
+        )
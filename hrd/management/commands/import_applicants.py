@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from hrd import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import applicants with their employment history, education, family, organizations, references and "
+        "submissions from a CSV, XLSX, JSON or JSON Lines file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--user', required=True, help="Username recorded as created_by on every applicant.")
+        parser.add_argument('--format', choices=importer.FORMATS, help="File format; guessed from the extension by default.")
+        parser.add_argument('--batch-size', type=int, default=1_000, help="Applicants inserted per transaction.")
+        parser.add_argument('--errors', help="Write the per-row error report to this CSV file.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, insert nothing.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        def progress(result):
+            self.stdout.write(
+                f"\r{result.rows} rows read, {result.imported} imported, {result.failed} failed "
+                f"({result.rows_per_second:.0f} rows/s)",
+                ending='',
+            )
+            self.stdout.flush()
+
+        run = importer.ApplicantImporter(user, batch_size=options['batch_size'], dry_run=options['dry_run'], progress=progress)
+        try:
+            result = run.run(importer.read_rows(options['path'], options['format']))
+        except (importer.ImportFormatError, OSError) as error:
+            raise CommandError(str(error))
+        self.stdout.write('')
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='') as fp:
+                importer.write_error_report(result.errors, fp)
+        else:
+            for row_number, message in result.errors[:20]:
+                self.stderr.write(f"Row {row_number}: {message}")
+            if len(result.errors) > 20:
+                self.stderr.write(f"... {len(result.errors) - 20} more, use --errors to write the full report")
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.imported} of {result.rows} applicants in {result.elapsed:.1f}s "
+            f"({result.rows_per_second:.0f} rows/s), {result.failed} rows rejected"
+        ))
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from hrd import salaries
+from hrd.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every salary converted to SALARY_BASE_CURRENCY with the rates in EXCHANGE_RATES_FILE. "
+        "Run it after migrating and whenever the rates file changes."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            rates = salaries.rates()
+        except (ImproperlyConfigured, OSError) as error:
+            raise CommandError(str(error))
+        with transaction.atomic():
+            updated = salaries.refresh()
+        self.stdout.write(
+            f"Converted {updated} rows to {settings.SALARY_BASE_CURRENCY} with {len(rates)} rates "
+            f"from {settings.EXCHANGE_RATES_FILE} in {time.perf_counter() - started:.1f}s"
+        )
+        unknown = {}
+        for currency, jobs in Job.objects.values_list('currency').annotate(jobs=Count('pk')):
+            if salaries.normalize_currency(currency) not in rates:
+                unknown[currency] = jobs
+        for currency, jobs in sorted(unknown.items()):
+            self.stdout.write(self.style.WARNING(f"No rate for '{currency}' ({jobs} jobs): their salaries are left unconverted"))
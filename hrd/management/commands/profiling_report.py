@@ -0,0 +1,95 @@
+import glob
+import gzip
+import json
+import math
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Figures averaged per view, as (record key, column heading)
+AVERAGED = [
+    ('queries', 'queries'), ('query_ms', 'sql ms'), ('duplicate_queries', 'dups'), ('similar_queries', 'similar'),
+    ('template_ms', 'tmpl ms'), ('peak_kb', 'peak KB'),
+]
+ORDERINGS = ['total', 'p95', 'mean', 'count', 'queries', 'duplicates']
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate the JSON lines written by ProfilingMiddleware into the top N slowest views: "
+        "sampled requests, total and percentile wall time, and average SQL, template and memory figures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files', nargs='*',
+            help="Log files to read, plain or gzipped (default: PROFILING_LOG_FILE and its rotated copies).",
+        )
+        parser.add_argument('--top', type=int, default=20, help="Number of views to list.")
+        parser.add_argument('--order', choices=ORDERINGS, default='total', help="Ranking; 'total' is wall time summed over requests.")
+        parser.add_argument('--since', help="Only requests at or after this ISO date or datetime.")
+        parser.add_argument('--view', help="Only views whose name contains this text.")
+
+    def handle(self, *args, **options):
+        files = options['files'] or sorted(glob.glob(f'{glob.escape(settings.PROFILING_LOG_FILE)}*'))
+        if not files:
+            raise CommandError(f"No profiling logs at {settings.PROFILING_LOG_FILE}; set PROFILING=True to write them")
+
+        views = {}
+        malformed = 0
+        for name in files:
+            with (gzip.open if name.endswith('.gz') else open)(name, 'rt') as lines:
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        malformed += 1
+                        continue
+                    if options['since'] and record['time'] < options['since']:
+                        continue
+                    if options['view'] and options['view'] not in record['view']:
+                        continue
+                    views.setdefault(f"{record['method']} {record['view']}", []).append(record)
+        if not views:
+            raise CommandError("No matching requests in the profiling logs")
+
+        rows = [self.summarize(view, records) for view, records in views.items()]
+        rows.sort(key=lambda row: row[options['order']], reverse=True)
+        total = sum(row['count'] for row in rows)
+        self.stdout.write(f"{total} sampled requests over {len(rows)} views from {len(files)} file(s)")
+        if malformed:
+            self.stdout.write(self.style.WARNING(f"Skipped {malformed} malformed line(s)"))
+        headings = ''.join(f'{heading:>9}' for _, heading in AVERAGED)
+        self.stdout.write(f"{'view':<48}{'count':>7}{'total s':>9}{'mean ms':>9}{'p50':>9}{'p95':>9}{'max':>9}{headings}")
+        for row in rows[:options['top']]:
+            averages = ''.join('{:>9}'.format('-' if row[key] is None else f'{row[key]:.1f}') for key, _ in AVERAGED)
+            self.stdout.write(
+                f"{row['view'][:47]:<48}{row['count']:>7}{row['total']:>9.1f}{row['mean']:>9.1f}"
+                f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['max']:>9.1f}{averages}"
+            )
+
+        repeated = [row for row in rows[:options['top']] if row['most_repeated']]
+        if repeated:
+            self.stdout.write("\nMost repeated statement per view (highest count in a single request):")
+            for row in repeated:
+                self.stdout.write(f"  {row['view']}: x{row['most_repeated']['count']} {row['most_repeated']['sql']}")
+
+    def summarize(self, view, records):
+        timings = sorted(record['wall_ms'] for record in records)
+        row = {
+            'view': view,
+            'count': len(records),
+            'total': sum(timings) / 1000,
+            'mean': statistics.fmean(timings),
+            'p50': statistics.median(timings),
+            'p95': timings[math.ceil(len(timings) * 0.95) - 1],
+            'max': timings[-1],
+        }
+        for key, _ in AVERAGED:
+            values = [record[key] for record in records if key in record]
+            row[key] = statistics.fmean(values) if values else None
+        row['duplicates'] = row['duplicate_queries'] + row['similar_queries']
+        repeated = [record['most_repeated'] for record in records if record.get('most_repeated')]
+        row['most_repeated'] = max(repeated, key=lambda statement: statement['count'], default=None)
+        return row
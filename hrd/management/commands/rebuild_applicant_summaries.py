@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hrd import summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute ApplicantSummary for every applicant from the child tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2_000, help="Applicants recomputed per transaction.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(done):
+            self.stdout.write(f"\rRefreshed {done} summaries", ending='')
+            self.stdout.flush()
+
+        total = summaries.rebuild(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(f"\nRebuilt {total} summaries in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,28 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+
+from hrd import search
+
+
+class Command(BaseCommand):
+    help = "Recreate the full-text search shadow tables for Job and Applicant from the live rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2_000, help="Rows inserted into the index per batch.")
+
+    def handle(self, *args, **options):
+        for label in search.SEARCH_FIELDS:
+            model = apps.get_model(label)
+            using = router.db_for_write(model)
+            backend = search.get_backend(using)
+            if backend is None:
+                raise CommandError(f"Full-text search is not available on database '{using}'")
+
+            started = time.perf_counter()
+            with transaction.atomic(using=using):
+                backend.install(connections[using], model)
+                indexed = backend.rebuild(model, batch_size=options['batch_size'], using=using)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: indexed {indexed} rows in {time.perf_counter() - started:.1f}s")
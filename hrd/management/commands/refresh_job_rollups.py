@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hrd import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the analytics rollups marked stale and create missing ones. --all recomputes every job, "
+        "catching changes made without signals (raw SQL, queryset.update); run it periodically from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Recompute the rollups of every job.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Jobs recomputed per transaction.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not options['all']:
+            total = rollups.refresh_stale(batch_size=options['batch_size'])
+            self.stdout.write(f"Refreshed {total} rollups in {time.perf_counter() - started:.1f}s")
+            return
+
+        def progress(done):
+            self.stdout.write(f"\rRefreshed {done} rollups", ending='')
+            self.stdout.flush()
+
+        total = rollups.rebuild(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(f"\nRebuilt {total} rollups in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,34 @@
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hrd import queue
+
+
+class Command(BaseCommand):
+    help = "Run background tasks (hrd.queue) with a pool of worker threads until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="Worker threads, each running one task at a time.")
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.TASK_POLL_INTERVAL,
+            help="Seconds an idle worker waits before looking for due tasks again.",
+        )
+        parser.add_argument('--drain', action='store_true', help="Exit once no task is due instead of waiting for more.")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        threads = queue.start_workers(
+            options['concurrency'], stop, poll_interval=options['poll_interval'], drain=options['drain'],
+        )
+        self.stdout.write(f"Started {len(threads)} task worker(s)")
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the running tasks finish")
+            stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hrd import routers, snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Write applicants, jobs and the applicants' child records to a columnar snapshot for offline analysis: "
+        "Arrow IPC or Parquet with pyarrow, otherwise one memory-mappable .npy file per column. "
+        "Later runs add the rows created since the previous one, and write a table again when the change feed "
+        "shows rows of it edited or deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Snapshot directory; created if missing.")
+        parser.add_argument(
+            '--format', choices=snapshot.FORMATS,
+            help="File format of a new snapshot (default: arrow when pyarrow is installed, else npy).",
+        )
+        parser.add_argument('--full', action='store_true', help="Discard the existing snapshot and write every row again.")
+        parser.add_argument('--chunk-size', type=int, default=10_000, help="Rows fetched and written per chunk.")
+        parser.add_argument('--database', help="Database alias to read from (default: a replica when configured).")
+
+    def handle(self, *args, **options):
+        alias = options['database'] or routers.read_alias()
+        started = time.perf_counter()
+
+        def progress(table, rows):
+            self.stdout.write(f"\r{table}: {rows} rows", ending='')
+            self.stdout.flush()
+
+        try:
+            added, rewritten = snapshot.write_snapshot(
+                options['directory'], lambda model: model.objects.using(alias), file_format=options['format'],
+                chunk_size=options['chunk_size'], full=options['full'], progress=progress,
+            )
+        except (RuntimeError, OSError) as error:
+            raise CommandError(str(error))
+        manifest = snapshot.read_manifest(options['directory'])
+        self.stdout.write('\r', ending='')
+        for table, rows in added.items():
+            note = ' (rewritten)' if table in rewritten else ''
+            self.stdout.write(f"{table:<22} +{rows:<8} {manifest['tables'][table]['rows']} rows{note}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {manifest['format']} snapshot to {options['directory']} in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,179 @@
+import re
+
+import numpy as np
+from django.utils import timezone
+
+from hrd.models import Applicant, EmploymentHistory, Education
+
+# Applicants are ranked against a Job by pulling the candidate columns with a few bulk
+# queries into NumPy arrays and scoring every criterion for the whole pool at once.
+
+# Relative weight of each criterion in the final score (they sum to 1)
+WEIGHTS = {
+    'experience': 0.30,
+    'skills': 0.35,
+    'education': 0.15,
+    'salary': 0.10,
+    'language': 0.10,
+}
+
+# Education levels in ascending order, scored as a fraction of the highest level
+EDUCATION_LEVELS = [level for level, _ in Education.STATE_LEVEL_CHOICES]
+
+# Words in a job posting that imply a language requirement, mapped to Applicant.LANGUAGE_CHOICES
+LANGUAGE_KEYWORDS = {
+    'indonesian': Applicant.INDONESIAN,
+    'bahasa': Applicant.INDONESIAN,
+    'english': Applicant.ENGLISH,
+    'chinese': Applicant.CHINESE,
+    'mandarin': Applicant.CHINESE,
+}
+
+TEXT = np.dtypes.StringDType(na_object='')
+
+
+def normalize_text(text):
+    # Lower-case words separated by single spaces and padded, so ' term ' only matches whole words
+    return ' ' + ' '.join(re.findall(r'\w+', (text or '').lower())) + ' '
+
+
+def parse_skills(skills_required):
+    skills = (normalize_text(skill).strip() for skill in re.split(r'[,;\n/]+', skills_required or ''))
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+
+def required_languages(job):
+    words = set(normalize_text(' '.join([job.skills_required, job.qualifications, job.description])).split())
+    return sorted({code for keyword, code in LANGUAGE_KEYWORDS.items() if keyword in words})
+
+
+def _text_hits(texts, terms):
+    # (len(texts), len(terms)) boolean matrix: does each text contain each term as whole words
+    texts = np.array(texts, dtype=TEXT)
+    hits = np.zeros((len(texts), len(terms)), dtype=bool)
+    for column, term in enumerate(terms):
+        hits[:, column] = np.strings.find(texts, f' {term} ') >= 0
+    return hits
+
+
+class CandidatePool:
+    """Column arrays for a set of applicants, indexed by position in `ids`."""
+
+    def __init__(self, applicants, skills):
+        rows = list(applicants.order_by('pk').values_list(
+            'pk', 'programs_languages', 'salary_expected_base', 'spoken_languages', 'written_languages', 'additional_language',
+        ))
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        # In SALARY_BASE_CURRENCY, like the job's *_base salary band it is scored against
+        self.salary_expected = np.array([np.nan if row[2] is None else float(row[2]) for row in rows], dtype=np.float64)
+        self.spoken_languages = np.array([row[3] or '' for row in rows], dtype=TEXT)
+        self.written_languages = np.array([row[4] or '' for row in rows], dtype=TEXT)
+        self.additional_language = np.array([normalize_text(row[5]) for row in rows], dtype=TEXT)
+        self.skill_hits = _text_hits([normalize_text(row[1]) for row in rows], skills)
+
+        pool = applicants.values('pk')
+        self.experience_years = np.zeros(len(self.ids), dtype=np.float64)
+        histories = list(EmploymentHistory.objects.filter(applicant__in=pool).values_list(
+            'applicant_id', 'date_of_employment', 'date_employment_ended', 'description_of_duties',
+        ))
+        if histories:
+            index = self.index_of([row[0] for row in histories])
+            started = np.array([row[1] for row in histories], dtype='datetime64[D]')
+            ended = np.array([row[2] for row in histories], dtype='datetime64[D]')
+            ended = np.where(np.isnat(ended), np.datetime64(timezone.localdate(), 'D'), ended)
+            years = np.clip((ended - started).astype(np.float64) / 365.25, 0, None)
+            self.experience_years = np.bincount(index, weights=years, minlength=len(self.ids))
+            # Skills mentioned in any job description count as well
+            duty_hits = _text_hits([normalize_text(row[3]) for row in histories], skills)
+            np.logical_or.at(self.skill_hits, index, duty_hits)
+
+        self.education_level = np.full(len(self.ids), -1, dtype=np.int8)
+        records = list(Education.objects.filter(applicant__in=pool).values_list('applicant_id', 'state_level_attained'))
+        if records:
+            ranks = {level: rank for rank, level in enumerate(EDUCATION_LEVELS)}
+            index = self.index_of([row[0] for row in records])
+            levels = np.array([ranks.get(row[1], -1) for row in records], dtype=np.int8)
+            np.maximum.at(self.education_level, index, levels)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index_of(self, applicant_ids):
+        return np.searchsorted(self.ids, np.array(applicant_ids, dtype=np.int64))
+
+
+def score_pool(job, pool):
+    """Return a dict of per-criterion score arrays (0..1) plus the weighted 'total'."""
+    scores = {}
+
+    if job.experience_required:
+        scores['experience'] = np.minimum(pool.experience_years / job.experience_required, 1.0)
+    else:
+        scores['experience'] = np.ones(len(pool))
+
+    if pool.skill_hits.shape[1]:
+        scores['skills'] = pool.skill_hits.mean(axis=1)
+    else:
+        scores['skills'] = np.ones(len(pool))
+
+    scores['education'] = np.clip(pool.education_level, 0, None) / (len(EDUCATION_LEVELS) - 1)
+    scores['education'][pool.education_level < 0] = 0.0
+
+    # Inside (or below) the band scores 1, above it decays to 0 at twice the maximum, unknown is neutral
+    expected = pool.salary_expected
+    salary = np.full(len(pool), 0.5)
+    if job.max_salary_base:
+        maximum = float(job.max_salary_base)
+        salary = np.where(np.isnan(expected), 0.5, np.clip(1 - (expected - maximum) / maximum, 0, 1))
+    elif job.min_salary_base:
+        salary = np.where(np.isnan(expected), 0.5, 1.0)
+    scores['salary'] = salary
+
+    languages = required_languages(job)
+    if languages:
+        covered = np.zeros(len(pool))
+        for code in languages:
+            keywords = [keyword for keyword, keyword_code in LANGUAGE_KEYWORDS.items() if keyword_code == code]
+            speaks = (pool.spoken_languages == code) | (pool.written_languages == code)
+            for keyword in keywords:
+                speaks |= np.strings.find(pool.additional_language, f' {keyword} ') >= 0
+            covered += speaks
+        scores['language'] = covered / len(languages)
+    else:
+        scores['language'] = np.ones(len(pool))
+
+    scores['total'] = sum(WEIGHTS[name] * scores[name] for name in WEIGHTS)
+    return scores
+
+
+def candidate_pool_for(job, applicants=None):
+    # By default: everyone who applied for this job or is open to other positions
+    applicants = Applicant.objects.all() if applicants is None else applicants
+    return applicants.filter(position_applied_for=job) | applicants.filter(interested_in_other_positions=True)
+
+
+def top_matches(job, k=20, applicants=None):
+    """
+    Return up to k best candidates for job as dicts with 'applicant', 'score'
+    (0..100) and per-criterion 'components', best first.
+    """
+    pool = CandidatePool(candidate_pool_for(job, applicants), parse_skills(job.skills_required))
+    if not len(pool):
+        return []
+    scores = score_pool(job, pool)
+    total = scores['total']
+
+    k = min(k, len(pool))
+    best = np.argpartition(-total, k - 1)[:k]
+    best = best[np.lexsort((pool.ids[best], -total[best]))]
+
+    applicants = Applicant.objects.in_bulk(pool.ids[best].tolist())
+    return [
+        {
+            'applicant': applicants[int(pool.ids[position])],
+            'score': round(float(total[position]) * 100, 1),
+            'components': {name: round(float(scores[name][position]) * 100) for name in WEIGHTS},
+            'experience_years': round(float(pool.experience_years[position]), 1),
+        }
+        for position in best
+    ]
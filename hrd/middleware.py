@@ -0,0 +1,103 @@
+import random
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from hrd import profiling, routers
+from hrd.instrumentation import QueryCounter
+
+
+def query_budget_exempt(view):
+    # Mark a view whose query count legitimately grows with its input (bulk imports, exports)
+    view.query_budget_exempt = True
+    return view
+
+
+def reads_from_replica(view):
+    # Mark a read-only view (changelists, reports) whose GET requests may be served from a replica
+    view.reads_from_replica = True
+    return view
+
+
+class AdminQueryBudgetMiddleware:
+    """
+    Development aid: fail any admin page that issues more than
+    settings.ADMIN_QUERY_BUDGET queries, so N+1 regressions surface as errors
+    instead of slow pages. Only installed when DEBUG is on. Only page renders
+    (GET and HEAD) are held to it: saves also run the signal handlers' derived
+    data work, which grows with the features, not with the rows on the page.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as queries:
+            response = self.get_response(request)
+        match = request.resolver_match
+        exempt = match and getattr(match.func, 'query_budget_exempt', False)
+        rendered = request.method in ('GET', 'HEAD')
+        if match and match.namespace == 'admin' and rendered and not exempt and queries.count > settings.ADMIN_QUERY_BUDGET:
+            raise AssertionError(
+                f"{request.method} {request.path} issued {queries.count} queries, "
+                f"over the admin budget of {settings.ADMIN_QUERY_BUDGET}"
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Routes the reads of views marked with reads_from_replica to a replica
+    (hrd.routers.ReplicaRouter), and pins a client to the primary for
+    settings.REPLICA_PIN_SECONDS after any request that wrote, so people see
+    their own changes. Only installed when replicas are configured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routers.track_writes() as writes:
+            try:
+                response = self.get_response(request)
+            finally:
+                token = getattr(request, '_replica_token', None)
+                if token is not None:
+                    routers.stop_using_replica(token)
+        if writes.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, str(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD') and getattr(view_func, 'reads_from_replica', False):
+            alias = routers.request_read_alias(request)
+            if alias != DEFAULT_DB_ALIAS:
+                request._replica_token = routers.use_replica(alias)
+
+
+class ProfilingMiddleware:
+    """
+    Logs one JSON line per sampled request (settings.PROFILING_SAMPLE_RATE)
+    to the hrd.profiling logger: view name, wall time, queries, duplicate
+    queries, template render time and, with PROFILING_ALLOCATIONS, memory
+    allocated. Only installed when PROFILING is on; read the log with
+    `manage.py profiling_report`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if settings.PROFILING_ALLOCATIONS and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        with profiling.RequestProfile() as profile:
+            response = self.get_response(request)
+        profiling.log(profile, request, response)
+        return response
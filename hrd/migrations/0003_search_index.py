@@ -0,0 +1,35 @@
+from django.db import migrations
+
+from hrd import search
+
+# Models that get a full-text shadow table
+INDEXED_MODELS = ('Job', 'Applicant')
+
+
+def install_search_index(apps, schema_editor):
+    backend = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    for model_name in INDEXED_MODELS:
+        model = apps.get_model('hrd', model_name)
+        backend.install(schema_editor.connection, model)
+        backend.rebuild(model, using=schema_editor.connection.alias)
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    for model_name in INDEXED_MODELS:
+        backend.uninstall(schema_editor.connection, apps.get_model('hrd', model_name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0002_job_board_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
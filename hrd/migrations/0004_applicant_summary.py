@@ -0,0 +1,32 @@
+# Generated by Django 4.2.15 on 2026-10-18 11:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicantSummary',
+            fields=[
+                ('applicant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='hrd.applicant')),
+                ('experience_years', models.DecimalField(decimal_places=1, default=0, help_text='Total years across employment history, open-ended jobs counted up to the last refresh', max_digits=5)),
+                ('last_salary', models.DecimalField(blank=True, decimal_places=2, help_text='Last salary of the most recent employment', max_digits=10, null=True)),
+                ('highest_education_level', models.CharField(blank=True, choices=[('SD', 'Sekolah Dasar (SD)'), ('SMP', 'Sekolah Menengah Pertama (SMP)'), ('SMA', 'Sekolah Menengah Atas (SMA)'), ('DIP', 'Diploma'), ('S1', 'Sarjana (S1)'), ('S2', 'Magister (S2)'), ('S3', 'Doktor (S3)')], max_length=3, null=True)),
+                ('education_rank', models.SmallIntegerField(blank=True, help_text='Position of the highest education level in Education.STATE_LEVEL_CHOICES', null=True)),
+                ('family_size', models.PositiveIntegerField(default=0)),
+                ('reference_count', models.PositiveIntegerField(default=0)),
+                ('pending_submissions', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Applicant Summary',
+                'verbose_name_plural': 'Applicant Summaries',
+            },
+        ),
+    ]
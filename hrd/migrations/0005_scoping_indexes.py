@@ -0,0 +1,54 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hrd', '0004_applicant_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['created_by', '-id'], name='applicant_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['created_by', 'good_health', '-id'], name='applicant_owner_health_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['created_by', 'in_debt', '-id'], name='applicant_owner_debt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['created_by', 'engaged_in_business', '-id'], name='applicant_owner_business_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicantsummary',
+            index=models.Index(fields=['highest_education_level', '-applicant'], name='summary_education_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-date_posted', '-id'], name='job_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['employment_type', '-date_posted', '-id'], name='job_type_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['application_deadline', '-date_posted', '-id'], name='job_deadline_idx'),
+        ),
+        # Drop the single-column created_by index only once the composite indexes exist
+        migrations.AlterField(
+            model_name='applicant',
+            name='created_by',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0005_scoping_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='submission_key',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='BackgroundTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered task name', max_length=255)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('reference', models.CharField(blank=True, db_index=True, help_text='What the task belongs to, e.g. applicant:42', max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not run before this time; pushed back after a failed attempt')),
+                ('locked_at', models.DateTimeField(blank=True, help_text='When a worker claimed the task', null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Background Task',
+                'verbose_name_plural': 'Background Tasks',
+                'indexes': [models.Index(fields=['status', 'available_at'], name='task_due_idx')],
+            },
+        ),
+    ]
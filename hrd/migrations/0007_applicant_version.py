@@ -0,0 +1,18 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0006_background_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0007_applicant_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRollup',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='hrd.job')),
+                ('applicant_count', models.PositiveIntegerField(default=0)),
+                ('salary_count', models.PositiveIntegerField(default=0, help_text='Applicants who gave a salary expectation')),
+                ('salary_p25', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('salary_median', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('salary_p75', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('below_range', models.PositiveIntegerField(default=0, help_text="Salary expectations under the job's minimum")),
+                ('within_range', models.PositiveIntegerField(default=0)),
+                ('above_range', models.PositiveIntegerField(default=0, help_text="Salary expectations over the job's maximum")),
+                ('education_mix', models.JSONField(default=dict, help_text="Applicants per highest education level ('' for none)")),
+                ('stale', models.BooleanField(default=False, help_text='Changed since the last refresh; picked up by the rollup task')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Recruitment Analytics',
+                'verbose_name_plural': 'Recruitment Analytics',
+            },
+        ),
+    ]
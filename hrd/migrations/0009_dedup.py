@@ -0,0 +1,51 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0008_job_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DedupKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dedup_keys', to='hrd.applicant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Weighted similarity from 0 to 1')),
+                ('details', models.JSONField(default=dict, help_text='Similarity of each compared field')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('dismissed', 'Not a duplicate')], default='open', max_length=10)),
+                ('found_at', models.DateTimeField(auto_now_add=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicate_candidates', to='hrd.applicant')),
+                ('duplicate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hrd.applicant')),
+            ],
+            options={
+                'verbose_name': 'Possible Duplicate',
+                'verbose_name_plural': 'Possible Duplicates',
+                'indexes': [models.Index(fields=['status', '-score'], name='duplicate_review_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='duplicatecandidate',
+            constraint=models.UniqueConstraint(fields=('applicant', 'duplicate'), name='duplicate_pair_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='dedupkey',
+            index=models.Index(fields=['key', 'applicant'], name='dedup_key_block_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dedupkey',
+            constraint=models.UniqueConstraint(fields=('applicant', 'key'), name='dedup_key_unique'),
+        ),
+    ]
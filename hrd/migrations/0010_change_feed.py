@@ -0,0 +1,44 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0009_dedup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0, help_text='Id of the last change record processed')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Change Cursor',
+                'verbose_name_plural': 'Change Cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Model label, e.g. hrd.applicant', max_length=40)),
+                ('object_id', models.BigIntegerField()),
+                ('applicant_id', models.BigIntegerField(blank=True, help_text='The applicant, or the applicant a child record belongs to', null=True)),
+                ('action', models.CharField(choices=[('c', 'Created'), ('u', 'Updated'), ('d', 'Deleted')], max_length=1)),
+                ('fields', models.JSONField(blank=True, default=list, help_text='Fields an update wrote, when known; empty means any')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Change Record',
+                'verbose_name_plural': 'Change Records',
+                'indexes': [models.Index(fields=['model', 'object_id', 'id'], name='change_object_idx')],
+            },
+        ),
+    ]
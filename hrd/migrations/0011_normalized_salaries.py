@@ -0,0 +1,50 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrd', '0010_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='current_salary_base',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='applicant',
+            name='salary_expected_base',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='employmenthistory',
+            name='last_salary_base',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Last salary in SALARY_BASE_CURRENCY', max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='max_salary_base',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='min_salary_base',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['created_by', 'salary_expected_base'], name='applicant_owner_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['salary_expected_base'], name='applicant_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['min_salary_base', 'max_salary_base'], name='job_salary_base_idx'),
+        ),
+    ]
@@ -1,8 +1,17 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from multiselectfield import MultiSelectField
 
 
+class JobQuerySet(models.QuerySet):
+    def open(self, today=None):
+        # Active jobs that are not past their application deadline
+        today = today or timezone.localdate()
+        return self.filter(Q(application_deadline__isnull=True) | Q(application_deadline__gte=today), is_active=True)
+
+
 # Create your models here.
 class Job(models.Model):
     # Basic Job Details
@@ -40,6 +49,9 @@ class Job(models.Model):
     min_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, help_text="Minimum salary offered")
     max_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, help_text="Maximum salary offered")
     currency = models.CharField(max_length=3, default='USD', help_text="Currency of the salary, e.g., USD, EUR, IDR")
+    # The salary range in SALARY_BASE_CURRENCY, maintained by hrd.salaries
+    min_salary_base = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False)
+    max_salary_base = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False)
     benefits = models.TextField(blank=True, help_text="Additional benefits such as health insurance, paid leave, etc.")
 
     # Job Posting Details
@@ -51,17 +63,36 @@ class Job(models.Model):
     # Status
     is_active = models.BooleanField(default=True, help_text="Is this job posting currently active?")
 
+    objects = JobQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
     class Meta:
         verbose_name = "Job Vacancy"  # This changes the singular name in the admin
         verbose_name_plural = "Job Vacancies"  # This changes the plural name in the admin
+        indexes = [
+            # Job board: active jobs, newest first, seeked by (date_posted, id)
+            models.Index(fields=['-date_posted', '-id'], condition=Q(is_active=True), name='job_active_posted_idx'),
+            # Active jobs still open for applications
+            models.Index(fields=['is_active', 'application_deadline', '-date_posted'], name='job_active_deadline_idx'),
+            # Admin changelist (ordered by -date_posted) and its list filters
+            models.Index(fields=['-date_posted', '-id'], name='job_posted_idx'),
+            models.Index(fields=['employment_type', '-date_posted', '-id'], name='job_type_posted_idx'),
+            models.Index(fields=['application_deadline', '-date_posted', '-id'], name='job_deadline_idx'),
+            # Salary range filter
+            models.Index(fields=['min_salary_base', 'max_salary_base'], name='job_salary_base_idx'),
+        ]
 
 
 class Applicant(models.Model):
     # Basic Information
-    created_by = models.ForeignKey(User, on_delete=models.CASCADE)  # Track who created the record
+    # Track who created the record; indexed by the composite indexes in Meta, which all lead with it
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    # Idempotency key of the public submission that created the record, if any
+    submission_key = models.UUIDField(blank=True, null=True, unique=True, editable=False)
+    # Bumped on every save; autosave requests must present the version they edited
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     name = models.CharField(max_length=255)
     home_address = models.TextField()
@@ -101,6 +132,9 @@ class Applicant(models.Model):
     interested_in_other_positions = models.BooleanField()
     current_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     salary_expected = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    # Both salaries in SALARY_BASE_CURRENCY, taking them to be in the currency of the job applied for
+    current_salary_base = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False)
+    salary_expected_base = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False)
     current_remuneration_details = models.TextField(blank=True, null=True)
 
     # Availability and Notice Period
@@ -275,10 +309,29 @@ class Applicant(models.Model):
                   "FOR WITHDRAWL OF AN OFFER OR SUBSEQUENT DISMISSAL, IF EMPLOYED"
     )
 
+    def __str__(self):
+        return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The job applied for as loaded, so a save can tell the applicant moved (see hrd.signals)
+        if 'position_applied_for_id' in field_names:
+            instance._loaded_job_id = values[field_names.index('position_applied_for_id')]
+        return instance
 
-def __str__(self):
-    return self.name
+    class Meta:
+        indexes = [
+            # Recruiter changelist: own applicants, newest first
+            models.Index(fields=['created_by', '-id'], name='applicant_owner_idx'),
+            # Recruiter changelist narrowed by one of the list filters
+            models.Index(fields=['created_by', 'good_health', '-id'], name='applicant_owner_health_idx'),
+            models.Index(fields=['created_by', 'in_debt', '-id'], name='applicant_owner_debt_idx'),
+            models.Index(fields=['created_by', 'engaged_in_business', '-id'], name='applicant_owner_business_idx'),
+            # Expected salary range filter, for recruiters and for superusers
+            models.Index(fields=['created_by', 'salary_expected_base'], name='applicant_owner_salary_idx'),
+            models.Index(fields=['salary_expected_base'], name='applicant_salary_idx'),
+        ]
 
 
 class EmploymentHistory(models.Model):
@@ -310,6 +363,7 @@ class EmploymentHistory(models.Model):
     employed_through = models.CharField(max_length=255, help_text="How did you get employed? (e.g., Advertisement, Recommendation)")
     reason_for_leaving = models.CharField(max_length=255, blank=True, null=True)
     last_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    last_salary_base = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False, help_text="Last salary in SALARY_BASE_CURRENCY")
 
     def __str__(self):
         return f"{self.company_name} ({self.position_held})"
@@ -453,3 +507,191 @@ class Submission(models.Model):
 
     def __str__(self):
         return f"Submission for {self.company_name} on {self.date_of_application}"
+
+
+class ApplicantSummary(models.Model):
+    # Aggregates over an applicant's child records, maintained by hrd.summaries so
+    # list pages can read them without joining or counting the child tables
+    applicant = models.OneToOneField(Applicant, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+
+    experience_years = models.DecimalField(max_digits=5, decimal_places=1, default=0, help_text="Total years across employment history, open-ended jobs counted up to the last refresh")
+    last_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, help_text="Last salary of the most recent employment")
+    highest_education_level = models.CharField(max_length=3, choices=Education.STATE_LEVEL_CHOICES, blank=True, null=True)
+    education_rank = models.SmallIntegerField(blank=True, null=True, help_text="Position of the highest education level in Education.STATE_LEVEL_CHOICES")
+    family_size = models.PositiveIntegerField(default=0)
+    reference_count = models.PositiveIntegerField(default=0)
+    pending_submissions = models.PositiveIntegerField(default=0)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary for applicant {self.applicant_id}"
+
+    class Meta:
+        verbose_name = "Applicant Summary"
+        verbose_name_plural = "Applicant Summaries"
+        indexes = [
+            # Applicant changelist filtered by highest education, newest applicants first
+            models.Index(fields=['highest_education_level', '-applicant'], name='summary_education_idx'),
+        ]
+
+
+class JobRollup(models.Model):
+    # Per-job aggregates over the job's applicants for the analytics dashboard, maintained by
+    # hrd.rollups so the dashboard never groups the applicant tables itself
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+
+    applicant_count = models.PositiveIntegerField(default=0)
+    salary_count = models.PositiveIntegerField(default=0, help_text="Applicants who gave a salary expectation")
+    salary_p25 = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    salary_median = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    salary_p75 = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    below_range = models.PositiveIntegerField(default=0, help_text="Salary expectations under the job's minimum")
+    within_range = models.PositiveIntegerField(default=0)
+    above_range = models.PositiveIntegerField(default=0, help_text="Salary expectations over the job's maximum")
+    education_mix = models.JSONField(default=dict, help_text="Applicants per highest education level ('' for none)")
+
+    stale = models.BooleanField(default=False, help_text="Changed since the last refresh; picked up by the rollup task")
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Rollup for job {self.job_id}"
+
+    class Meta:
+        verbose_name = "Recruitment Analytics"
+        verbose_name_plural = "Recruitment Analytics"
+
+
+class DedupKey(models.Model):
+    # Blocking keys written by hrd.dedup: only applicants that share a key are ever compared
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name='dedup_keys')
+    key = models.CharField(max_length=64)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['applicant', 'key'], name='dedup_key_unique'),
+        ]
+        indexes = [
+            # Members of a block
+            models.Index(fields=['key', 'applicant'], name='dedup_key_block_idx'),
+        ]
+
+
+class DuplicateCandidate(models.Model):
+    # Pair of applicants hrd.dedup scored as probably the same person; `applicant` has the lower id
+    OPEN = 'open'
+    DISMISSED = 'dismissed'
+
+    STATUS_CHOICES = [
+        (OPEN, 'Open'),
+        (DISMISSED, 'Not a duplicate'),
+    ]
+
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name='duplicate_candidates')
+    duplicate = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Weighted similarity from 0 to 1")
+    details = models.JSONField(default=dict, help_text="Similarity of each compared field")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=OPEN)
+    found_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.applicant_id} / {self.duplicate_id}"
+
+    class Meta:
+        verbose_name = "Possible Duplicate"
+        verbose_name_plural = "Possible Duplicates"
+        constraints = [
+            models.UniqueConstraint(fields=['applicant', 'duplicate'], name='duplicate_pair_unique'),
+        ]
+        indexes = [
+            # Review list: open pairs, most similar first
+            models.Index(fields=['status', '-score'], name='duplicate_review_idx'),
+        ]
+
+
+class BackgroundTask(models.Model):
+    # Follow-up work queued by requests and run by hrd.queue workers
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=255, help_text="Registered task name")
+    payload = models.JSONField(default=dict, blank=True)
+    reference = models.CharField(max_length=100, blank=True, db_index=True, help_text="What the task belongs to, e.g. applicant:42")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not run before this time; pushed back after a failed attempt")
+    locked_at = models.DateTimeField(blank=True, null=True, help_text="When a worker claimed the task")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        verbose_name = "Background Task"
+        verbose_name_plural = "Background Tasks"
+        indexes = [
+            # Workers polling for due tasks
+            models.Index(fields=['status', 'available_at'], name='task_due_idx'),
+        ]
+
+
+class ChangeRecord(models.Model):
+    # Outbox row written by hrd.changes in the same transaction as a create, update or delete of a
+    # job, an applicant or one of its child records; consumers read the feed in id order
+    CREATED = 'c'
+    UPDATED = 'u'
+    DELETED = 'd'
+
+    ACTION_CHOICES = [
+        (CREATED, 'Created'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted'),
+    ]
+
+    model = models.CharField(max_length=40, help_text="Model label, e.g. hrd.applicant")
+    object_id = models.BigIntegerField()
+    # Not a foreign key: records of deleted applicants must stay
+    applicant_id = models.BigIntegerField(blank=True, null=True, help_text="The applicant, or the applicant a child record belongs to")
+    action = models.CharField(max_length=1, choices=ACTION_CHOICES)
+    fields = models.JSONField(default=list, blank=True, help_text="Fields an update wrote, when known; empty means any")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.model} {self.object_id}"
+
+    class Meta:
+        verbose_name = "Change Record"
+        verbose_name_plural = "Change Records"
+        indexes = [
+            # Compaction: the later records of an object
+            models.Index(fields=['model', 'object_id', 'id'], name='change_object_idx'),
+        ]
+
+
+class ChangeCursor(models.Model):
+    # How far a named consumer has read the change feed
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0, help_text="Id of the last change record processed")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+    class Meta:
+        verbose_name = "Change Cursor"
+        verbose_name_plural = "Change Cursors"
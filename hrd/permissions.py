@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+
+from hrd import caching
+from hrd.models import Applicant, EmploymentHistory, Education, Family, Organization, ApplicantReference, Submission, Job
+
+# Models a recruiter can fully manage (add, view, change and delete)
+RECRUITER_MANAGED_MODELS = [
+    Applicant,
+    EmploymentHistory,
+    Education,
+    Family,
+    Organization,
+    ApplicantReference,
+    Submission,
+]
+
+# Models a recruiter can only view
+RECRUITER_READ_ONLY_MODELS = [
+    Job,
+]
+
+# Each user's permission set ("app_label.codename" strings), see CachedModelBackend
+permission_cache = caching.Namespace('permissions', settings.PERMISSION_CACHE_TIMEOUT)
+
+# Permission ids resolved once per process, see get_recruiter_permission_ids()
+_recruiter_permission_ids = None
+
+
+def _recruiter_codenames():
+    codenames = {}
+    for model in RECRUITER_MANAGED_MODELS:
+        name = model._meta.model_name
+        codenames[model] = [f'add_{name}', f'view_{name}', f'change_{name}', f'delete_{name}']
+    for model in RECRUITER_READ_ONLY_MODELS:
+        codenames[model] = [f'view_{model._meta.model_name}']
+    return codenames
+
+
+def get_recruiter_permission_ids():
+    global _recruiter_permission_ids
+    if _recruiter_permission_ids is None:
+        codenames = _recruiter_codenames()
+        content_types = ContentType.objects.get_for_models(*codenames)
+        wanted = {
+            (content_types[model].pk, codename)
+            for model, model_codenames in codenames.items()
+            for codename in model_codenames
+        }
+        permissions = Permission.objects.filter(
+            content_type__in=content_types.values(),
+            codename__in={codename for _, codename in wanted},
+        ).values_list('pk', 'content_type_id', 'codename')
+        _recruiter_permission_ids = frozenset(
+            pk for pk, content_type_id, codename in permissions if (content_type_id, codename) in wanted
+        )
+    return _recruiter_permission_ids
+
+
+def clear_recruiter_permission_cache(**kwargs):
+    # Permissions are (re)created by migrate, so forget the resolved ids afterwards
+    global _recruiter_permission_ids
+    _recruiter_permission_ids = None
+
+
+def grant_recruiter_permissions(user):
+    # The user is expected to be freshly created, so the permissions go in with a single insert
+    through = user.user_permissions.through
+    through.objects.bulk_create(
+        [through(user_id=user.pk, permission_id=permission_id) for permission_id in get_recruiter_permission_ids()],
+        ignore_conflicts=True,
+    )
+    # bulk_create sends no m2m_changed
+    permission_cache.delete(user.pk)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps each user's permission set in the cache, so admin
+    requests do not query the user and group permission tables every time.
+    Invalidated by the handlers in hrd.signals.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            load = super().get_all_permissions
+            user_obj._perm_cache = permission_cache.get_or_set((user_obj.pk,), lambda: load(user_obj))
+        return user_obj._perm_cache
@@ -0,0 +1,110 @@
+import contextvars
+import json
+import logging
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils import timezone
+
+from hrd.instrumentation import QueryProfiler
+
+logger = logging.getLogger(__name__)
+
+# Template timer of the request being profiled in this thread or task, None otherwise
+_template_timer = contextvars.ContextVar('hrd_template_timer', default=None)
+
+# Characters of SQL kept for the most repeated statement
+SQL_PREVIEW = 300
+
+
+class TemplateTimer:
+    count = 0
+    duration = 0.0
+    depth = 0
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        timer = _template_timer.get()
+        if timer is None or timer.depth:
+            return super().render(context, request)  # Not profiled, or already timed by the outer render
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timer.duration += time.perf_counter() - start
+            timer.count += 1
+            timer.depth -= 1
+
+
+class ProfiledTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose renders are timed while a request is profiled."""
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
+
+
+class RequestProfile:
+    """
+    Context manager collecting the wall time, the queries on every database,
+    the template render time and (when tracemalloc is tracing) the memory
+    allocated while it is active.
+    """
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        self.queries = [self._stack.enter_context(QueryProfiler(alias)) for alias in connections]
+        self.templates = TemplateTimer()
+        token = _template_timer.set(self.templates)
+        self._stack.callback(_template_timer.reset, token)
+        self.allocations = tracemalloc.is_tracing()
+        if self.allocations:
+            self._memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self._start
+        if self.allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.allocated, self.peak = current - self._memory, peak - self._memory
+        self._stack.close()
+
+    def record(self, request, response):
+        statements = [(sql, repr(params)) for counter in self.queries for sql, params in zip(counter.statements, counter.params)]
+        similar = Counter(sql for sql, _ in statements)
+        repeated_sql, repeated = similar.most_common(1)[0] if similar else ('', 0)
+        match = request.resolver_match
+        record = {
+            'time': timezone.now().isoformat(),
+            'view': match.view_name if match else '<unresolved>',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': round(self.duration * 1000, 2),
+            'queries': len(statements),
+            'query_ms': round(sum(counter.duration for counter in self.queries) * 1000, 2),
+            # Same SQL and parameters, then same SQL whatever the parameters (the N+1 pattern)
+            'duplicate_queries': len(statements) - len(set(statements)),
+            'similar_queries': len(statements) - len(similar),
+            'most_repeated': {'count': repeated, 'sql': repeated_sql[:SQL_PREVIEW]} if repeated > 1 else None,
+            'templates': self.templates.count,
+            'template_ms': round(self.templates.duration * 1000, 2),
+        }
+        if self.allocations:
+            record['alloc_kb'] = round(self.allocated / 1024, 1)
+            record['peak_kb'] = round(self.peak / 1024, 1)
+        return record
+
+
+def log(profile, request, response):
+    logger.info(json.dumps(profile.record(request, response)))
@@ -0,0 +1,145 @@
+import logging
+import threading
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from hrd.models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+TaskSpec = namedtuple('TaskSpec', 'func max_attempts retry_delay')
+
+# Registered task functions by name; the names are what gets stored on BackgroundTask rows
+registry = {}
+
+# Set when a task is enqueued so idle in-process workers pick it up without waiting a poll interval
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def task(name=None, max_attempts=5, retry_delay=30):
+    """
+    Register a function as a background task. Payloads are passed as keyword
+    arguments and must be JSON serializable. A failed attempt is retried after
+    retry_delay seconds, doubling each time, until max_attempts is reached.
+    """
+    def decorator(func):
+        func.task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[func.task_name] = TaskSpec(func, max_attempts, retry_delay)
+        return func
+    return decorator
+
+
+def enqueue(func, reference='', using=None, **payload):
+    """
+    Queue func(**payload). The row is written in the caller's transaction, so
+    the task only becomes visible to workers if that transaction commits.
+    """
+    spec = registry[func.task_name]
+    queued = BackgroundTask.objects.using(using).create(
+        name=func.task_name, payload=payload, reference=reference, max_attempts=spec.max_attempts,
+    )
+    if settings.TASK_WORKERS:
+        transaction.on_commit(start_in_process_workers, using=using)
+        transaction.on_commit(_wakeup.set, using=using)
+    return queued
+
+
+def claim(limit=1, using=None):
+    """
+    Mark up to limit due tasks as running for this worker and return them. Each
+    claim is a conditional UPDATE, so concurrent workers never run the same
+    task twice; tasks left running by a crashed worker are reclaimed after
+    TASK_LOCK_TIMEOUT seconds.
+    """
+    using = using or router.db_for_write(BackgroundTask)
+    tasks = BackgroundTask.objects.using(using)
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    candidates = (
+        tasks.filter(
+            Q(status=BackgroundTask.PENDING, available_at__lte=now)
+            | Q(status=BackgroundTask.RUNNING, locked_at__lt=stale)
+        )
+        .order_by('available_at')
+        .values_list('pk', 'status', 'locked_at')[:limit * 2]
+    )
+    claimed = []
+    for pk, status, locked_at in candidates:
+        updated = tasks.filter(pk=pk, status=status, locked_at=locked_at).update(
+            status=BackgroundTask.RUNNING, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return list(tasks.filter(pk__in=claimed).order_by('available_at'))
+
+
+def run(queued):
+    spec = registry.get(queued.name)
+    now = timezone.now()
+    if spec is None:
+        queued.status = BackgroundTask.FAILED
+        queued.last_error = f"Unknown task '{queued.name}'"
+    else:
+        try:
+            spec.func(**queued.payload)
+        except Exception as error:
+            logger.exception('Task %s (%s) failed, attempt %d of %d', queued.pk, queued.name, queued.attempts, queued.max_attempts)
+            queued.last_error = f'{type(error).__name__}: {error}'
+            if queued.attempts >= queued.max_attempts:
+                queued.status = BackgroundTask.FAILED
+            else:
+                queued.status = BackgroundTask.PENDING
+                queued.available_at = now + timedelta(seconds=spec.retry_delay * 2 ** (queued.attempts - 1))
+        else:
+            queued.status = BackgroundTask.DONE
+            queued.last_error = ''
+    queued.locked_at = None
+    queued.save(update_fields=['status', 'last_error', 'available_at', 'locked_at', 'updated_at'])
+    return queued
+
+
+def work(stop, poll_interval=None, drain=False, using=None):
+    """
+    Worker loop for one thread: claim and run tasks until stop is set, or, with
+    drain, until no task is due.
+    """
+    poll_interval = settings.TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            claimed = claim(1, using)
+            for queued in claimed:
+                run(queued)
+            if not claimed:
+                if drain:
+                    return
+                _wakeup.wait(poll_interval)
+                _wakeup.clear()
+    finally:
+        connections.close_all()
+
+
+def start_workers(count, stop, **kwargs):
+    threads = [
+        threading.Thread(target=work, args=(stop,), kwargs=kwargs, name=f'hrd-task-worker-{index}', daemon=True)
+        for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def start_in_process_workers():
+    # Started on the first enqueue rather than at import, so management commands never spawn them
+    with _workers_lock:
+        if not _workers:
+            _workers.extend(start_workers(settings.TASK_WORKERS, threading.Event()))
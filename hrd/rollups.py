@@ -0,0 +1,226 @@
+import threading
+from decimal import Decimal
+
+import numpy as np
+from django.db import router, transaction
+from django.utils import timezone
+
+from hrd.models import Applicant, Education, Job, JobRollup
+
+EDUCATION_LEVELS = [level for level, _ in Education.STATE_LEVEL_CHOICES]
+EDUCATION_LABELS = dict(Education.STATE_LEVEL_CHOICES, **{'': 'None recorded'})
+
+# Days left until the application deadline: (upper bound, label); None has no bound
+DEADLINE_BUCKETS = [(-1, 'Closed'), (7, 'Within a week'), (30, 'Within a month'), (None, 'Later')]
+
+# Rollup fields written by refresh()
+ROLLUP_FIELDS = [
+    'applicant_count', 'salary_count', 'salary_p25', 'salary_median', 'salary_p75',
+    'below_range', 'within_range', 'above_range', 'education_mix', 'stale', 'refreshed_at',
+]
+
+# Job and applicant ids touched in the current transaction, per thread and database alias
+_pending = threading.local()
+
+
+def _decimal(value):
+    return None if np.isnan(value) else Decimal(str(round(float(value), 2)))
+
+
+def compute_rollups(job_ids, using):
+    """
+    Unsaved JobRollup instances for the given jobs. The applicants of all of
+    them are fetched in one query and aggregated with array operations; only
+    the quartiles are taken job by job, over contiguous slices.
+    """
+    jobs = list(Job.objects.using(using).filter(pk__in=job_ids).order_by('pk').values_list('pk', 'min_salary', 'max_salary'))
+    if not jobs:
+        return []
+    job_pks = np.array([pk for pk, _, _ in jobs], dtype=np.int64)
+    min_salary = np.array([np.nan if low is None else float(low) for _, low, _ in jobs])
+    max_salary = np.array([np.nan if high is None else float(high) for _, _, high in jobs])
+
+    rows = list(
+        Applicant.objects.using(using).filter(position_applied_for__in=job_pks.tolist())
+        .values_list('position_applied_for_id', 'salary_expected', 'summary__highest_education_level')
+    )
+    applicant_job = np.array([row[0] for row in rows], dtype=np.int64)
+    salary = np.array([np.nan if row[1] is None else float(row[1]) for row in rows], dtype=np.float64)
+    level_index = {level: index for index, level in enumerate(EDUCATION_LEVELS)}
+    education = np.array([level_index.get(row[2], len(EDUCATION_LEVELS)) for row in rows], dtype=np.int64)
+
+    # Position of each applicant's job in job_pks, then everything per job via bincount
+    job_index = np.searchsorted(job_pks, applicant_job)
+    size = len(job_pks)
+    has_salary = ~np.isnan(salary)
+    below = has_salary & (salary < min_salary[job_index])
+    above = has_salary & (salary > max_salary[job_index])
+    counts = np.bincount(job_index, minlength=size)
+    salary_counts = np.bincount(job_index, weights=has_salary, minlength=size)
+    below_counts = np.bincount(job_index, weights=below, minlength=size)
+    above_counts = np.bincount(job_index, weights=above, minlength=size)
+    education_counts = np.bincount(
+        job_index * (len(EDUCATION_LEVELS) + 1) + education, minlength=size * (len(EDUCATION_LEVELS) + 1),
+    ).reshape(size, len(EDUCATION_LEVELS) + 1)
+
+    order = np.argsort(job_index, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    sorted_salary = salary[order]
+    rollups = []
+    for position, pk in enumerate(job_pks.tolist()):
+        group = sorted_salary[bounds[position]:bounds[position + 1]]
+        group = group[~np.isnan(group)]
+        p25, median, p75 = np.percentile(group, [25, 50, 75]) if len(group) else (np.nan,) * 3
+        mix = {
+            level: int(total)
+            for level, total in zip(EDUCATION_LEVELS + [''], education_counts[position].tolist()) if total
+        }
+        rollups.append(JobRollup(
+            job_id=pk,
+            applicant_count=int(counts[position]),
+            salary_count=int(salary_counts[position]),
+            salary_p25=_decimal(p25),
+            salary_median=_decimal(median),
+            salary_p75=_decimal(p75),
+            below_range=int(below_counts[position]),
+            within_range=int(salary_counts[position] - below_counts[position] - above_counts[position]),
+            above_range=int(above_counts[position]),
+            education_mix=mix,
+            stale=False,
+        ))
+    return rollups
+
+
+def refresh(job_ids, using=None):
+    """Recompute and upsert the rollups of the given jobs (missing jobs are skipped)."""
+    using = using or router.db_for_write(JobRollup)
+    rollups = compute_rollups(list(job_ids), using)
+    JobRollup.objects.using(using).bulk_create(
+        rollups, update_conflicts=True, unique_fields=['job'], update_fields=ROLLUP_FIELDS,
+    )
+    return len(rollups)
+
+
+def refresh_stale(batch_size=500, using=None):
+    """Refresh the rollups marked stale and create those of jobs that have none yet."""
+    using = using or router.db_for_write(JobRollup)
+    total = 0
+    while True:
+        stale = list(JobRollup.objects.using(using).filter(stale=True).values_list('job_id', flat=True)[:batch_size])
+        missing = list(Job.objects.using(using).filter(rollup__isnull=True).values_list('pk', flat=True)[:batch_size])
+        if not stale and not missing:
+            return total
+        with transaction.atomic(using=using):
+            total += refresh(stale + missing, using)
+
+
+def rebuild(batch_size=500, using=None, progress=None):
+    """Recompute every rollup, batch by batch in primary key order."""
+    using = using or router.db_for_write(JobRollup)
+    JobRollup.objects.using(using).exclude(job__in=Job.objects.using(using).values('pk')).delete()
+    total = 0
+    ids = list(Job.objects.using(using).order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        with transaction.atomic(using=using):
+            total += refresh(ids[start:start + batch_size], using)
+        if progress:
+            progress(total)
+    return total
+
+
+def mark_stale(job_ids=(), applicant_ids=(), using=None):
+    """
+    Flag the rollups of the given jobs, and of the jobs the given applicants
+    applied for, once the current transaction commits, and queue one refresh.
+    """
+    using = using or router.db_for_write(JobRollup)
+    if not hasattr(_pending, 'jobs'):
+        _pending.jobs, _pending.applicants = {}, {}
+    _pending.jobs.setdefault(using, set()).update(job_ids)
+    _pending.applicants.setdefault(using, set()).update(applicant_ids)
+    transaction.on_commit(lambda: _flush(using), using=using)
+
+
+def _flush(using):
+    from hrd import tasks  # hrd.tasks imports the modules that call mark_stale
+
+    job_ids = _pending.jobs.pop(using, set())
+    applicant_ids = _pending.applicants.pop(using, set())
+    if not job_ids and not applicant_ids:
+        return
+    if applicant_ids:
+        job_ids |= set(
+            Applicant.objects.using(using).filter(pk__in=applicant_ids).values_list('position_applied_for_id', flat=True)
+        )
+    JobRollup.objects.using(using).filter(job__in=job_ids).update(stale=True)
+    tasks.enqueue_rollup_refresh(using)
+
+
+def _shares(counts):
+    # (key, count, percentage) for a stacked bar
+    total = sum(counts.values())
+    return [(key, count, round(count * 100 / total, 1)) for key, count in counts.items() if count] if total else []
+
+
+def _education_bar(mix):
+    levels = EDUCATION_LEVELS + ['']
+    return [
+        {'label': EDUCATION_LABELS[level], 'count': count, 'percent': percent, 'hue': levels.index(level) * 300 // len(levels)}
+        for level, count, percent in _shares({level: mix.get(level, 0) for level in levels})
+    ]
+
+
+def dashboard():
+    """Context for the analytics dashboard, built from the rollups in one query."""
+    today = timezone.localdate()
+    jobs = []
+    by_type = {}
+    deadlines = {label: {'jobs': 0, 'applicants': 0} for _, label in DEADLINE_BUCKETS + [(None, 'No deadline')]}
+    education = {}
+    stale = 0
+    refreshed_at = None
+    for rollup in JobRollup.objects.select_related('job').order_by('-job__is_active', 'job__application_deadline', 'job__title'):
+        job = rollup.job
+        days_left = (job.application_deadline - today).days if job.application_deadline else None
+        if days_left is None:
+            bucket = 'No deadline'
+        else:
+            bucket = next(label for bound, label in DEADLINE_BUCKETS if bound is None or days_left <= bound)
+        jobs.append({
+            'job': job,
+            'rollup': rollup,
+            'days_left': days_left,
+            'salary_range': _shares({'below': rollup.below_range, 'within': rollup.within_range, 'above': rollup.above_range}),
+            'education': _education_bar(rollup.education_mix),
+        })
+        totals = by_type.setdefault(job.employment_type, {
+            'label': job.get_employment_type_display(), 'jobs': 0, 'active': 0, 'applicants': 0,
+            'salary_count': 0, 'below': 0, 'within': 0, 'above': 0,
+        })
+        totals['jobs'] += 1
+        totals['active'] += job.is_active
+        totals['applicants'] += rollup.applicant_count
+        totals['salary_count'] += rollup.salary_count
+        totals['below'] += rollup.below_range
+        totals['within'] += rollup.within_range
+        totals['above'] += rollup.above_range
+        deadlines[bucket]['jobs'] += 1
+        deadlines[bucket]['applicants'] += rollup.applicant_count
+        for level, count in rollup.education_mix.items():
+            education[level] = education.get(level, 0) + count
+        stale += rollup.stale
+        refreshed_at = max(refreshed_at or rollup.refreshed_at, rollup.refreshed_at)
+
+    for totals in by_type.values():
+        totals['salary_range'] = _shares({key: totals[key] for key in ('below', 'within', 'above')})
+    most_applicants = max([totals['applicants'] for totals in by_type.values()], default=0)
+    for totals in by_type.values():
+        totals['percent'] = round(totals['applicants'] * 100 / most_applicants, 1) if most_applicants else 0
+    return {
+        'jobs': jobs,
+        'employment_types': sorted(by_type.values(), key=lambda totals: -totals['applicants']),
+        'deadlines': [{'label': label, **counts} for label, counts in deadlines.items()],
+        'education': _education_bar(education),
+        'stale': stale,
+        'refreshed_at': refreshed_at,
+    }
@@ -0,0 +1,102 @@
+import contextlib
+import contextvars
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connections, DatabaseError, DEFAULT_DB_ALIAS
+
+logger = logging.getLogger(__name__)
+
+# Cookie holding the time until which a client that just wrote reads from the primary
+PIN_COOKIE = 'primary_until'
+
+# Replica alias the current request reads from (None: the router has no opinion), and the
+# per-request record of whether anything was written, both set by ReplicaRoutingMiddleware
+_read_alias = contextvars.ContextVar('hrd_read_alias', default=None)
+_writes = contextvars.ContextVar('hrd_writes', default=None)
+
+# Always read from the primary: a session or user created moments ago may not have reached a replica
+PRIMARY_ONLY_APPS = {'sessions', 'auth'}
+
+# Replicas that failed to connect, with the monotonic time to try them again
+_down_until = {}
+
+
+def read_alias():
+    """
+    A reachable replica (chosen at random) for read-only work, or the primary
+    when no replica is configured or none can be connected to right now.
+    """
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if _down_until.get(alias, 0) <= time.monotonic()]
+    random.shuffle(replicas)
+    for alias in replicas:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError as error:
+            _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+            logger.warning("Replica %s unavailable, reading from %s: %s", alias, DEFAULT_DB_ALIAS, error)
+            continue
+        return alias
+    return DEFAULT_DB_ALIAS
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def request_read_alias(request):
+    # Clients that wrote in the last REPLICA_PIN_SECONDS read their own writes from the primary
+    return DEFAULT_DB_ALIAS if is_pinned(request) else read_alias()
+
+
+class WriteLog:
+    wrote = False
+
+
+@contextlib.contextmanager
+def track_writes():
+    """Yields a WriteLog whose `wrote` turns true once anything but a session is written."""
+    writes = WriteLog()
+    token = _writes.set(writes)
+    try:
+        yield writes
+    finally:
+        _writes.reset(token)
+
+
+def use_replica(alias):
+    # Returns a token for stop_using_replica()
+    return _read_alias.set(alias)
+
+
+def stop_using_replica(token):
+    _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to a replica only inside a view
+    marked with hrd.middleware.reads_from_replica (or when a queryset is given
+    an alias explicitly); everything else reads from the primary as before.
+    """
+
+    def db_for_read(self, model, **hints):
+        if hints.get('instance') is not None:
+            return None  # Related lookups stay on the database the instance came from
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None and model._meta.app_label != 'sessions':
+            writes.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
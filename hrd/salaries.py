@@ -0,0 +1,147 @@
+import csv
+import os
+import threading
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Round
+
+from hrd.models import Applicant, EmploymentHistory, Job
+
+# Normalized column of each salary field, by model
+BASE_FIELDS = {
+    Job: {'min_salary': 'min_salary_base', 'max_salary': 'max_salary_base'},
+    Applicant: {'current_salary': 'current_salary_base', 'salary_expected': 'salary_expected_base'},
+    EmploymentHistory: {'last_salary': 'last_salary_base'},
+}
+
+# Applicant fields that change the normalized salaries of the applicant and its employment history
+APPLICANT_SOURCES = {'current_salary', 'salary_expected', 'position_applied_for'}
+
+CENT = Decimal('0.01')
+
+# ((path, modification time), rates) of the last file read in this process
+_loaded = (None, {})
+_lock = threading.Lock()
+
+
+def normalize_currency(code):
+    return (code or '').strip().upper()
+
+
+def _read(path):
+    rates = {}
+    with open(path, newline='', encoding='utf-8') as fp:
+        rows = csv.DictReader(line for line in fp if line.strip() and not line.startswith('#'))
+        for row in rows:
+            try:
+                rate = Decimal(row['per_base'])
+            except (KeyError, TypeError, InvalidOperation):
+                raise ImproperlyConfigured(f"{path}: expected currency,per_base columns, got {row}")
+            if rate <= 0:
+                raise ImproperlyConfigured(f"{path}: the rate of {row['currency']} must be positive")
+            rates[normalize_currency(row['currency'])] = rate
+    base = normalize_currency(settings.SALARY_BASE_CURRENCY)
+    if rates.get(base) != 1:
+        raise ImproperlyConfigured(f"{path}: SALARY_BASE_CURRENCY {base} must be listed with a rate of 1")
+    return rates
+
+
+def rates():
+    """
+    {currency: units per unit of the base currency} from EXCHANGE_RATES_FILE,
+    kept in memory and read again only when the file changes.
+    """
+    global _loaded
+    path = settings.EXCHANGE_RATES_FILE
+    version = (path, os.stat(path).st_mtime_ns)
+    if _loaded[0] != version:
+        with _lock:
+            if _loaded[0] != version:
+                _loaded = (version, _read(path))
+    return _loaded[1]
+
+
+def _factor(rate):
+    # Multiplying rather than dividing: SQLite stores whole amounts as integers and would divide them as such
+    return Decimal(1) / rate
+
+
+def to_base(amount, currency, table=None):
+    """amount in the base currency, or None when it or the currency's rate is missing."""
+    rate = (rates() if table is None else table).get(normalize_currency(currency))
+    if amount is None or rate is None:
+        return None
+    return (amount * _factor(rate)).quantize(CENT, ROUND_HALF_UP)
+
+
+def currency_of(instance):
+    # Applicants and their employment history give amounts in the currency of the job applied for
+    if isinstance(instance, Job):
+        return instance.currency
+    applicant = instance if isinstance(instance, Applicant) else instance.applicant
+    return applicant.position_applied_for.currency
+
+
+def normalize(instance):
+    """Set the normalized salary columns of an instance about to be saved."""
+    currency = currency_of(instance)
+    for field, base_field in BASE_FIELDS[type(instance)].items():
+        setattr(instance, base_field, to_base(getattr(instance, field), currency))
+
+
+def _converted(field, rate):
+    if rate is None:
+        return Value(None, output_field=DecimalField())
+    return Round(F(field) * Value(_factor(rate)), 2, output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def refresh_history(applicant, using=None):
+    """
+    Convert an applicant's employment history again, with one UPDATE, after
+    the applicant moved to a job in another currency. Returns the rows updated.
+    """
+    using = using or router.db_for_write(EmploymentHistory)
+    rate = rates().get(normalize_currency(applicant.position_applied_for.currency))
+    return EmploymentHistory.objects.using(using).filter(applicant=applicant).update(
+        **{base: _converted(field, rate) for field, base in BASE_FIELDS[EmploymentHistory].items()}
+    )
+
+
+def refresh(applicant_ids=None, job_ids=None, using=None):
+    """
+    Recompute normalized salaries in SQL, one UPDATE per currency and table:
+    for the given applicants, for the given jobs and their applicants, or,
+    with neither, for every row. Saves and deletes keep them current; this
+    covers bulk inserts, QuerySet.update() and changed rates. Returns the
+    number of rows updated.
+    """
+    using = using or router.db_for_write(Applicant)
+    table = rates()
+    jobs = Job.objects.using(using)
+    if job_ids is not None:
+        jobs = jobs.filter(pk__in=list(job_ids))
+    elif applicant_ids is not None:
+        jobs = jobs.filter(applicant__in=list(applicant_ids)).distinct()
+    # Jobs grouped by the rate of their currency; unknown currencies convert to NULL
+    by_rate = {}
+    for pk, currency in jobs.values_list('pk', 'currency'):
+        by_rate.setdefault(table.get(normalize_currency(currency)), []).append(pk)
+
+    updated = 0
+    for rate, pks in by_rate.items():
+        applicants = Applicant.objects.using(using).filter(position_applied_for__in=pks)
+        history = EmploymentHistory.objects.using(using).filter(applicant__position_applied_for__in=pks)
+        if applicant_ids is not None:
+            applicants = applicants.filter(pk__in=list(applicant_ids))
+            history = history.filter(applicant__in=list(applicant_ids))
+        else:
+            updated += Job.objects.using(using).filter(pk__in=pks).update(
+                **{base: _converted(field, rate) for field, base in BASE_FIELDS[Job].items()}
+            )
+        updated += applicants.update(**{base: _converted(field, rate) for field, base in BASE_FIELDS[Applicant].items()})
+        updated += history.update(**{base: _converted(field, rate) for field, base in BASE_FIELDS[EmploymentHistory].items()})
+    return updated
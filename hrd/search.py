@@ -0,0 +1,227 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router
+
+# Text fields indexed per model, most important first. The first field gets
+# the highest weight when ranking.
+SEARCH_FIELDS = {
+    'hrd.job': ('title', 'qualifications', 'skills_required', 'description', 'contact_email'),
+    'hrd.applicant': ('name', 'home_address'),
+}
+
+# Name of the relevance column added to searched querysets
+RANK = 'search_rank'
+
+
+def parse_terms(search_term):
+    # Only word characters reach the database, which keeps both query syntaxes injection free
+    return re.findall(r'\w+', (search_term or '').lower())
+
+
+def search_fields(model):
+    return SEARCH_FIELDS.get(model._meta.label_lower)
+
+
+def shadow_table(model):
+    return f'{model._meta.db_table}_search'
+
+
+def _document_row(row):
+    pk, *values = row
+    return [pk] + [value or '' for value in values]
+
+
+class SearchBackend:
+    """
+    A full-text index kept in a shadow table next to the model's own table.
+    Subclasses provide the vendor specific DDL, writes and query.
+    """
+    vendor = None
+
+    def install(self, connection, model):
+        raise NotImplementedError
+
+    def uninstall(self, connection, model):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(shadow_table(model))}')
+
+    def delete(self, connection, model, pks):
+        raise NotImplementedError
+
+    def insert(self, connection, model, rows):
+        raise NotImplementedError
+
+    def filter(self, queryset, terms):
+        raise NotImplementedError
+
+    def index(self, model, rows, using=None):
+        # rows are (pk, field values...) tuples in SEARCH_FIELDS order
+        rows = [_document_row(row) for row in rows]
+        if not rows:
+            return
+        connection = connections[using or router.db_for_write(model)]
+        self.delete(connection, model, [row[0] for row in rows])
+        self.insert(connection, model, rows)
+
+    def index_objects(self, objs, using=None):
+        objs = list(objs)
+        if objs:
+            fields = search_fields(type(objs[0]))
+            self.index(type(objs[0]), [[obj.pk] + [getattr(obj, field) for field in fields] for obj in objs], using)
+
+    def remove(self, model, pks, using=None):
+        if pks:
+            self.delete(connections[using or router.db_for_write(model)], model, list(pks))
+
+    def rebuild(self, model, batch_size=2_000, using=None):
+        using = using or router.db_for_write(model)
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(shadow_table(model))}')
+        fields = search_fields(model)
+        rows = model._default_manager.using(using).values_list('pk', *fields).order_by().iterator(chunk_size=batch_size)
+        batch = []
+        indexed = 0
+        for row in rows:
+            batch.append(_document_row(row))
+            if len(batch) >= batch_size:
+                self.insert(connection, model, batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            self.insert(connection, model, batch)
+            indexed += len(batch)
+        return indexed
+
+    def search(self, queryset, search_term):
+        """
+        Restrict queryset to rows matching every term (as a prefix) and add a
+        RANK column, higher meaning more relevant. search_term must contain at
+        least one word, see parse_terms().
+        """
+        return self.filter(queryset, parse_terms(search_term))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 virtual table with one column per indexed field, ranked with bm25()."""
+    vendor = 'sqlite'
+
+    def install(self, connection, model):
+        columns = ', '.join(search_fields(model))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {shadow_table(model)} '
+                f"USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def delete(self, connection, model, pks):
+        with connection.cursor() as cursor:
+            for start in range(0, len(pks), 500):
+                chunk = pks[start:start + 500]
+                cursor.execute(
+                    f"DELETE FROM {shadow_table(model)} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk
+                )
+
+    def insert(self, connection, model, rows):
+        fields = search_fields(model)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {shadow_table(model)} (rowid, {', '.join(fields)}) "
+                f"VALUES ({', '.join(['%s'] * (len(fields) + 1))})",
+                rows,
+            )
+
+    def filter(self, queryset, terms):
+        table = shadow_table(queryset.model)
+        weights = ', '.join(['10.0'] + ['1.0'] * (len(search_fields(queryset.model)) - 1))
+        return queryset.extra(
+            select={RANK: f'-bm25({table}, {weights})'},
+            tables=[table],
+            where=[f'{table}.rowid = {queryset.model._meta.db_table}.{queryset.model._meta.pk.column}', f'{table} MATCH %s'],
+            params=[' '.join(f'"{term}"*' for term in terms)],
+        )
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """tsvector shadow table with a GIN index, ranked with ts_rank()."""
+    vendor = 'postgresql'
+    config = 'simple'
+
+    def install(self, connection, model):
+        table = shadow_table(model)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS {table} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_document_idx ON {table} USING GIN (document)')
+
+    def delete(self, connection, model, pks):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {shadow_table(model)} WHERE id = ANY(%s)', [pks])
+
+    def insert(self, connection, model, rows):
+        # The first field is weighted A, the rest B
+        fields = search_fields(model)
+        document = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', %s), '{'A' if index == 0 else 'B'}')"
+            for index in range(len(fields))
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {shadow_table(model)} (id, document) VALUES (%s, {document}) '
+                f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                rows,
+            )
+
+    def filter(self, queryset, terms):
+        table = shadow_table(queryset.model)
+        query = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.extra(
+            select={RANK: f"ts_rank({table}.document, to_tsquery('{self.config}', %s))"},
+            select_params=[query],
+            tables=[table],
+            where=[
+                f'{table}.id = {queryset.model._meta.db_table}.{queryset.model._meta.pk.column}',
+                f"{table}.document @@ to_tsquery('{self.config}', %s)",
+            ],
+            params=[query],
+        )
+
+
+BACKENDS = {
+    backend.vendor: backend for backend in (SQLiteSearchBackend(), PostgreSQLSearchBackend())
+}
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(option == 'ENABLE_FTS5' for option, in cursor.fetchall())
+
+
+_backend_cache = {}
+
+
+def get_backend(using):
+    """
+    Return the search backend for a database alias, or None when full-text
+    search is disabled or unsupported there (callers then fall back to the
+    admin's icontains search).
+    """
+    if using not in _backend_cache:
+        connection = connections[using]
+        name = settings.SEARCH_BACKEND
+        if name == 'none':
+            backend = None
+        elif name == 'auto':
+            backend = BACKENDS.get(connection.vendor)
+            if backend and connection.vendor == 'sqlite' and not _sqlite_has_fts5(connection):
+                backend = None
+        elif name in BACKENDS:
+            if BACKENDS[name].vendor != connection.vendor:
+                raise ImproperlyConfigured(f"SEARCH_BACKEND '{name}' cannot run on a {connection.vendor} database")
+            backend = BACKENDS[name]
+        else:
+            raise ImproperlyConfigured(f"Unknown SEARCH_BACKEND '{name}'")
+        _backend_cache[using] = backend
+    return _backend_cache[using]
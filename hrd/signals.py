@@ -0,0 +1,157 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_migrate, post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from hrd import changes, dedup, jobboard, rollups, salaries, search, summaries
+from hrd.permissions import permission_cache
+from hrd.models import Job, Applicant, EmploymentHistory, Education, Family, ApplicantReference, Submission, ChangeRecord
+
+
+@receiver(post_save, sender=Job, dispatch_uid='hrd_job_saved_invalidate_board')
+@receiver(post_delete, sender=Job, dispatch_uid='hrd_job_deleted_invalidate_board')
+def invalidate_job_board(sender, **kwargs):
+    # Wait for the commit so a concurrent hit cannot re-cache the old rows
+    transaction.on_commit(jobboard.invalidate)
+
+
+@receiver(post_save, sender=User, dispatch_uid='hrd_user_saved_permissions')
+@receiver(post_delete, sender=User, dispatch_uid='hrd_user_deleted_permissions')
+def invalidate_user_permissions(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only, which changes nothing the permission set depends on
+    if update_fields != frozenset(['last_login']):
+        permission_cache.delete(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid='hrd_user_groups_permissions')
+@receiver(m2m_changed, sender=User.user_permissions.through, dispatch_uid='hrd_user_permissions_permissions')
+def invalidate_member_permissions(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        if isinstance(instance, User):
+            permission_cache.delete(instance.pk)
+        else:
+            permission_cache.invalidate()  # Changed from the group or permission side
+
+
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid='hrd_group_permissions_permissions')
+@receiver(post_delete, sender=Group, dispatch_uid='hrd_group_deleted_permissions')
+@receiver(post_save, sender=Permission, dispatch_uid='hrd_permission_saved_permissions')
+@receiver(post_delete, sender=Permission, dispatch_uid='hrd_permission_deleted_permissions')
+@receiver(post_migrate, dispatch_uid='hrd_migrated_permissions')  # Permissions created or renamed in bulk
+def invalidate_all_permissions(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        permission_cache.invalidate()
+
+
+@receiver(post_save, sender=Job, dispatch_uid='hrd_job_saved_search_index')
+@receiver(post_save, sender=Applicant, dispatch_uid='hrd_applicant_saved_search_index')
+def update_search_index(sender, instance, using, **kwargs):
+    backend = search.get_backend(using)
+    if backend:
+        backend.index_objects([instance], using=using)
+
+
+@receiver(post_delete, sender=Job, dispatch_uid='hrd_job_deleted_search_index')
+@receiver(post_delete, sender=Applicant, dispatch_uid='hrd_applicant_deleted_search_index')
+def remove_from_search_index(sender, instance, using, **kwargs):
+    backend = search.get_backend(using)
+    if backend:
+        backend.remove(sender, [instance.pk], using=using)
+
+
+@receiver(post_save, sender=Applicant, dispatch_uid='hrd_applicant_saved_summary')
+def create_applicant_summary(sender, instance, created, using, **kwargs):
+    if created:
+        summaries.mark_dirty(instance.pk, using)
+
+
+# Child records that feed ApplicantSummary
+SUMMARY_SOURCES = (EmploymentHistory, Education, Family, ApplicantReference, Submission)
+
+
+def update_applicant_summary(sender, instance, using, **kwargs):
+    summaries.mark_dirty(instance.applicant_id, using)
+
+
+for model in SUMMARY_SOURCES:
+    post_save.connect(update_applicant_summary, sender=model, dispatch_uid=f'hrd_{model._meta.model_name}_saved_summary')
+    post_delete.connect(update_applicant_summary, sender=model, dispatch_uid=f'hrd_{model._meta.model_name}_deleted_summary')
+
+
+@receiver(pre_save, sender=Applicant, dispatch_uid='hrd_applicant_previous_job')
+def remember_previous_job(sender, instance, using, **kwargs):
+    # The job an applicant moves away from: its rollup still counts them, and their
+    # employment history amounts are in its currency
+    if instance._state.adding:
+        previous = None
+    elif hasattr(instance, '_loaded_job_id'):
+        previous = instance._loaded_job_id
+    else:
+        previous = Applicant.objects.using(using).filter(pk=instance.pk).values_list('position_applied_for', flat=True).first()
+    instance._moved_from_job_id = previous if previous != instance.position_applied_for_id else None
+    instance._loaded_job_id = instance.position_applied_for_id
+
+
+# Analytics rollups: the job an applicant applied for, the job's salary range and education records
+@receiver(post_save, sender=Applicant, dispatch_uid='hrd_applicant_saved_rollup')
+@receiver(post_delete, sender=Applicant, dispatch_uid='hrd_applicant_deleted_rollup')
+def update_applicant_rollup(sender, instance, using, **kwargs):
+    job_ids = [instance.position_applied_for_id, getattr(instance, '_moved_from_job_id', None)]
+    rollups.mark_stale(job_ids=[pk for pk in job_ids if pk is not None], using=using)
+
+
+@receiver(post_save, sender=Job, dispatch_uid='hrd_job_saved_rollup')
+def update_job_rollup(sender, instance, using, **kwargs):
+    rollups.mark_stale(job_ids=[instance.pk], using=using)
+
+
+@receiver(post_save, sender=Education, dispatch_uid='hrd_education_saved_rollup')
+@receiver(post_delete, sender=Education, dispatch_uid='hrd_education_deleted_rollup')
+def update_education_rollup(sender, instance, using, **kwargs):
+    rollups.mark_stale(applicant_ids=[instance.applicant_id], using=using)
+
+
+@receiver(post_save, sender=Applicant, dispatch_uid='hrd_applicant_saved_dedup')
+def check_applicant_duplicates(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & set(dedup.WEIGHTS):
+        dedup.mark_changed(instance.pk, using)
+
+
+# Change feed: the record is inserted in the transaction that saved or deleted the instance
+def record_saved(sender, instance, created, using, update_fields=None, **kwargs):
+    changes.record([instance], ChangeRecord.CREATED if created else ChangeRecord.UPDATED, update_fields or (), using)
+
+
+def record_deleted(sender, instance, using, **kwargs):
+    changes.record([instance], ChangeRecord.DELETED, using=using)
+
+
+for model in changes.TRACKED_MODELS:
+    post_save.connect(record_saved, sender=model, dispatch_uid=f'hrd_{model._meta.model_name}_saved_change')
+    post_delete.connect(record_deleted, sender=model, dispatch_uid=f'hrd_{model._meta.model_name}_deleted_change')
+
+
+# Salaries converted to SALARY_BASE_CURRENCY, written with the row itself
+@receiver(pre_save, sender=Job, dispatch_uid='hrd_job_normalize_salaries')
+@receiver(pre_save, sender=Applicant, dispatch_uid='hrd_applicant_normalize_salaries')
+@receiver(pre_save, sender=EmploymentHistory, dispatch_uid='hrd_employmenthistory_normalize_salaries')
+def normalize_salaries(sender, instance, using, **kwargs):
+    salaries.normalize(instance)
+    if sender is Job:
+        # The applicants' amounts are in the job's currency, see post_save below
+        instance._currency_changed = instance.pk is not None and (
+            Job.objects.using(using).filter(pk=instance.pk).exclude(currency=instance.currency).exists()
+        )
+
+
+@receiver(post_save, sender=Job, dispatch_uid='hrd_job_saved_applicant_salaries')
+def update_applicant_salaries(sender, instance, using, **kwargs):
+    if getattr(instance, '_currency_changed', False):
+        salaries.refresh(job_ids=[instance.pk], using=using)
+
+
+@receiver(post_save, sender=Applicant, dispatch_uid='hrd_applicant_moved_salaries')
+def update_history_salaries(sender, instance, using, **kwargs):
+    # Employment history amounts follow the currency of the job applied for
+    if getattr(instance, '_moved_from_job_id', None) is not None:
+        salaries.refresh_history(instance, using=using)
@@ -0,0 +1,273 @@
+import datetime
+import json
+import os
+
+import numpy as np
+from django.db import models
+from django.db.models import Max, Q
+from django.utils import timezone
+from multiselectfield import MultiSelectField
+
+from hrd.importer import CHILD_RELATIONS
+from hrd.models import Applicant, ChangeRecord, Job
+
+# Tables written, by name. Jobs are few, so they are rewritten on every run. The others get the
+# rows above their primary key watermark appended, and are rewritten when the change feed shows
+# rows of theirs edited or deleted since the previous run (see edited_tables()).
+TABLES = {
+    'jobs': Job,
+    'applicants': Applicant,
+    **CHILD_RELATIONS,
+}
+REWRITTEN_TABLES = {'jobs'}
+
+# Free-text fields kept anyway, dictionary encoded like choice fields
+DICTIONARY_FIELDS = {Job._meta.get_field('currency')}
+
+FORMATS = ('npy', 'arrow', 'parquet')
+NPY_HEADERS = {
+    (1, 0): (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+    (2, 0): (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0),
+}
+MANIFEST = 'manifest.json'
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Arrow and Parquet snapshots require pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def default_format():
+    try:
+        _pyarrow()
+    except RuntimeError:
+        return 'npy'
+    return 'arrow'
+
+
+def column_spec(field):
+    """
+    How a model field is stored, or None for fields left out of snapshots
+    (free text, UUIDs). Missing values are stored as the `null` sentinel.
+    """
+    if isinstance(field, MultiSelectField):
+        # One bit per choice
+        return {'kind': 'bitmask', 'dtype': 'int32', 'dictionary': [value for value, _ in field.flatchoices]}
+    if field.choices or field in DICTIONARY_FIELDS:
+        dictionary = [value for value, _ in field.flatchoices]
+        return {'kind': 'dictionary', 'dtype': 'int8' if len(dictionary) < 100 else 'int16', 'null': -1, 'dictionary': dictionary}
+    if isinstance(field, (models.AutoField, models.ForeignKey)):
+        return {'kind': 'int', 'dtype': 'int64', 'null': int(np.iinfo(np.int64).min)}
+    if isinstance(field, models.BooleanField):
+        return {'kind': 'bool', 'dtype': 'bool'}
+    if isinstance(field, models.IntegerField):
+        return {'kind': 'int', 'dtype': 'int32', 'null': int(np.iinfo(np.int32).min)}
+    if isinstance(field, models.DecimalField):
+        # Fixed point: the value times 10 ** scale
+        return {'kind': 'decimal', 'dtype': 'int64', 'scale': field.decimal_places, 'null': int(np.iinfo(np.int64).min)}
+    if isinstance(field, models.DateField) and not isinstance(field, models.DateTimeField):
+        # Days since 1970-01-01
+        return {'kind': 'date', 'dtype': 'int32', 'null': int(np.iinfo(np.int32).min)}
+    return None
+
+
+def table_columns(model):
+    return {field.attname: spec for field in model._meta.concrete_fields if (spec := column_spec(field))}
+
+
+def _encode(values, spec):
+    kind = spec['kind']
+    null = spec.get('null')
+    if kind == 'dictionary':
+        codes = {value: code for code, value in enumerate(spec['dictionary'])}
+        for value in values:
+            if value not in codes and value not in (None, ''):
+                # New free-text values extend the dictionary; existing codes never change
+                codes[value] = len(spec['dictionary'])
+                spec['dictionary'].append(value)
+        encoded = [codes.get(value, null) for value in values]
+    elif kind == 'bitmask':
+        bits = {value: 1 << index for index, value in enumerate(spec['dictionary'])}
+        encoded = [sum(bits.get(value, 0) for value in chosen or ()) for chosen in values]
+    elif kind == 'decimal':
+        encoded = [null if value is None else int(value.scaleb(spec['scale'])) for value in values]
+    elif kind == 'date':
+        encoded = [null if value is None else (value - EPOCH).days for value in values]
+    elif kind == 'int':
+        encoded = [null if value is None else value for value in values]
+    else:
+        encoded = values
+    return np.array(encoded, dtype=spec['dtype'])
+
+
+def _append_npy(path, array, rows_before):
+    """
+    Append to a .npy file in place. The header numpy writes leaves room for
+    the row count to grow, so only the shape is rewritten; anything past the
+    first rows_before rows (an interrupted run) is dropped first.
+    """
+    if not os.path.exists(path):
+        np.save(path, array)
+        return
+    with open(path, 'r+b') as fp:
+        version = np.lib.format.read_magic(fp)
+        if version not in NPY_HEADERS:
+            raise RuntimeError(f"{path} is a version {version} .npy file, cannot append to it")
+        read_header, write_header = NPY_HEADERS[version]
+        shape, _, dtype = read_header(fp)
+        data_start = fp.tell()
+        if dtype != array.dtype:
+            raise RuntimeError(f"{path} holds {dtype}, cannot append {array.dtype}")
+        fp.truncate(data_start + rows_before * dtype.itemsize)
+        fp.seek(0, os.SEEK_END)
+        fp.write(array.tobytes())
+        header = np.lib.format.header_data_from_array_1_0(array)
+        header['shape'] = (rows_before + len(array),)
+        fp.seek(0)
+        write_header(fp, header)
+        if fp.tell() != data_start:
+            raise RuntimeError(f"Cannot grow the header of {path} in place")
+
+
+def _arrow_table(columns, specs):
+    pa = _pyarrow()
+    arrays = {}
+    for name, values in columns.items():
+        spec = specs[name]
+        mask = values == spec['null'] if 'null' in spec else None
+        array = pa.array(values, mask=mask)
+        if spec['kind'] == 'dictionary':
+            array = pa.DictionaryArray.from_arrays(array, pa.array(spec['dictionary'], type=pa.string()))
+        elif spec['kind'] == 'date':
+            array = array.cast(pa.date32())
+        arrays[name] = array
+    return pa.table(arrays)
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def edited_tables(changes, manifest):
+    """
+    Names of the appended tables with rows edited or deleted after the change
+    feed position in the manifest, or all of them when the feed no longer
+    reaches back to it (compacted, or a snapshot written without one).
+    """
+    appended = {name: table for name, table in manifest['tables'].items() if name not in REWRITTEN_TABLES}
+    position = manifest.get('changes')
+    if position is None or (position and not changes.filter(pk__lte=position).exists()):
+        return set(appended)
+    edited = set()
+    for name, table in appended.items():
+        # Compaction can fold an edit into a later record of the row, which then reads as its creation
+        later = changes.filter(pk__gt=position, model=table['model'])
+        if later.filter(~Q(action=ChangeRecord.CREATED) | Q(object_id__lte=table['watermark'])).exists():
+            edited.add(name)
+    return edited
+
+
+def write_snapshot(directory, queryset_for, file_format=None, chunk_size=10_000, full=False, progress=None):
+    """
+    Create or extend the snapshot in `directory`. `queryset_for(model)` gives
+    the rows to read (for example on a replica). Returns ({table: rows added},
+    names of the appended tables written again because of edits).
+    """
+    manifest = None if full else read_manifest(directory)
+    if manifest is None:
+        if full and os.path.exists(os.path.join(directory, MANIFEST)):
+            os.remove(os.path.join(directory, MANIFEST))
+        manifest = {'format': file_format or default_format(), 'tables': {}}
+    elif file_format and file_format != manifest['format']:
+        raise RuntimeError(f"{directory} holds a {manifest['format']} snapshot; use another directory or --full")
+    file_format = manifest['format']
+    if file_format != 'npy':
+        _pyarrow()
+
+    changes = queryset_for(ChangeRecord)
+    edited = set() if full else edited_tables(changes, manifest)
+    # Taken before reading, so edits made while the tables are written are found next time
+    manifest['changes'] = changes.aggregate(position=Max('pk'))['position'] or 0
+
+    added = {}
+    for name, model in TABLES.items():
+        table = manifest['tables'].get(name)
+        if table is None or name in REWRITTEN_TABLES or name in edited or full:
+            table = {'model': model._meta.label_lower, 'rows': 0, 'watermark': 0, 'parts': 0, 'columns': table_columns(model)}
+            _clear(os.path.join(directory, name))
+        specs = table['columns']
+        attnames = list(specs)
+        rows = queryset_for(model).filter(pk__gt=table['watermark']).order_by('pk').values_list(*attnames)
+        added[name] = 0
+        chunk = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                _write_chunk(directory, name, table, file_format, chunk)
+                added[name] += len(chunk)
+                chunk = []
+                if progress:
+                    progress(name, table['rows'])
+        if chunk:
+            _write_chunk(directory, name, table, file_format, chunk)
+            added[name] += len(chunk)
+        manifest['tables'][name] = table
+
+    manifest['updated_at'] = timezone.now().isoformat()
+    # The manifest is replaced last: after an interrupted run, readers still see the appended tables at
+    # their previous length, and the next run overwrites whatever was written past it
+    path = os.path.join(directory, MANIFEST)
+    with open(f'{path}.tmp', 'w') as fp:
+        json.dump(manifest, fp, indent=2)
+    os.replace(f'{path}.tmp', path)
+    return added, edited
+
+
+def _clear(path):
+    if os.path.isdir(path):
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+    os.makedirs(path, exist_ok=True)
+
+
+def _write_chunk(directory, name, table, file_format, chunk):
+    specs = table['columns']
+    columns = {attname: _encode([row[index] for row in chunk], spec) for index, (attname, spec) in enumerate(specs.items())}
+    if file_format == 'npy':
+        for attname, values in columns.items():
+            _append_npy(os.path.join(directory, name, f'{attname}.npy'), values, table['rows'])
+    else:
+        pa = _pyarrow()
+        part = os.path.join(directory, name, f"part-{table['parts']:05d}.{file_format}")
+        arrow_table = _arrow_table(columns, specs)
+        if file_format == 'parquet':
+            pa.parquet.write_table(arrow_table, part)
+        else:
+            with pa.OSFile(part, 'wb') as sink, pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        table['parts'] += 1
+    table['rows'] += len(chunk)
+    table['watermark'] = chunk[-1][list(specs).index('id')]
+
+
+def load(directory, table):
+    """
+    Columns of a .npy snapshot table as read-only memory maps, cut to the rows
+    the manifest records.
+    """
+    with open(os.path.join(directory, MANIFEST)) as fp:
+        manifest = json.load(fp)
+    rows = manifest['tables'][table]['rows']
+    return {
+        attname: np.load(os.path.join(directory, table, f'{attname}.npy'), mmap_mode='r')[:rows]
+        for attname in manifest['tables'][table]['columns']
+    }
@@ -0,0 +1,122 @@
+import threading
+from decimal import Decimal
+
+from django.db import transaction, router
+from django.db.models import Count, Max, Case, When, IntegerField
+from django.utils import timezone
+
+from hrd.models import Applicant, ApplicantSummary, EmploymentHistory, Education, Family, ApplicantReference, Submission
+
+SUMMARY_FIELDS = [
+    'experience_years', 'last_salary', 'highest_education_level', 'education_rank',
+    'family_size', 'reference_count', 'pending_submissions', 'refreshed_at',
+]
+
+EDUCATION_LEVELS = [level for level, _ in Education.STATE_LEVEL_CHOICES]
+
+# Applicant ids touched in the current transaction, per thread and database alias
+_pending = threading.local()
+
+
+def _count_by_applicant(model, applicant_ids, using):
+    rows = (
+        model.objects.using(using).filter(applicant_id__in=applicant_ids)
+        .values('applicant_id').annotate(total=Count('pk')).order_by().values_list('applicant_id', 'total')
+    )
+    return dict(rows)
+
+
+def compute_summaries(applicant_ids, using):
+    """
+    Build unsaved ApplicantSummary objects for the given applicants with one
+    grouped query per child table.
+    """
+    applicant_ids = list(applicant_ids)
+    today = timezone.localdate()
+    summaries = {pk: ApplicantSummary(applicant_id=pk, refreshed_at=timezone.now()) for pk in applicant_ids}
+
+    # Histories come back oldest first, so the last one seen per applicant carries the last salary
+    histories = (
+        EmploymentHistory.objects.using(using).filter(applicant_id__in=applicant_ids)
+        .order_by('applicant_id', 'date_of_employment', 'pk')
+        .values_list('applicant_id', 'date_of_employment', 'date_employment_ended', 'last_salary')
+    )
+    experience_days = {}
+    for applicant_id, started, ended, last_salary in histories:
+        experience_days[applicant_id] = experience_days.get(applicant_id, 0) + max(((ended or today) - started).days, 0)
+        summaries[applicant_id].last_salary = last_salary
+    for applicant_id, days in experience_days.items():
+        summaries[applicant_id].experience_years = (Decimal(days) / Decimal('365.25')).quantize(Decimal('0.1'))
+
+    education_rank = Max(Case(
+        *[When(state_level_attained=level, then=rank) for rank, level in enumerate(EDUCATION_LEVELS)],
+        output_field=IntegerField(),
+    ))
+    ranks = (
+        Education.objects.using(using).filter(applicant_id__in=applicant_ids)
+        .values('applicant_id').annotate(rank=education_rank).order_by().values_list('applicant_id', 'rank')
+    )
+    for applicant_id, rank in ranks:
+        if rank is not None:
+            summaries[applicant_id].education_rank = rank
+            summaries[applicant_id].highest_education_level = EDUCATION_LEVELS[rank]
+
+    for field, model in (('family_size', Family), ('reference_count', ApplicantReference), ('pending_submissions', Submission)):
+        for applicant_id, total in _count_by_applicant(model, applicant_ids, using).items():
+            setattr(summaries[applicant_id], field, total)
+
+    return list(summaries.values())
+
+
+def refresh(applicant_ids, using=None):
+    """Recompute and upsert the summaries of the given applicants (missing applicants are skipped)."""
+    using = using or router.db_for_write(ApplicantSummary)
+    existing = list(Applicant.objects.using(using).filter(pk__in=list(applicant_ids)).values_list('pk', flat=True))
+    if not existing:
+        return 0
+    ApplicantSummary.objects.using(using).bulk_create(
+        compute_summaries(existing, using),
+        update_conflicts=True,
+        unique_fields=['applicant'],
+        update_fields=SUMMARY_FIELDS,
+    )
+    return len(existing)
+
+
+def rebuild(batch_size=2_000, using=None, progress=None):
+    """Recompute every summary, batch by batch in primary key order."""
+    using = using or router.db_for_write(ApplicantSummary)
+    ids = Applicant.objects.using(using).order_by('pk').values_list('pk', flat=True)
+    total = 0
+    batch = []
+    for pk in ids.iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            with transaction.atomic(using=using):
+                total += refresh(batch, using)
+            batch = []
+            if progress:
+                progress(total)
+    if batch:
+        with transaction.atomic(using=using):
+            total += refresh(batch, using)
+    if progress:
+        progress(total)
+    return total
+
+
+def mark_dirty(applicant_id, using):
+    """
+    Queue an applicant's summary for refresh once the current transaction
+    commits. Saving a whole inline formset therefore costs one refresh.
+    """
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = {}
+    _pending.ids.setdefault(using, set()).add(applicant_id)
+    transaction.on_commit(lambda: _flush(using), using=using)
+
+
+def _flush(using):
+    applicant_ids = _pending.ids.pop(using, None)
+    if applicant_ids:
+        refresh(applicant_ids, using)
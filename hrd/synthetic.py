@@ -0,0 +1,221 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction, router
+
+from hrd.models import Job, Applicant, EmploymentHistory, Education, Family, Organization, ApplicantReference, Submission, ChangeRecord
+from hrd import changes, search
+from hrd.bulk import applicants_bulk_created
+from hrd.permissions import grant_recruiter_permissions
+
+# Child rows generated for every synthetic applicant
+CHILDREN_PER_APPLICANT = {
+    EmploymentHistory: 2,
+    Education: 3,
+    Family: 3,
+    Organization: 1,
+    ApplicantReference: 2,
+    Submission: 1,
+}
+
+FIRST_NAMES = ['Adi', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko', 'Kartika', 'Lestari']
+LAST_NAMES = ['Santoso', 'Wijaya', 'Saputra', 'Hidayat', 'Nugroho', 'Kusuma', 'Pratama', 'Siregar', 'Halim', 'Tan']
+CITIES = ['Jakarta', 'Bandung', 'Surabaya', 'Medan', 'Semarang', 'Yogyakarta', 'Makassar', 'Denpasar']
+SKILLS = ['python', 'django', 'sql', 'excel', 'accounting', 'sales', 'marketing', 'driving', 'english', 'design']
+
+
+def _choice_values(choices):
+    return [value for value, _ in choices]
+
+
+def _money(rng, low, high):
+    return Decimal(rng.randrange(low, high, 250_000))
+
+
+def create_recruiters(count, prefix='bench-recruiter'):
+    recruiters = []
+    for index in range(count):
+        user, created = User.objects.get_or_create(
+            username=f'{prefix}-{index}',
+            defaults={'email': f'{prefix}-{index}@example.com', 'is_staff': True},
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+            grant_recruiter_permissions(user)
+        recruiters.append(user)
+    return recruiters
+
+
+def build_job(rng, index):
+    today = datetime.date.today()
+    min_salary = _money(rng, 4_000_000, 15_000_000)
+    return Job(
+        title=f'{rng.choice(SKILLS).title()} Specialist {index}',
+        description=' '.join(rng.choices(SKILLS, k=12)),
+        employment_type=rng.choice(_choice_values(Job.EMPLOYMENT_TYPE_CHOICES)),
+        qualifications='Bachelor degree',
+        experience_required=rng.randint(0, 10),
+        skills_required=', '.join(rng.sample(SKILLS, 3)),
+        min_salary=min_salary,
+        max_salary=min_salary + _money(rng, 1_000_000, 10_000_000),
+        currency='IDR',
+        application_deadline=today + datetime.timedelta(days=rng.randint(-30, 90)),
+        contact_email=f'hr{index}@example.com',
+        is_active=rng.random() < 0.8,
+    )
+
+
+def build_applicant(rng, index, jobs, recruiters):
+    today = datetime.date.today()
+    age = rng.randint(18, 60)
+    engaged_in_business = rng.random() < 0.1
+    return Applicant(
+        created_by=rng.choice(recruiters),
+        name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}',
+        home_address=f'Jl. Merdeka No. {rng.randint(1, 300)}, {rng.choice(CITIES)}',
+        living_situation=rng.choice(_choice_values(Applicant.LIVING_CHOICES)),
+        sex=rng.choice(_choice_values(Applicant.SEX_CHOICES)),
+        mobile_phone=f'08{rng.randint(100_000_000, 999_999_999)}',
+        computer_proficient=rng.random() < 0.7,
+        programs_languages=', '.join(rng.sample(SKILLS, 2)),
+        position_applied_for=rng.choice(jobs),
+        interested_in_other_positions=rng.random() < 0.5,
+        current_salary=_money(rng, 3_000_000, 20_000_000),
+        salary_expected=_money(rng, 4_000_000, 25_000_000),
+        date_of_birth=today - datetime.timedelta(days=age * 365 + rng.randint(0, 364)),
+        age=age,
+        place_of_birth=rng.choice(CITIES),
+        marital_status=rng.choice(_choice_values(Applicant.MARITAL_STATUS_CHOICES)),
+        nationality=rng.choice(_choice_values(Applicant.NATIONALITY_CHOICES)),
+        race=rng.choice(_choice_values(Applicant.RACE_CHOICES)),
+        religion=rng.choice(_choice_values(Applicant.RELIGION_CHOICES)),
+        driving_license=rng.sample(_choice_values(Applicant.DRIVING_LICENSE_CHOICES), rng.randint(0, 2)),
+        owns_car=rng.random() < 0.3,
+        good_health=rng.random() < 0.9,
+        refused_insurance_coverage=False,
+        alcohol_or_drugs=False,
+        convicted_in_court=False,
+        in_debt=rng.random() < 0.2,
+        dismissed_or_suspended=False,
+        engaged_in_business=engaged_in_business,
+        business_type=rng.choice(_choice_values(Applicant.BUSINESS_TYPE_CHOICES)) if engaged_in_business else None,
+        other_sources_of_income=rng.random() < 0.1,
+        spoken_languages=rng.choice(_choice_values(Applicant.LANGUAGE_CHOICES)),
+        written_languages=rng.choice(_choice_values(Applicant.LANGUAGE_CHOICES)),
+        agreement=True,
+    )
+
+
+def build_children(rng, applicant):
+    today = datetime.date.today()
+    children = {model: [] for model in CHILDREN_PER_APPLICANT}
+
+    started = today - datetime.timedelta(days=rng.randint(2_000, 8_000))
+    for _ in range(CHILDREN_PER_APPLICANT[EmploymentHistory]):
+        ended = started + datetime.timedelta(days=rng.randint(180, 1_800))
+        children[EmploymentHistory].append(EmploymentHistory(
+            applicant=applicant,
+            date_of_employment=started,
+            date_employment_ended=ended if ended < today else None,
+            company_name=f'PT {rng.choice(LAST_NAMES)} {rng.choice(CITIES)}',
+            company_address=rng.choice(CITIES),
+            nature_of_business=rng.choice(_choice_values(Applicant.BUSINESS_TYPE_CHOICES)),
+            position_held=f'{rng.choice(SKILLS).title()} Staff',
+            supervisor_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            supervisor_designation='Manager',
+            description_of_duties=' '.join(rng.choices(SKILLS, k=8)),
+            employed_through='Advertisement',
+            last_salary=_money(rng, 3_000_000, 20_000_000),
+        ))
+        started = min(ended, today)
+
+    levels = _choice_values(Education.STATE_LEVEL_CHOICES)
+    year = applicant.date_of_birth.year + 6
+    for level in levels[:CHILDREN_PER_APPLICANT[Education]]:
+        children[Education].append(Education(
+            applicant=applicant,
+            from_year=year,
+            to_year=year + 3,
+            school_name=f'{level} Negeri {rng.randint(1, 50)} {rng.choice(CITIES)}',
+            state_level_attained=level,
+            major_course='General',
+        ))
+        year += 3
+
+    relationships = _choice_values(Family.RELATIONSHIP_CHOICES)
+    for relationship in rng.sample(relationships, CHILDREN_PER_APPLICANT[Family]):
+        children[Family].append(Family(
+            applicant=applicant,
+            relationship=relationship,
+            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            age=rng.randint(1, 80),
+        ))
+
+    for _ in range(CHILDREN_PER_APPLICANT[Organization]):
+        children[Organization].append(Organization(
+            applicant=applicant,
+            from_year=rng.randint(2000, 2020),
+            organization_name=f'{rng.choice(CITIES)} Youth Club',
+        ))
+
+    for reference_type in rng.choices(_choice_values(ApplicantReference.REFERENCE_TYPE_CHOICES), k=CHILDREN_PER_APPLICANT[ApplicantReference]):
+        children[ApplicantReference].append(ApplicantReference(
+            applicant=applicant,
+            reference_type=reference_type,
+            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            position='Supervisor',
+            company_name=f'PT {rng.choice(LAST_NAMES)}',
+            company_address=rng.choice(CITIES),
+            years_of_acquaintance=rng.randint(3, 20),
+        ))
+
+    for _ in range(CHILDREN_PER_APPLICANT[Submission]):
+        children[Submission].append(Submission(
+            applicant=applicant,
+            company_name=f'PT {rng.choice(LAST_NAMES)}',
+            date_of_application=today - datetime.timedelta(days=rng.randint(0, 60)),
+        ))
+
+    return children
+
+
+def seed(applicants, jobs=50, recruiters=5, batch_size=2_000, seed_value=0, progress=None):
+    """
+    Load synthetic jobs, applicants and all six child models with bulk inserts.
+    Applicants are written in batches, each inside its own transaction, so
+    memory stays bounded at any scale.
+    """
+    rng = random.Random(seed_value)
+    recruiter_users = create_recruiters(recruiters)
+    with transaction.atomic():
+        job_objects = Job.objects.bulk_create([build_job(rng, index) for index in range(jobs)])
+        changes.record(job_objects, ChangeRecord.CREATED)
+
+    # bulk_create skips signals, so feed the full-text index directly
+    search_backend = search.get_backend(router.db_for_write(Job))
+    if search_backend:
+        search_backend.index_objects(job_objects)
+
+    created = 0
+    while created < applicants:
+        size = min(batch_size, applicants - created)
+        with transaction.atomic():
+            batch = Applicant.objects.bulk_create(
+                [build_applicant(rng, created + offset, job_objects, recruiter_users) for offset in range(size)]
+            )
+            children = {model: [] for model in CHILDREN_PER_APPLICANT}
+            for applicant in batch:
+                for model, rows in build_children(rng, applicant).items():
+                    children[model].extend(rows)
+            for model, rows in children.items():
+                model.objects.bulk_create(rows, batch_size=batch_size)
+            changes.record([*batch, *(row for rows in children.values() for row in rows)], ChangeRecord.CREATED)
+            applicants_bulk_created(batch)
+        created += size
+        if progress:
+            progress(created, applicants)
+
+    return recruiter_users, job_objects
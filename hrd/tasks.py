@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import router
+
+from hrd import dedup, queue, rollups, search, summaries
+from hrd.bulk import applicants_bulk_created
+from hrd.models import Applicant, BackgroundTask
+
+
+@queue.task(max_attempts=5, retry_delay=10)
+def process_application(applicant_id):
+    # Search index and summary for an applicant saved without signals by the public submission view
+    applicants = list(Applicant.objects.filter(pk=applicant_id))
+    if applicants:
+        applicants_bulk_created(applicants)
+
+
+@queue.task(max_attempts=5, retry_delay=10)
+def refresh_applicant(applicant_id, search_index=True, summary=True, duplicates=False):
+    # Derived data for an applicant edited through QuerySet.update()/bulk methods (autosave)
+    using = router.db_for_write(Applicant)
+    applicants = list(Applicant.objects.using(using).filter(pk=applicant_id))
+    if not applicants:
+        return
+    backend = search.get_backend(using)
+    if search_index and backend:
+        backend.index_objects(applicants, using=using)
+    if summary:
+        summaries.refresh([applicant_id], using)
+    if duplicates:
+        dedup.check([applicant_id], using)
+    # The job applied for, the salary expectation or the education may have changed
+    rollups.mark_stale(applicant_ids=[applicant_id], using=using)
+
+
+@queue.task(max_attempts=5, retry_delay=30)
+def refresh_job_rollups():
+    rollups.refresh_stale()
+
+
+@queue.task(max_attempts=8, retry_delay=60)
+def notify_job_contact(applicant_id):
+    applicant = Applicant.objects.select_related('position_applied_for').filter(pk=applicant_id).first()
+    if applicant is None:
+        return
+    job = applicant.position_applied_for
+    send_mail(
+        f"New application for {job.title}",
+        f"{applicant.name} applied for {job.title}. Review the application in the dashboard.",
+        settings.DEFAULT_FROM_EMAIL,
+        [job.contact_email],
+    )
+
+
+def enqueue_application_tasks(applicant, using=None):
+    reference = f'applicant:{applicant.pk}'
+    queue.enqueue(process_application, reference=reference, using=using, applicant_id=applicant.pk)
+    if settings.APPLICATION_NOTIFICATIONS:
+        queue.enqueue(notify_job_contact, reference=reference, using=using, applicant_id=applicant.pk)
+
+
+def enqueue_refresh(applicant_id, search_index=False, summary=False, duplicates=False, using=None):
+    # Edits arrive in bursts; fold them into the refresh already waiting for this applicant
+    reference = f'applicant:{applicant_id}'
+    flags = {'search_index': search_index, 'summary': summary, 'duplicates': duplicates}
+    waiting = BackgroundTask.objects.using(using).filter(
+        name=refresh_applicant.task_name, reference=reference, status=BackgroundTask.PENDING,
+    ).first()
+    if waiting is not None:
+        payload = {
+            'applicant_id': applicant_id,
+            **{flag: value or waiting.payload.get(flag, False) for flag, value in flags.items()},
+        }
+        # Conditional, in case a worker claimed it meanwhile
+        if BackgroundTask.objects.using(using).filter(pk=waiting.pk, status=BackgroundTask.PENDING).update(payload=payload):
+            return waiting
+    return queue.enqueue(
+        refresh_applicant, reference=reference, using=using,
+        applicant_id=applicant_id, **flags,
+    )
+
+
+def enqueue_rollup_refresh(using=None):
+    # A waiting refresh covers every rollup marked stale before it runs
+    waiting = BackgroundTask.objects.using(using).filter(
+        name=refresh_job_rollups.task_name, status=BackgroundTask.PENDING,
+    ).exists()
+    if not waiting:
+        queue.enqueue(refresh_job_rollups, using=using)
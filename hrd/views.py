@@ -1,73 +1,245 @@
+import json
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.models import User, Permission
-from django.contrib.contenttypes.models import ContentType
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import login
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from . import applications, jobboard, wizard
 from .forms import RegistrationForm, ApplicantForm
-from .models import Applicant, EmploymentHistory, Education, Family, Organization, ApplicantReference, Submission, Job
+from .instrumentation import QueryCounter
+from .models import Applicant, BackgroundTask
+from .permissions import grant_recruiter_permissions
+
+logger = logging.getLogger(__name__)
 
 
 def register(request):
     if request.method == 'POST':
         form = RegistrationForm(request.POST)
-        if form.is_valid():
-            email = form.cleaned_data.get('email')
-            if User.objects.filter(email=email).exists():
-                messages.error(request, 'Email is already in use. Please choose a different email.')
-            else:
-                # Create and save the new user
-                user = form.save(commit=False)  # Don't save to the database yet
-                user.is_staff = True  # Set user as staff
-                user.save()  # Save the user to the database
-
-                models_to_add_permissions = [
-                    Applicant,
-                    EmploymentHistory,
-                    Education,
-                    Family,
-                    Organization,
-                    ApplicantReference,
-                    Submission,
-                    Job
-                ]
-
-                # Loop through each model and assign add, view, change, and delete permissions
-                for model in models_to_add_permissions:
-                    content_type = ContentType.objects.get_for_model(model)
-
-                    # Apply read-only permission for the Job model
-                    if model == Job:
-                        view_perm = Permission.objects.get(codename=f'view_{model._meta.model_name}', content_type=content_type)
-                        # Assign the view-only permission for the Job model
-                        user.user_permissions.add(view_perm)
-
-                    else:
-                        # Retrieve the add, view, change, and delete permissions
-                        add_perm = Permission.objects.get(codename=f'add_{model._meta.model_name}', content_type=content_type)
-                        view_perm = Permission.objects.get(codename=f'view_{model._meta.model_name}', content_type=content_type)
-                        change_perm = Permission.objects.get(codename=f'change_{model._meta.model_name}', content_type=content_type)
-                        delete_perm = Permission.objects.get(codename=f'delete_{model._meta.model_name}', content_type=content_type)
-
-                    # Assign the permissions to the user
-                    user.user_permissions.add(add_perm, view_perm, change_perm, delete_perm)
-
-
-
-                login(request, user)
-                messages.success(request, 'Registration successful! You can now log in.')
-                return redirect('login')  # Redirect to login page after registration
+        # Count the queries a registration costs so regressions show up in the logs
+        with QueryCounter() as queries:
+            registered = _register_user(request, form)
+        logger.info('Registration took %d queries (%.1f ms in SQL)', queries.count, queries.duration * 1000)
+        if registered:
+            messages.success(request, 'Registration successful! You can now log in.')
+            return redirect('login')  # Redirect to login page after registration
     else:
         form = RegistrationForm()
     return render(request, 'register.html', {'form': form})
 
 
-def applicant_create_view(request):
+def _register_user(request, form):
+    if not form.is_valid():
+        return False
+
+    email = form.cleaned_data.get('email')
+    if User.objects.filter(email=email).exists():
+        messages.error(request, 'Email is already in use. Please choose a different email.')
+        return False
+
+    # Create and save the new user
+    user = form.save(commit=False)  # Don't save to the database yet
+    user.is_staff = True  # Set user as staff
+    user.save()  # Save the user to the database
+
+    # Assign the recruiter permission bundle (full access to applicant data, view-only on jobs)
+    grant_recruiter_permissions(user)
+
+    login(request, user)
+    return True
+
+
+async def applicant_create_view(request):
+    """
+    Public application form. The request only validates and inserts the
+    applicant; indexing, summaries and notifications are queued for the
+    background workers (hrd.tasks), so submit latency does not grow with them.
+    """
+    if request.method != 'POST':
+        return await sync_to_async(_render_application_form)(request, ApplicantForm(), uuid.uuid4())
+
+    # A retried or double-clicked submission carries the same key and is only stored once
+    try:
+        key = uuid.UUID(request.headers.get('Idempotency-Key') or request.POST.get('idempotency_key') or str(uuid.uuid4()))
+    except ValueError:
+        return HttpResponseBadRequest('Invalid idempotency key')
+
+    form = ApplicantForm(request.POST)
+    # request.user is lazy; it is resolved (a session query) inside the sync call
+    applicant = await sync_to_async(_accept_application)(form, key, request.user)
+    if applicant is None:
+        if _wants_json(request):
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        return await sync_to_async(_render_application_form)(request, form, key, status=400)
+
+    if _wants_json(request):
+        return JsonResponse(
+            {'key': str(key), 'status_url': reverse('applicant_status_json', args=[key])},
+            status=202,
+        )
+    return redirect('applicant_status', key=key)
+
+
+def _wants_json(request):
+    accept = request.headers.get('Accept', '')
+    return 'application/json' in accept and 'text/html' not in accept
+
+
+def _render_application_form(request, form, key, status=200):
+    # The blank form is a cached fragment keyed on the job list version (position applied for)
+    context = {'form': form, 'idempotency_key': key, 'jobs_version': jobboard.version()}
+    return render(request, 'applicant.html', context, status=status)
+
+
+def _accept_application(form, key, user):
+    """Return the applicant stored under key, saving it first if the form is valid; None if it is not."""
+    existing = applications.submitted_application(key)
+    if existing is not None:
+        return existing
+    if not form.is_valid():
+        return None
+    return applications.store_application(form.save(commit=False), key, applications.application_owner(user))
+
+
+def _application_status(key):
+    applicant_id = Applicant.objects.filter(submission_key=key).values_list('pk', flat=True).first()
+    if applicant_id is None:
+        return None
+    queued = list(
+        BackgroundTask.objects.filter(reference=f'applicant:{applicant_id}')
+        .order_by('pk').values('name', 'status', 'attempts')
+    )
+    statuses = {task['status'] for task in queued}
+    if BackgroundTask.FAILED in statuses:
+        status = 'failed'
+    elif statuses - {BackgroundTask.DONE}:
+        status = 'processing'
+    else:
+        status = 'complete'
+    return {
+        'key': str(key),
+        'status': status,
+        'tasks': [{**task, 'name': task['name'].rsplit('.', 1)[-1]} for task in queued],
+    }
+
+
+async def applicant_status_view(request, key):
+    status = await sync_to_async(_application_status)(key)
+    if status is None:
+        raise Http404('Unknown submission')
+    context = {'application': status, 'status_url': reverse('applicant_status_json', args=[key])}
+    return await sync_to_async(render)(request, 'applicant_status.html', context)
+
+
+async def applicant_status_json(request, key):
+    status = await sync_to_async(_application_status)(key)
+    if status is None:
+        return JsonResponse({'error': 'Unknown submission'}, status=404)
+    return JsonResponse(status)
+
+
+def application_wizard_start(request):
+    # Resume a draft at its first unfinished step, or start a new one
+    store = wizard.DraftStore(request)
+    if store.draft is None or 'submitted' in store.draft:
+        store.start()
+    steps = wizard.get_steps()
+    step = next((step for step in steps if step.slug not in store.draft['steps']), steps[-1])
+    response = redirect('application_wizard', slug=step.slug)
+    store.save(response)
+    return response
+
+
+def application_wizard_view(request, slug):
+    """
+    One section of the application. Each POST carries and validates only its
+    own step; the draft is committed in one transaction after the last step.
+    """
+    index, step = wizard.get_step(slug)
+    if step is None:
+        raise Http404('Unknown step')
+    store = wizard.DraftStore(request)
+    if store.draft is None:
+        return redirect('application_wizard_start')
+    if 'submitted' in store.draft:
+        return redirect('applicant_status', key=store.draft['submitted'])
+    steps = wizard.get_steps()
+
     if request.method == 'POST':
-        form = ApplicantForm(request.POST)
-        if form.is_valid():
-            form.save()
-            return redirect('success_page')  # Redirect to a success page after form submission
+        data = wizard.step_data(step, request.POST)
+        form, formsets = wizard.build_forms(step, wizard.as_form_data(data))
+        if wizard.forms_valid(form, formsets):
+            store.draft['steps'][step.slug] = data
+            if index + 1 < len(steps):
+                response = redirect('application_wizard', slug=steps[index + 1].slug)
+            else:
+                response = _commit_application_draft(request, store)
+            store.save(response)
+            return response
     else:
-        form = ApplicantForm()
+        data = store.draft['steps'].get(step.slug)
+        form, formsets = wizard.build_forms(step, wizard.as_form_data(data) if data is not None else None)
+
+    context = {
+        'step': step,
+        'step_number': index + 1,
+        'step_count': len(steps),
+        'previous_step': steps[index - 1] if index else None,
+        'form': form,
+        'formsets': [(spec.model._meta.verbose_name_plural, formset) for spec, formset in zip(step.formsets, formsets)],
+    }
+    return render(request, 'application_wizard.html', context)
+
+
+def _commit_application_draft(request, store):
+    applicant, children, invalid_step = wizard.build_application(store.draft)
+    if invalid_step is not None:
+        # Something a step relied on changed (e.g. the job closed); send the applicant back to it
+        return redirect('application_wizard', slug=invalid_step.slug)
+    applicant = applications.store_application(
+        applicant, store.key, applications.application_owner(request.user), children,
+    )
+    # Keep a small marker so a resubmitted last step lands on the status page instead of a new draft
+    store.draft = {'submitted': str(applicant.submission_key)}
+    return redirect('applicant_status', key=applicant.submission_key)
+
+
+def _cached_job_board_response(request, kind, content_type, render_page):
+    cursor = request.GET.get('after') or None
+    parts = jobboard.cache_parts(kind, cursor)
+    content = jobboard.board_cache.get(*parts)
+    if content is None:
+        try:
+            page = jobboard.get_page(cursor)
+        except jobboard.InvalidCursor:
+            return HttpResponseBadRequest('Invalid cursor')
+        content = render_page(page)
+        jobboard.board_cache.set(parts, content)
+    return HttpResponse(content, content_type=content_type)
+
+
+@require_GET
+def job_board_view(request):
+    return _cached_job_board_response(
+        request, 'html', 'text/html; charset=utf-8',
+        lambda page: render_to_string('jobs.html', page),
+    )
+
 
-    return render(request, 'applicant.html', {'form': form})
\ No newline at end of file
+@require_GET
+def job_board_json(request):
+    return _cached_job_board_response(
+        request, 'json', 'application/json',
+        lambda page: json.dumps(page, cls=DjangoJSONEncoder),
+    )
@@ -0,0 +1,141 @@
+import uuid
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.forms import inlineformset_factory, modelform_factory
+from django.forms.models import construct_instance
+from django.utils.datastructures import MultiValueDict
+from django.utils.text import slugify
+
+from hrd.forms import ApplicantForm
+from hrd.models import Applicant
+
+# One wizard step per ApplicantAdmin fieldset; child formsets belong to the fieldset they follow
+Step = namedtuple('Step', 'slug title fields formsets')
+FormsetSpec = namedtuple('FormsetSpec', 'prefix model extra')
+
+DRAFT_COOKIE = 'application_draft'
+DRAFT_COOKIE_SALT = 'hrd.wizard'
+
+
+@lru_cache(maxsize=None)
+def get_steps():
+    from hrd.admin import ApplicantAdmin  # The admin layout is the single source of the sections
+
+    steps = []
+    for entry in ApplicantAdmin.fieldsets_with_inlines:
+        if isinstance(entry, tuple):
+            title, options = entry
+            steps.append(Step(slugify(title), title.capitalize(), tuple(options['fields']), []))
+        else:
+            formset = FormsetSpec(entry.model._meta.model_name, entry.model, entry.extra)
+            if not steps:
+                steps.append(Step(formset.prefix, entry.model._meta.verbose_name_plural, (), []))
+            steps[-1].formsets.append(formset)
+    return tuple(steps)
+
+
+def get_step(slug):
+    for index, step in enumerate(get_steps()):
+        if step.slug == slug:
+            return index, step
+    return None, None
+
+
+@lru_cache(maxsize=None)
+def _form_class(fields):
+    return modelform_factory(Applicant, form=ApplicantForm, fields=fields)
+
+
+@lru_cache(maxsize=None)
+def _formset_class(model, extra):
+    return inlineformset_factory(Applicant, model, exclude=['applicant'], extra=extra, can_delete=False)
+
+
+def build_forms(step, data=None):
+    """The step's applicant form and child formsets, bound to data (a MultiValueDict) if given."""
+    form = _form_class(step.fields)(data, prefix='applicant') if step.fields else None
+    formsets = [_formset_class(spec.model, spec.extra)(data, prefix=spec.prefix) for spec in step.formsets]
+    return form, formsets
+
+
+def forms_valid(form, formsets):
+    # Evaluate everything so each form carries its errors
+    valid = form.is_valid() if form is not None else True
+    return all([valid] + [formset.is_valid() for formset in formsets])
+
+
+def step_data(step, post):
+    """
+    The part of a POST that belongs to step, without empty values and with
+    single values unwrapped, which keeps drafts small.
+    """
+    prefixes = ['applicant-'] + [f'{spec.prefix}-' for spec in step.formsets]
+    data = {}
+    for name, values in post.lists():
+        if not name.startswith(tuple(prefixes)):
+            continue
+        values = [value for value in values if value != '']
+        if values:
+            data[name] = values[0] if len(values) == 1 else values
+    return data
+
+
+def as_form_data(data):
+    return MultiValueDict({name: value if isinstance(value, list) else [value] for name, value in data.items()})
+
+
+class DraftStore:
+    """
+    Wizard progress kept server-side in a cache (settings.APPLICATION_DRAFT_CACHE)
+    under a random id carried in a signed cookie. Drafts expire with the cache
+    entry, so abandoned ones cost nothing to clean up.
+    """
+
+    def __init__(self, request):
+        self.cache = caches[settings.APPLICATION_DRAFT_CACHE]
+        self.draft_id = request.get_signed_cookie(DRAFT_COOKIE, default=None, salt=DRAFT_COOKIE_SALT)
+        self.draft = self.cache.get(self.cache_key) if self.draft_id else None
+
+    @property
+    def cache_key(self):
+        return f'application-draft:{self.draft_id}'
+
+    def start(self):
+        # A new draft id also serves as the submission's idempotency key
+        self.draft_id = uuid.uuid4().hex
+        self.draft = {'steps': {}}
+        return self.draft
+
+    def save(self, response, timeout=None):
+        self.cache.set(self.cache_key, self.draft, timeout or settings.APPLICATION_DRAFT_TTL)
+        response.set_signed_cookie(
+            DRAFT_COOKIE, self.draft_id, salt=DRAFT_COOKIE_SALT, max_age=settings.APPLICATION_DRAFT_TTL,
+            httponly=True, samesite='Lax',
+        )
+
+    @property
+    def key(self):
+        return uuid.UUID(self.draft_id)
+
+
+def build_application(draft):
+    """
+    Re-validate every step of a finished draft. Returns (applicant, children,
+    first invalid step); applicant and children are unsaved instances.
+    """
+    applicant = Applicant()
+    children = {}
+    for step in get_steps():
+        form, formsets = build_forms(step, as_form_data(draft['steps'].get(step.slug, {})))
+        if not forms_valid(form, formsets):
+            return None, None, step
+        if form is not None:
+            construct_instance(form, applicant, fields=step.fields)
+        for spec, formset in zip(step.formsets, formsets):
+            children[spec.model] = [
+                child_form.save(commit=False) for child_form in formset.forms if child_form.has_changed()
+            ]
+    return applicant, children, None